@@ -0,0 +1,77 @@
+"""Generators for synthetic C sources that stress different parts of the complexity engine."""
+
+
+def deep_nesting(depth: int) -> str:
+    """A single function with `depth` nested if statements, followed by an else-if ladder of the same length."""
+
+    nested = "if (x) {\n" * depth + "x++;\n" + "}\n" * depth
+    ladder = "if (x0) {}\n" + "".join(f"else if (x{i}) {{}}\n" for i in range(1, depth))
+    return f"int deep(int x) {{\n{nested}{ladder}return x;\n}}\n"
+
+
+def boolean_chains(count: int, length: int) -> str:
+    """A single function with `count` conditions, each a chain of `length` alternating logical operators."""
+
+    def chain(i: int) -> str:
+        return " ".join(f"v{j} {'&&' if (i + j) % 3 else '||'}" for j in range(length)) + " v"
+
+    body = "".join(f"if ({chain(i)}) {{ r++; }}\n" for i in range(count))
+    return f"int chains(void) {{\nint r = 0;\n{body}return r;\n}}\n"
+
+
+def many_functions(count: int) -> str:
+    """`count` small functions with a few typical control flow constructs each."""
+
+    return "".join(
+        f"static int f{i}(int a, int b) {{\n"
+        f"    for (int i = 0; i < a; i++) {{\n"
+        f"        if (i % 2 && b) {{ b--; }} else {{ b++; }}\n"
+        f"    }}\n"
+        f"    return a > b ? a : b;\n"
+        f"}}\n"
+        for i in range(count)
+    )
+
+
+def tiny_functions(count: int) -> str:
+    """
+    `count` tiny functions, almost without control flow, so that finding the functions and their names
+    dominates. The declarators alternate between plain, pointer-returning, qualified and nested ones.
+    """
+
+    declarators = (
+        "int f{i}(int a)",
+        "char **f{i}(int a)",
+        "int S{i}::f(int a) const",
+        "int (*f{i}(int a))(int)",
+        "const int &f{i}(int a)",
+    )
+    return "".join(
+        declarators[i % len(declarators)].format(i=i) + " {\n    if (a) { return g(a); }\n    return 0;\n}\n"
+        for i in range(count)
+    )
+
+
+def goto_web(functions: int, gotos: int) -> str:
+    """`functions` functions, each with `gotos` error gotos to a ladder of cleanup labels, as in kernel style C."""
+
+    def function(i: int) -> str:
+        labels = max(1, gotos // 8)
+        body = "".join(
+            f"    if (step(ctx, {j}) < 0)\n        goto err_{j % labels};\n"
+            for j in range(gotos)
+        )
+        cleanup = "".join(f"err_{j}:\n    release(ctx, {j});\n" for j in reversed(range(labels)))
+        return f"int probe{i}(void *ctx) {{\n{body}    return 0;\n{cleanup}    return -1;\n}}\n"
+
+    return "".join(function(i) for i in range(functions))
+
+
+SYNTHETIC = {
+    "deep_nesting": lambda: deep_nesting(500),
+    "boolean_chains": lambda: boolean_chains(200, 100),
+    "many_functions": lambda: many_functions(5000),
+    "tiny_functions": lambda: tiny_functions(20000),
+    "goto_web": lambda: goto_web(50, 400),
+}
+"""Named generators for the synthetic benchmark inputs with their default sizes."""
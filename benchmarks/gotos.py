@@ -0,0 +1,105 @@
+"""
+Measure the cost of resolving gotos on goto-dense inputs of growing size.
+
+The goto resolution is measured in isolation, by recording the gotos and labels of each input
+with a `GotoResolver` and calculating the goto nesting, and end to end, by scoring each input
+without goto nesting, with goto nesting and with structural gotos. For each of these options, the
+goto pass is additionally measured directly by `Stats.goto_seconds`, as the differences of the
+end-to-end timings are dominated by noise. All should grow linearly with the number of gotos,
+independent of how they are distributed over functions.
+
+Run from the repository root with `python -m benchmarks.gotos`.
+"""
+
+import argparse
+import json
+from typing import Callable
+
+from tree_sitter import Tree
+
+from benchmarks.generate import goto_web
+from benchmarks.run import measure
+from modified_cognitive_complexity import ComplexityAnalyzer, cognitive_complexity, cognitive_complexity_totals
+from modified_cognitive_complexity.gotos import GotoResolver
+from modified_cognitive_complexity.stats import Stats
+
+
+SIZES = [(50, 100), (50, 400), (5, 4000), (1, 20000)]
+"""The (functions, gotos per function) of the inputs."""
+
+OPTIONS = {
+    "plain": {"goto_nesting": False, "structural_gotos": False},
+    "goto_nesting": {"goto_nesting": True, "structural_gotos": False},
+    "structural": {"goto_nesting": True, "structural_gotos": True},
+}
+
+
+def resolve(functions: int, gotos: int) -> int:
+    """Record the gotos and labels laid out as by `goto_web` and calculate their goto nesting."""
+
+    labels = max(1, gotos // 8)
+    length = gotos + labels
+    total = 0
+    for _ in range(functions):
+        resolver = GotoResolver()
+        for j in range(gotos):
+            resolver.add_goto(f"err_{j % labels}".encode(), j)
+        for j in range(labels):
+            resolver.add_label(f"err_{labels - 1 - j}".encode(), gotos + j)
+
+        total += sum(resolver.goto_nestings(length))
+        total += sum(label_index for _, label_index in resolver.resolved())
+
+    return total
+
+
+def goto_pass(score: Callable[..., object], tree: Tree, options: dict[str, bool], repeat: int) -> float:
+    """Measure the best time of the goto pass of `repeat` scorings of the syntax tree, see `Stats.goto_seconds`."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        stats = Stats()
+        score(tree.walk(), stats=stats, **options)
+        best = min(best, stats.goto_seconds)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs per input and options.")
+    parser.add_argument("--totals", action="store_true", help="Use the totals-only engine mode.")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per measurement.")
+    args = parser.parse_args()
+
+    analyzer = ComplexityAnalyzer()
+    score = cognitive_complexity_totals if args.totals else cognitive_complexity
+
+    for functions, gotos in SIZES:
+        tree = analyzer.parse(goto_web(functions, gotos).encode())
+        name = f"{functions}x{gotos}"
+
+        resolution = measure(lambda: resolve(functions, gotos), args.repeat)
+        results = {
+            option: {
+                **measure(lambda: score(tree.walk(), **kwargs), args.repeat),
+                "goto_seconds": goto_pass(score, tree, kwargs, args.repeat),
+            }
+            for option, kwargs in OPTIONS.items()
+        }
+        if args.json:
+            print(json.dumps({"input": name, "gotos": functions * gotos, "options": "resolve", **resolution}), flush=True)
+            for option, result in results.items():
+                print(json.dumps({"input": name, "gotos": functions * gotos, "options": option, **result}), flush=True)
+        else:
+            print(
+                f"{name:<10} {functions * gotos:>7} gotos   resolve {resolution['seconds'] * 1e3:7.2f}ms   " + "   ".join(
+                    f"{option} {result['seconds'] * 1e3:8.2f}ms (goto pass {result['goto_seconds'] * 1e3:7.2f}ms)"
+                    for option, result in results.items()
+                ),
+                flush=True
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmark parsing and scoring on synthetic inputs and a vendored real-world C file.
+
+Run from the repository root with `python -m benchmarks.run`. Use `--json` to write one JSON
+object per input, e.g. to store a baseline, and `--compare` to check a run against a baseline.
+"""
+
+import argparse
+import importlib.metadata
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.generate import SYNTHETIC
+from modified_cognitive_complexity import ComplexityAnalyzer, cognitive_complexity, cognitive_complexity_totals
+
+
+CORPUS = Path(__file__).parent / "corpus"
+"""The directory of the vendored real-world sources. See the license files next to them."""
+
+
+def inputs() -> dict[str, Callable[[], bytes]]:
+    """Named loaders for all benchmark inputs, the synthetic ones first."""
+
+    loaders: dict[str, Callable[[], bytes]] = {
+        name: (lambda generate=generate: generate().encode())
+        for name, generate in SYNTHETIC.items()
+    }
+    for path in sorted(CORPUS.glob("*.c")):
+        loaders[path.name] = path.read_bytes
+
+    return loaders
+
+
+def measure(function: Callable[[], object], repeat: int) -> dict[str, float | int]:
+    """
+    Measure the best wall time of `repeat` runs and the peak memory allocated by a single run.
+
+    The peak only covers allocations by Python, not the ones by Tree-sitter itself.
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def benchmark(name: str, code: bytes, analyzer: ComplexityAnalyzer, repeat: int) -> dict[str, object]:
+    """Measure parsing, scoring and the totals-only scoring of one input."""
+
+    tree = analyzer.parse(code)
+    nodes = tree.root_node.descendant_count
+
+    parse = measure(lambda: analyzer.parse(code), repeat)
+    score = measure(lambda: cognitive_complexity(tree.walk()), repeat)
+    totals = measure(lambda: cognitive_complexity_totals(tree.walk()), repeat)
+
+    return {
+        "input": name,
+        "bytes": len(code),
+        "nodes": nodes,
+        "parse_seconds": parse["seconds"],
+        "score_seconds": score["seconds"],
+        "score_ns_per_node": score["seconds"] * 1e9 / nodes,
+        "score_peak_bytes": score["peak_bytes"],
+        "totals_seconds": totals["seconds"],
+        "totals_ns_per_node": totals["seconds"] * 1e9 / nodes,
+        "totals_peak_bytes": totals["peak_bytes"],
+        "python": platform.python_version(),
+        "tree_sitter": importlib.metadata.version("tree-sitter"),
+    }
+
+
+def compare(results: list[dict[str, object]], baseline: Path, tolerance: float) -> bool:
+    """
+    Print the ratio of each timing to the baseline.
+
+    :return: `False`, if any timing is slower than the baseline by more than the tolerance.
+    """
+
+    previous = {}
+    for line in baseline.read_text().splitlines():
+        if line.strip():
+            record = json.loads(line)
+            previous[record["input"]] = record
+
+    passed = True
+    for result in results:
+        before = previous.get(result["input"])
+        if before is None:
+            print(f"{result['input']:<24} no baseline")
+            continue
+
+        ratios = []
+        for key in ("parse_seconds", "score_seconds", "totals_seconds"):
+            ratio = result[key] / before[key]
+            ratios.append(f"{key.removesuffix('_seconds')} {ratio:5.2f}x")
+            if ratio > 1 + tolerance:
+                passed = False
+
+        print(f"{result['input']:<24} " + "   ".join(ratios))
+
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="Inputs to benchmark. Defaults to all inputs.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs per input and measurement.")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per input.")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE", help="Compare against the JSON output of a previous run.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed slowdown relative to the baseline, e.g. 0.1 for 10%%.")
+    args = parser.parse_args()
+
+    loaders = inputs()
+    unknown = set(args.names) - loaders.keys()
+    if unknown:
+        parser.error(f"unknown inputs: {', '.join(sorted(unknown))} (choose from {', '.join(loaders)})")
+
+    analyzer = ComplexityAnalyzer()
+    results = []
+    for name, load in loaders.items():
+        if args.names and name not in args.names:
+            continue
+
+        result = benchmark(name, load(), analyzer, args.repeat)
+        results.append(result)
+
+        if args.json:
+            print(json.dumps(result), flush=True)
+        elif args.compare is None:
+            print(
+                f"{name:<24} {result['nodes']:>8} nodes   "
+                f"parse {result['parse_seconds'] * 1e3:8.2f}ms   "
+                f"score {result['score_seconds'] * 1e3:8.2f}ms ({result['score_ns_per_node']:6.0f}ns/node)   "
+                f"totals {result['totals_seconds'] * 1e3:8.2f}ms   "
+                f"peak {result['score_peak_bytes'] / 1024:9.1f}KiB",
+                flush=True
+            )
+
+    if args.compare is not None and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare calculating per-function totals from the full scores against the totals-only engine mode.
+
+Run from the repository root with `python -m benchmarks.totals`.
+"""
+
+import argparse
+import json
+from typing import Callable
+
+from tree_sitter import Tree
+
+from benchmarks.generate import SYNTHETIC
+from benchmarks.run import measure
+from modified_cognitive_complexity import ComplexityAnalyzer, cognitive_complexity, cognitive_complexity_totals
+
+
+def _totals_from_scores(tree: Tree) -> dict[bytes | None, int]:
+    return {
+        function_name: sum(cost.total for _, cost in scores)
+        for function_name, scores in cognitive_complexity(tree.walk()).items()
+    }
+
+
+def _totals_only(tree: Tree) -> dict[bytes | None, int]:
+    return cognitive_complexity_totals(tree.walk())
+
+
+MODES: dict[str, Callable[[Tree], dict[bytes | None, int]]] = {
+    "scores": _totals_from_scores,
+    "totals": _totals_only,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs per input and mode.")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per measurement.")
+    args = parser.parse_args()
+
+    analyzer = ComplexityAnalyzer()
+    for name, generate in SYNTHETIC.items():
+        tree = analyzer.parse(generate())
+        assert _totals_from_scores(tree) == _totals_only(tree)
+
+        results = {mode: measure(lambda: function(tree), args.repeat) for mode, function in MODES.items()}
+        if args.json:
+            for mode, result in results.items():
+                print(json.dumps({"input": name, "mode": mode, **result}))
+        else:
+            scores, totals = results["scores"], results["totals"]
+            print(
+                f"{name:<16} "
+                f"time {scores['seconds'] * 1e3:8.2f}ms -> {totals['seconds'] * 1e3:8.2f}ms "
+                f"({scores['seconds'] / totals['seconds']:.2f}x)   "
+                f"peak {scores['peak_bytes'] / 1024:9.1f}KiB -> {totals['peak_bytes'] / 1024:9.1f}KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,70 @@
-from modified_cognitive_complexity.complexity import cognitive_complexity, Scores, Score, Location, Nesting
-from modified_cognitive_complexity.helpers import cognitive_complexity_for_string, cognitive_complexity_for_file 
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from modified_cognitive_complexity.complexity import cognitive_complexity, cognitive_complexity_totals, Scores, Score, Location, Nesting, FunctionKey, function_name
+    from modified_cognitive_complexity.analyzer import ComplexityAnalyzer, default_analyzer, analyzer_for, analyzer_for_path
+    from modified_cognitive_complexity.frontends import Frontend, NodeTypes, register_frontend, get_frontend, frontend_for_path, registered_frontends, source_suffixes
+    from modified_cognitive_complexity.helpers import cognitive_complexity_for_string, cognitive_complexity_for_file, cognitive_complexity_for_many, cognitive_complexity_parallel
+    from modified_cognitive_complexity.preprocessor import cognitive_complexity_configurations
+    from modified_cognitive_complexity.table import ScoreTable
+    from modified_cognitive_complexity.aggregate import ScoreArrays
+    from modified_cognitive_complexity.stats import Stats
+    from modified_cognitive_complexity.aio import AsyncScorer, acognitive_complexity_for_string, acognitive_complexity_for_file, acognitive_complexity_for_many
+
+# the public names are imported from their modules on first access, so that importing the package,
+# e.g. for the CLI, does not load Tree-sitter and the grammar up front
+_EXPORTS = {
+    "cognitive_complexity": "complexity",
+    "cognitive_complexity_totals": "complexity",
+    "Scores": "complexity",
+    "Score": "complexity",
+    "Location": "complexity",
+    "Nesting": "complexity",
+    "FunctionKey": "complexity",
+    "function_name": "complexity",
+    "ComplexityAnalyzer": "analyzer",
+    "default_analyzer": "analyzer",
+    "analyzer_for": "analyzer",
+    "analyzer_for_path": "analyzer",
+    "Frontend": "frontends",
+    "NodeTypes": "frontends",
+    "register_frontend": "frontends",
+    "get_frontend": "frontends",
+    "frontend_for_path": "frontends",
+    "registered_frontends": "frontends",
+    "source_suffixes": "frontends",
+    "cognitive_complexity_for_string": "helpers",
+    "cognitive_complexity_for_file": "helpers",
+    "cognitive_complexity_for_many": "helpers",
+    "cognitive_complexity_parallel": "helpers",
+    "cognitive_complexity_configurations": "preprocessor",
+    "ScoreTable": "table",
+    "ScoreArrays": "aggregate",
+    "Stats": "stats",
+    "AsyncScorer": "aio",
+    "acognitive_complexity_for_string": "aio",
+    "acognitive_complexity_for_file": "aio",
+    "acognitive_complexity_for_many": "aio",
+}
+
+# a star import leaves out the names of modules with optional dependencies or heavy imports, which
+# are only available by name, so that it neither fails without numpy nor loads asyncio
+_NOT_STARRED = frozenset({"aggregate", "aio"})
+
+__all__ = [name for name, module in _EXPORTS.items() if module not in _NOT_STARRED]
+
+
+def __getattr__(name: str):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
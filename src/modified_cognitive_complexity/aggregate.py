@@ -0,0 +1,213 @@
+from typing import Iterable
+
+import numpy as np
+
+from modified_cognitive_complexity.complexity import Scores
+from modified_cognitive_complexity.table import ScoreTable
+
+
+SCORE_DTYPE = np.dtype([
+    ("function", np.int64),
+    ("row", np.int32),
+    ("increment", np.int32),
+    ("nesting", np.int32),
+    ("goto", np.int32),
+])
+"""The fields of each scored code location, see `ScoreArrays.records`."""
+
+COMPONENT_DTYPE = np.dtype([
+    ("increment", np.int64),
+    ("nesting", np.int64),
+    ("goto", np.int64),
+    ("total", np.int64),
+])
+"""The fields of the score components of each function, see `ScoreArrays.components`."""
+
+_COLUMNS = ("row", "increment", "nesting", "goto")
+
+
+class ScoreArrays:
+    """
+    The scores of many functions, possibly of many sources, as NumPy arrays for vectorized aggregation.
+
+    Like a `ScoreTable`, the fields of the scored code locations are stored in columns with one entry
+    per code location and the code locations of each function are contiguous. A score without nesting
+    has a nesting and goto nesting of -1, which is never counted by the aggregations. Summing the
+    components of many functions, their percentiles or the top functions is done without a Python
+    loop over the code locations or functions, which requires the optional dependency NumPy.
+    The components are calculated once and shared by all aggregations.
+    """
+
+    __slots__ = ("functions", "offsets", *_COLUMNS, "_components")
+
+    def __init__(self, functions: list[tuple[int, bytes | None]], offsets: np.ndarray, columns: dict[str, np.ndarray]):
+        """
+        Use `from_tables` or `from_scores` to collect scores.
+
+        :param functions: The (source index, function name) pair of each function.
+        :param offsets: The first code location of each function, followed by the number of code locations.
+        :param columns: The row, increment, nesting and goto nesting of all code locations.
+        """
+
+        self.functions = functions
+        """The (source index, function name) pair of each function, where the index counts the tables or mappings."""
+        self.offsets = offsets
+        """The first code location of each function, followed by the number of code locations."""
+
+        self.row: np.ndarray = columns["row"]
+        self.increment: np.ndarray = columns["increment"]
+        self.nesting: np.ndarray = columns["nesting"]
+        self.goto: np.ndarray = columns["goto"]
+        self._components: np.ndarray | None = None
+
+    @classmethod
+    def from_tables(cls, tables: Iterable[ScoreTable]) -> "ScoreArrays":
+        """
+        Collect the scores of tables, e.g. one per source.
+
+        The columns of the tables are copied without converting each code location.
+
+        :param tables: The tables.
+
+        :return: The scores of all functions of all tables, in the order of the tables and their functions.
+        """
+
+        functions: list[tuple[int, bytes | None]] = []
+        counts: list[np.ndarray] = []
+        parts: dict[str, list[np.ndarray]] = {name: [] for name in _COLUMNS}
+
+        for index, table in enumerate(tables):
+            functions.extend((index, function_name) for function_name in table.functions)
+            counts.append(np.diff(np.frombuffer(table._offsets, dtype=np.int64)))
+            parts["row"].append(np.frombuffer(table.start_row, dtype=np.int32))
+            parts["increment"].append(np.frombuffer(table.increment, dtype=np.int32))
+            parts["nesting"].append(np.frombuffer(table.nesting, dtype=np.int32))
+            parts["goto"].append(np.frombuffer(table.goto_nesting, dtype=np.int32))
+
+        offsets = np.zeros(len(functions) + 1, dtype=np.int64)
+        if counts:
+            np.cumsum(np.concatenate(counts), out=offsets[1:])
+
+        columns = {name: np.concatenate(part) if part else np.empty(0, np.int32) for name, part in parts.items()}
+        return cls(functions, offsets, columns)
+
+    @classmethod
+    def from_scores(cls, results: Iterable[dict[bytes | None, Scores]]) -> "ScoreArrays":
+        """
+        Collect the scores returned by `cognitive_complexity` for many sources.
+
+        :param results: The mappings from each function name to its scores, e.g. one per source.
+
+        :return: The scores of all functions of all mappings, in the order of the mappings and their functions.
+        """
+
+        return cls.from_tables(map(ScoreTable.from_scores, results))
+
+    def __len__(self) -> int:
+        """The number of functions."""
+        return len(self.functions)
+
+    def function_ids(self) -> np.ndarray:
+        """
+        :return: The index in `functions` of the function of each code location.
+        """
+
+        return np.repeat(np.arange(len(self.functions), dtype=np.int64), np.diff(self.offsets))
+
+    def records(self) -> np.ndarray:
+        """
+        Export the code locations into a single array, e.g. to save it or to create a data frame.
+
+        :return: An array with one record per code location, with the fields of `SCORE_DTYPE`.
+        """
+
+        records = np.empty(len(self.increment), dtype=SCORE_DTYPE)
+        records["function"] = self.function_ids()
+        for name in _COLUMNS:
+            records[name] = getattr(self, name)
+
+        return records
+
+    def components(self) -> np.ndarray:
+        """
+        Sum the increments, nestings and goto nestings of the code locations of each function.
+
+        :return: An array with one record per function in the order of `functions`, with the fields
+            of `COMPONENT_DTYPE`. The total of a function equals its score from `cognitive_complexity_totals`.
+        """
+
+        if self._components is not None:
+            return self._components
+
+        # the sums of the code locations of all functions with at least one, as `reduceat` can not sum empty ranges
+        starts = self.offsets[:-1]
+        scored = starts < self.offsets[1:]
+        starts = starts[scored]
+
+        components = np.zeros(len(self.functions), dtype=COMPONENT_DTYPE)
+        if len(starts):
+            components["increment"][scored] = np.add.reduceat(self.increment, starts, dtype=np.int64)
+            # scores without nesting are stored as -1
+            components["nesting"][scored] = np.add.reduceat(np.maximum(self.nesting, 0), starts, dtype=np.int64)
+            components["goto"][scored] = np.add.reduceat(np.maximum(self.goto, 0), starts, dtype=np.int64)
+
+        components["total"] = components["increment"] + components["nesting"] + components["goto"]
+        self._components = components
+        return components
+
+    def totals(self) -> np.ndarray:
+        """
+        :return: The total score of each function in the order of `functions`.
+        """
+
+        return self.components()["total"]
+
+    def percentiles(self, q: float | Iterable[float], *, component: str = "total") -> np.ndarray:
+        """
+        Calculate percentiles of the scores of all functions.
+
+        :param q: The percentile or percentiles, between 0 and 100.
+        :param component: The component whose percentiles are calculated, one of the fields of `COMPONENT_DTYPE`.
+
+        :return: The percentile or percentiles, see `numpy.percentile`.
+        """
+
+        q = q if isinstance(q, (int, float)) else list(q)
+        return np.percentile(self.components()[component], q)
+
+    def histogram(self, bins: int | Iterable[int] = 10, *, component: str = "total") -> tuple[np.ndarray, np.ndarray]:
+        """
+        Count the functions by their score.
+
+        :param bins: The number of bins or the bin edges, see `numpy.histogram`.
+        :param component: The component to count by, one of the fields of `COMPONENT_DTYPE`.
+
+        :return: The number of functions in each bin and the bin edges.
+        """
+
+        return np.histogram(self.components()[component], bins=bins if isinstance(bins, int) else list(bins))
+
+    def top(self, k: int, *, component: str = "total") -> list[tuple[tuple[int, bytes | None], int]]:
+        """
+        Find the functions with the highest scores.
+
+        Only the `k` highest scores are sorted, so the cost is almost linear in the number of functions.
+
+        :param k: The number of functions.
+        :param component: The component to rank by, one of the fields of `COMPONENT_DTYPE`.
+
+        :return: Up to `k` ((source index, function name), score) pairs in descending order of the score.
+            Functions with equal scores are ordered as in `functions`.
+        """
+
+        values = self.components()[component]
+        k = min(k, len(values))
+        if k <= 0:
+            return []
+
+        # the k-th highest score, of which only the first functions are taken if there are more
+        threshold = np.partition(values, len(values) - k)[len(values) - k]
+        above = np.flatnonzero(values > threshold)
+        candidates = np.union1d(above, np.flatnonzero(values == threshold)[:k - len(above)])
+        order = candidates[np.argsort(-values[candidates], kind="stable")]
+        return [(self.functions[index], int(values[index])) for index in order]
@@ -0,0 +1,440 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import weakref
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, Callable, Iterable, Literal
+
+from modified_cognitive_complexity.analyzer import analyzer_for, analyzer_for_path
+from modified_cognitive_complexity.complexity import FunctionKey
+from modified_cognitive_complexity.frontends import DEFAULT_FRONTEND
+
+if TYPE_CHECKING:
+    from modified_cognitive_complexity.cache import ResultCache
+
+
+type _Source = str | bytes | bytearray | memoryview
+type _Scores = dict[bytes | None, int] | dict[FunctionKey | None, int]
+
+
+class AsyncScorer:
+    """
+    Scores source code from asyncio code without blocking the event loop.
+
+    Parsing and scoring are offloaded to an executor managed by the scorer, either a pool of threads
+    or a pool of processes, each of which reuses a single parser. At most `max_pending` sources are
+    submitted to the executor at any time per event loop; further calls wait without holding a
+    worker. Cancelling a call that is still waiting or queued withdraws its source. A source that
+    is already being scored is finished in the background and keeps its slot until then, so the
+    limit also holds for cancelled calls.
+
+    The process backend keeps the event loop responsive and scales with the number of CPUs, but the
+    sources are transferred to the workers. The thread backend avoids the transfer, but Tree-sitter
+    holds the GIL while parsing, so the event loop is paused while a source is parsed. It only suits
+    many small sources.
+    """
+
+    def __init__(
+        self,
+        *,
+        backend: Literal["thread", "process"] = "process",
+        jobs: int | None = None,
+        max_pending: int | None = None
+    ):
+        """
+        :param backend: Whether the workers are threads or processes.
+        :param jobs: The number of workers. Defaults to the number of CPUs.
+        :param max_pending: The maximum number of sources submitted to the workers at once.
+            Defaults to twice the number of workers.
+        """
+
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        if max_pending is None:
+            max_pending = 2 * jobs
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        if backend == "thread":
+            self._executor: Executor = ThreadPoolExecutor(max_workers=jobs)
+        elif backend == "process":
+            # asyncio applications usually run other threads, which must not be forked
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context(method))
+        else:
+            raise ValueError(f"Unknown backend '{backend}'")
+
+        self.max_pending = max_pending
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self) -> "AsyncScorer":
+        return self
+
+    async def __aexit__(self, *_):
+        await self.aclose()
+
+    async def aclose(self):
+        """Cancel the sources that were not submitted yet and wait for the workers to finish."""
+        await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+
+    async def for_string(
+        self,
+        code: _Source,
+        *,
+        goto_nesting: bool = True,
+        structural_gotos: bool = False,
+        max_complexity: int | None = None,
+        language: str = DEFAULT_FRONTEND,
+        keys: bool = False
+    ) -> _Scores:
+        """
+        Calculate the modified cognitive complexity of each function in the source code.
+
+        See `cognitive_complexity_for_string` for details.
+
+        :param code: The source code.
+        :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+        :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+            by their respective label.
+        :param max_complexity: An optional limit to only find the functions whose score exceeds it,
+            see `cognitive_complexity_for_string`.
+        :param language: The name of the frontend to parse the code with, see `get_frontend`.
+        :param keys: If the functions should be keyed by their `FunctionKey` instead of their name.
+
+        :return: A mapping from each function name to its score. The score of top-level constructs
+            is mapped to the 'None' key.
+        """
+
+        return await self._run(functools.partial(
+            _score_string,
+            code,
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            max_complexity=max_complexity,
+            language=language,
+            keys=keys
+        ))
+
+    async def for_file(
+        self,
+        file: Path,
+        *,
+        goto_nesting: bool = True,
+        structural_gotos: bool = False,
+        cache: "ResultCache | None" = None,
+        max_complexity: int | None = None,
+        language: str | None = None,
+        keys: bool = False
+    ) -> _Scores:
+        """
+        Calculate the modified cognitive complexity of each function in a file.
+
+        See `cognitive_complexity_for_file` for details. The file is also read by the workers.
+
+        :param file: A Path from which the source code is read.
+        :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+        :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+            by their respective label.
+        :param cache: An optional cache, from which the scores are taken if the file content was
+            scored before, and in which newly calculated scores are stored.
+        :param max_complexity: An optional limit to only find the functions whose score exceeds it,
+            see `cognitive_complexity_for_string`.
+        :param language: The name of the frontend to parse the file with instead of detecting it.
+        :param keys: If the functions should be keyed by their `FunctionKey` instead of their name.
+
+        :return: A mapping from each function name to its score. The score of top-level constructs
+            is mapped to the 'None' key.
+        """
+
+        return await self._run(functools.partial(
+            _score_file,
+            file,
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            cache=cache,
+            max_complexity=max_complexity,
+            language=language,
+            keys=keys
+        ))
+
+    async def for_many[K](
+        self,
+        sources: Iterable[tuple[K, _Source]] | AsyncIterable[tuple[K, _Source]],
+        *,
+        ordered: bool = True,
+        goto_nesting: bool = True,
+        structural_gotos: bool = False,
+        max_complexity: int | None = None,
+        language: str = DEFAULT_FRONTEND,
+        keys: bool = False
+    ) -> AsyncIterator[tuple[K, _Scores]]:
+        """
+        Calculate the modified cognitive complexity of many sources concurrently.
+
+        The sources are consumed lazily, e.g. while they are still being downloaded, and at most
+        `max_pending` of them are in flight at any time, so the memory usage is bounded regardless
+        of the length of the input. If the iteration is stopped early, the sources in flight are
+        cancelled.
+
+        :param sources: An iterable or asynchronous iterable of (identifier, source code) pairs.
+            The identifier is passed through unchanged and allows to associate the results with
+            their sources.
+        :param ordered: If the results should be yielded in input order instead of as soon as
+            they are scored.
+        :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+        :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+            by their respective label.
+        :param max_complexity: An optional limit to only find the functions whose score exceeds it,
+            see `cognitive_complexity_for_string`.
+        :param language: The name of the frontend to parse the sources with, see `get_frontend`.
+        :param keys: If the functions should be keyed by their `FunctionKey` instead of their name.
+
+        :return: An asynchronous iterator over (identifier, scores) pairs, where the scores map each
+            function name to its score and the score of top-level constructs is mapped to the 'None' key.
+        """
+
+        async def score(key: K, code: _Source) -> tuple[K, _Scores]:
+            return key, await self.for_string(
+                code,
+                goto_nesting=goto_nesting,
+                structural_gotos=structural_gotos,
+                max_complexity=max_complexity,
+                language=language,
+                keys=keys
+            )
+
+        pending: deque[asyncio.Task] | set[asyncio.Task] = deque() if ordered else set()
+        try:
+            async for key, code in _aiter(sources):
+                while len(pending) >= self.max_pending:
+                    for result in await _next_results(pending):
+                        yield result
+
+                task = asyncio.ensure_future(score(key, code))
+                if ordered:
+                    pending.append(task)
+                else:
+                    pending.add(task)
+
+            while pending:
+                for result in await _next_results(pending):
+                    yield result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _run[R](self, function: Callable[[], R]) -> R:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+
+        await semaphore.acquire()
+        try:
+            future = self._executor.submit(function)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        # release the slot once the worker is done, even if the caller was cancelled before
+        future.add_done_callback(functools.partial(_release, loop, semaphore))
+        return await asyncio.wrap_future(future)
+
+
+@functools.cache
+def default_scorer() -> AsyncScorer:
+    """
+    Get the scorer shared by the `acognitive_complexity_*` helpers.
+
+    It is created on first use and scores on one worker process per CPU.
+    """
+
+    return AsyncScorer()
+
+
+async def acognitive_complexity_for_string(
+    code: _Source,
+    *,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    max_complexity: int | None = None,
+    language: str = DEFAULT_FRONTEND,
+    keys: bool = False
+) -> _Scores:
+    """
+    Asynchronous counterpart of `cognitive_complexity_for_string`, which scores on the `default_scorer`.
+
+    :param code: The source code.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it,
+        see `cognitive_complexity_for_string`.
+    :param language: The name of the frontend to parse the code with, see `get_frontend`.
+    :param keys: If the functions should be keyed by their `FunctionKey` instead of their name.
+
+    :return: A mapping from each function name to its score. The score of top-level constructs
+        is mapped to the 'None' key.
+    """
+
+    return await default_scorer().for_string(
+        code,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        max_complexity=max_complexity,
+        language=language,
+        keys=keys
+    )
+
+
+async def acognitive_complexity_for_file(
+    file: Path,
+    *,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    cache: "ResultCache | None" = None,
+    max_complexity: int | None = None,
+    language: str | None = None,
+    keys: bool = False
+) -> _Scores:
+    """
+    Asynchronous counterpart of `cognitive_complexity_for_file`, which scores on the `default_scorer`.
+
+    :param file: A Path from which the source code is read.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param cache: An optional cache, see `cognitive_complexity_for_file`.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it,
+        see `cognitive_complexity_for_string`.
+    :param language: The name of the frontend to parse the file with instead of detecting it.
+    :param keys: If the functions should be keyed by their `FunctionKey` instead of their name.
+
+    :return: A mapping from each function name to its score. The score of top-level constructs
+        is mapped to the 'None' key.
+    """
+
+    return await default_scorer().for_file(
+        file,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        cache=cache,
+        max_complexity=max_complexity,
+        language=language,
+        keys=keys
+    )
+
+
+def acognitive_complexity_for_many[K](
+    sources: Iterable[tuple[K, _Source]] | AsyncIterable[tuple[K, _Source]],
+    *,
+    ordered: bool = True,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    max_complexity: int | None = None,
+    language: str = DEFAULT_FRONTEND,
+    keys: bool = False
+) -> AsyncIterator[tuple[K, _Scores]]:
+    """
+    Asynchronous counterpart of `cognitive_complexity_for_many`, which scores on the `default_scorer`.
+
+    See `AsyncScorer.for_many` for details.
+
+    :param sources: An iterable or asynchronous iterable of (identifier, source code) pairs.
+    :param ordered: If the results should be yielded in input order instead of as soon as
+        they are scored.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it,
+        see `cognitive_complexity_for_string`.
+    :param language: The name of the frontend to parse the sources with, see `get_frontend`.
+    :param keys: If the functions should be keyed by their `FunctionKey` instead of their name.
+
+    :return: An asynchronous iterator over (identifier, scores) pairs.
+    """
+
+    return default_scorer().for_many(
+        sources,
+        ordered=ordered,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        max_complexity=max_complexity,
+        language=language,
+        keys=keys
+    )
+
+
+# the analyzers are chosen like those of `cognitive_complexity_for_string` and `cognitive_complexity_for_file`
+def _score_string(
+    code: _Source,
+    *,
+    goto_nesting: bool,
+    structural_gotos: bool,
+    max_complexity: int | None,
+    language: str,
+    keys: bool
+) -> _Scores:
+    return analyzer_for(language).for_string(
+        code,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        max_complexity=max_complexity,
+        keys=keys
+    )
+
+
+def _score_file(
+    file: Path,
+    *,
+    goto_nesting: bool,
+    structural_gotos: bool,
+    cache: "ResultCache | None",
+    max_complexity: int | None,
+    language: str | None,
+    keys: bool
+) -> _Scores:
+    analyzer = analyzer_for_path(file) if language is None else analyzer_for(language)
+    return analyzer.for_file(
+        file,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        cache=cache,
+        max_complexity=max_complexity,
+        keys=keys
+    )
+
+
+def _release(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore, _: Future):
+    if loop.is_closed():
+        return
+
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        pass  # the loop was closed in the meantime
+
+
+async def _aiter[T](items: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def _next_results[T](pending: deque[asyncio.Task[T]] | set[asyncio.Task[T]]) -> list[T]:
+    """Wait for the next task in order, or for any task if the pending tasks are unordered."""
+
+    if isinstance(pending, deque):
+        return [await pending.popleft()]
+
+    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    pending.difference_update(done)
+    return [task.result() for task in done]
@@ -0,0 +1,206 @@
+import functools
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from tree_sitter import Language, Parser, Tree
+
+from modified_cognitive_complexity.complexity import FunctionKey, cognitive_complexity_totals
+from modified_cognitive_complexity.frontends import DEFAULT_FRONTEND, Frontend, frontend_for_path, get_frontend
+from modified_cognitive_complexity.source import map_source
+from modified_cognitive_complexity.stats import Stats
+
+if TYPE_CHECKING:
+    from modified_cognitive_complexity.cache import ResultCache
+
+
+class ComplexityAnalyzer:
+    """
+    Calculates the modified cognitive complexity of source code with reusable parsers.
+
+    Constructing a Tree-sitter `Language` and `Parser` is comparatively expensive, so an
+    analyzer creates the language once and keeps one parser per thread, which is reused
+    for every call made from that thread. An analyzer can therefore be shared between threads.
+    """
+
+    def __init__(self, language: Language | None = None, *, frontend: Frontend | str | None = None):
+        """
+        :param language: The Tree-sitter language used for parsing. Defaults to the language of the frontend.
+        :param frontend: The frontend, or its name, whose grammar and node types are used, see
+            `get_frontend`. Defaults to C++, which covers C as well.
+        """
+
+        if frontend is None:
+            frontend = DEFAULT_FRONTEND
+        if isinstance(frontend, str):
+            frontend = get_frontend(frontend)
+
+        self.frontend = frontend
+        self.language = frontend.language() if language is None else language
+        self._local = threading.local()
+
+    @property
+    def parser(self) -> Parser:
+        """The parser of the calling thread."""
+
+        try:
+            return self._local.parser
+        except AttributeError:
+            parser = self._local.parser = Parser(self.language)
+            return parser
+
+    def parse(self, code: str | bytes | bytearray | memoryview | mmap.mmap, *, stats: Stats | None = None) -> Tree:
+        """
+        Parse source code with the parser of the calling thread.
+
+        :param code: The source code.
+        :param stats: Optional statistics, to which the time of parsing is added.
+
+        :return: The syntax tree of the source code.
+        """
+
+        if isinstance(code, str):
+            code = code.encode()
+
+        if stats is None:
+            return self.parser.parse(code)
+
+        start = time.perf_counter()
+        tree = self.parser.parse(code)
+        stats.parse_seconds += time.perf_counter() - start
+        return tree
+
+    def for_file(
+        self,
+        file: Path,
+        *,
+        goto_nesting: bool = True,
+        structural_gotos: bool = False,
+        cache: "ResultCache | None" = None,
+        stats: Stats | None = None,
+        max_complexity: int | None = None,
+        keys: bool = False
+    ) -> dict[bytes | None, int] | dict[FunctionKey | None, int]:
+        """
+        Calculate the modified cognitive complexity of each function in a file.
+
+        See `cognitive_complexity_for_file` for details. The file is memory-mapped, if possible,
+        so that it is parsed and hashed for the cache without copying it.
+
+        :param file: A Path from which the source code is read.
+        :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+        :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+            by their respective label.
+        :param cache: An optional cache, from which the scores are taken if the file content was 
+            scored before, and in which newly calculated scores are stored.
+        :param stats: Optional statistics of parsing and scoring, see `Stats`. Cached files are not included.
+        :param max_complexity: An optional limit to only find the functions whose score exceeds it, see
+            `cognitive_complexity_totals`. Cached scores are used and filtered, but scores calculated
+            with a limit are not stored in the cache.
+        :param keys: If functions should be identified by a `FunctionKey` instead of their name,
+            see `cognitive_complexity`. The keys are part of the cached scores.
+
+        :return: A mapping from each function name or key to its score. The score of top-level
+            constructs is mapped to the 'None' key.
+        """
+
+        options = {"goto_nesting": goto_nesting, "structural_gotos": structural_gotos, "keys": keys}
+        with map_source(file) as code:
+            if cache is None:
+                return self.for_string(code, **options, stats=stats, max_complexity=max_complexity)
+
+            key = cache.key(code, **options, grammar=self.frontend.distribution)
+            scores = cache.get(key)
+            if scores is not None:
+                if max_complexity is None:
+                    return scores
+                return {function_name: total for function_name, total in scores.items() if total > max_complexity}
+
+            scores = self.for_string(code, **options, stats=stats, max_complexity=max_complexity)
+            if max_complexity is None:
+                cache.put(key, scores)
+
+            return scores
+
+    def for_string(
+        self,
+        code: str | bytes | bytearray | memoryview | mmap.mmap,
+        *,
+        goto_nesting: bool = True,
+        structural_gotos: bool = False,
+        stats: Stats | None = None,
+        max_complexity: int | None = None,
+        keys: bool = False
+    ) -> dict[bytes | None, int] | dict[FunctionKey | None, int]:
+        """
+        Calculate the modified cognitive complexity of each function in the source code.
+
+        See `cognitive_complexity_for_string` for details.
+
+        :param code: The source code.
+        :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+        :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+            by their respective label.
+        :param stats: Optional statistics of parsing and scoring, see `Stats`.
+        :param max_complexity: An optional limit to only find the functions whose score exceeds it,
+            see `cognitive_complexity_totals`.
+        :param keys: If functions should be identified by a `FunctionKey` instead of their name,
+            see `cognitive_complexity`.
+
+        :return: A mapping from each function name or key to its score. The score of top-level
+            constructs is mapped to the 'None' key.
+        """
+
+        tree = self.parse(code, stats=stats)
+        return cognitive_complexity_totals(
+            tree.walk(),
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            stats=stats,
+            max_complexity=max_complexity,
+            node_types=self.frontend.node_types,
+            keys=keys
+        )
+
+
+def default_analyzer() -> ComplexityAnalyzer:
+    """
+    Get the analyzer shared by the `cognitive_complexity_for_*` helpers for source code of unknown language.
+
+    It is created on first use and parses C++, which covers C as well.
+    """
+
+    return analyzer_for(DEFAULT_FRONTEND)
+
+
+def analyzer_for(frontend: Frontend | str) -> ComplexityAnalyzer:
+    """
+    Get the analyzer shared for a frontend.
+
+    Each analyzer is created on first use, so each grammar is loaded once per process.
+
+    :param frontend: The frontend or its name, see `get_frontend`.
+    """
+
+    if isinstance(frontend, str):
+        frontend = get_frontend(frontend)
+
+    return _shared_analyzer(frontend)
+
+
+def analyzer_for_path(path: str | os.PathLike[str]) -> ComplexityAnalyzer:
+    """
+    Get the analyzer shared for the frontend of a source file, which is detected by its suffix.
+
+    :param path: The path of the source file, see `frontend_for_path`.
+    """
+
+    return _shared_analyzer(frontend_for_path(path))
+
+
+@functools.cache
+def _shared_analyzer(frontend: Frontend) -> ComplexityAnalyzer:
+    return ComplexityAnalyzer(frontend=frontend)
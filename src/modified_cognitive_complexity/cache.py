@@ -0,0 +1,189 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from tree_sitter import Point
+
+from modified_cognitive_complexity.complexity import FunctionKey
+
+
+_FORMAT_VERSION = 2
+
+
+@functools.cache
+def _version(distribution: str) -> str:
+    import importlib.metadata  # slow to import and only needed once the first key is created
+
+    try:
+        return importlib.metadata.version(distribution)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class ResultCache:
+    """
+    A persistent, content-addressed cache for the per-function scores of source code.
+
+    Each entry is stored in its own file, named after a hash of the source code, the scoring
+    options, and the versions of this package, Tree-sitter and the grammar the code is parsed with.
+    Entries are written atomically, so multiple processes can share a cache directory.
+
+    Once the entries exceed the maximum size, the least recently used entries are evicted.
+    The modification time of an entry file is updated whenever it is read and serves as its
+    last use.
+    """
+
+    def __init__(self, directory: Path, *, max_size: int = 256 * 1024 * 1024):
+        """
+        :param directory: The directory the entries are stored in. It is created if necessary.
+        :param max_size: The maximum size of all entries in bytes.
+        """
+
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._written = 0
+        self._salt = "\0".join((
+            str(_FORMAT_VERSION),
+            _version("modified_cognitive_complexity"),
+            _version("tree-sitter"),
+            _version("tree-sitter-cpp"),
+        )).encode()
+
+    def key(
+        self,
+        code: bytes,
+        *,
+        goto_nesting: bool = True,
+        structural_gotos: bool = False,
+        grammar: str = "tree-sitter-cpp",
+        keys: bool = False
+    ) -> str:
+        """
+        Calculate the key of the scores of source code.
+
+        :param code: The source code.
+        :param goto_nesting: If the additional nesting penalty imposed by gotos is applied.
+        :param structural_gotos: If goto statements inherit a nesting penalty by their respective label.
+        :param grammar: The distribution of the grammar the code is parsed with, see `Frontend`.
+        :param keys: If the functions are identified by a `FunctionKey` instead of their name.
+
+        :return: The hex digest identifying the entry.
+        """
+
+        digest = hashlib.sha256(self._salt)
+        if grammar != "tree-sitter-cpp":
+            # keeps the keys of C++ sources stable, as the salt only includes the C++ grammar
+            digest.update(f"\0{grammar}\0{_version(grammar)}".encode())
+        digest.update(bytes((goto_nesting, structural_gotos, keys)))
+        digest.update(code)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> dict[bytes | FunctionKey | None, int] | None:
+        """
+        Look up cached scores and count the access as hit or miss.
+
+        :param key: The key of the entry, see `key`.
+
+        :return: A mapping from each function name or `FunctionKey`, as stored, to its score or
+            `None`, if there is no entry.
+        """
+
+        path = self._path(key)
+        try:
+            scores = dict(map(_decode_record, json.loads(path.read_bytes())))
+        except (OSError, ValueError, TypeError):
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted concurrently
+
+        self.hits += 1
+        return scores
+
+    def put(self, key: str, scores: dict[bytes | FunctionKey | None, int]):
+        """
+        Store scores, evicting old entries if the cache grew too large.
+
+        :param key: The key of the entry, see `key`.
+        :param scores: A mapping from each function name or `FunctionKey` to its score.
+        """
+
+        data = json.dumps([_encode_record(function, total) for function, total in scores.items()]).encode()
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file first, so that readers never see a partial entry
+        fd, temporary = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        self._written += len(data)
+        if self._written > self.max_size // 8:
+            self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the entries fit into the maximum size."""
+
+        self._written = 0
+
+        entries: list[tuple[float, int, Path]] = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass  # evicted concurrently
+            size -= entry_size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+
+def _encode_record(function: bytes | FunctionKey | None, total: int) -> list:
+    """Convert the score of a function into a JSON array. A key is stored with its position after the name and score."""
+
+    if isinstance(function, FunctionKey):
+        name = function.name.decode(errors="surrogateescape")
+        return [name, total, function.start.row, function.start.column, function.start_byte, function.end_byte]
+
+    return [None if function is None else function.decode(errors="surrogateescape"), total]
+
+
+def _decode_record(record: list) -> tuple[bytes | FunctionKey | None, int]:
+    """Convert a JSON array of `_encode_record` back into the function and its score."""
+
+    name, total, *position = record
+    if name is None:
+        return None, total
+
+    name = name.encode(errors="surrogateescape")
+    if position:
+        row, column, start_byte, end_byte = position
+        return FunctionKey(name, Point(row, column), start_byte, end_byte), total
+
+    return name, total
@@ -1,74 +1,586 @@
+import mmap
 import sys
 from collections import defaultdict
-from typing import Annotated
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, Iterable, Iterator
 
-import tree_sitter_cpp
+import click
 import typer
-from tree_sitter import Language, Parser
+from typer.core import TyperGroup
 
-from modified_cognitive_complexity.complexity import cognitive_complexity, Score
+# Modules of this package are imported by the commands that need them, so that `--help` and each
+# command only load what they use. In particular, Tree-sitter and the grammar are not loaded to
+# show the help, and process pools, git and the server only when they are used.
+if TYPE_CHECKING:
+    from modified_cognitive_complexity.cache import ResultCache
+    from modified_cognitive_complexity.complexity import FunctionKey, Score, Scores
+    from modified_cognitive_complexity.gitdiff import FunctionDelta
+    from modified_cognitive_complexity.index import DirectoryRollup, IndexedFunction
+    from modified_cognitive_complexity.output import RecordWriter
+    from modified_cognitive_complexity.stats import Stats
 
-app = typer.Typer()
 
+class _DefaultCommandGroup(TyperGroup):
+    """Runs the `score` command, unless the arguments start with the name of another command or an option of the group."""
 
-@app.command()
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        group_options = {opt for param in self.get_params(ctx) for opt in param.opts}
+        if not args or (args[0] not in self.commands and args[0] not in group_options):
+            args = ["score", *args]
+
+        return super().parse_args(ctx, args)
+
+
+app = typer.Typer(cls=_DefaultCommandGroup)
+
+
+class OutputFormat(str, Enum):
+    text = "text"
+    jsonl = "jsonl"
+    csv = "csv"
+    json = "json"
+
+
+@app.command("score")
 def main(
+    paths: Annotated[list[str] | None, typer.Argument(help="Files, directories or glob patterns to score. Reads a single translation unit from stdin if omitted.", show_default=False)] = None,
     annotate: Annotated[bool, typer.Option(help="Display per-line complexity annotations instead of a single summary value.")] = False,
     goto_nesting: Annotated[bool, typer.Option(help="Apply nesting by gotos.")] = True,
-    structural_gotos: Annotated[bool, typer.Option(help="Apply nesting to gotos by their respective labels.")] = False
+    structural_gotos: Annotated[bool, typer.Option(help="Apply nesting to gotos by their respective labels.")] = False,
+    jobs: Annotated[int, typer.Option("--jobs", "-j", min=0, help="Number of worker processes used to score files, or the functions of a single translation unit read from stdin. 0 uses one per CPU.")] = 1,
+    ordered: Annotated[bool, typer.Option(help="Report files in the order they were found instead of as soon as they are scored.")] = False,
+    cache_dir: Annotated[Path | None, typer.Option(envvar="MODIFIED_CC_CACHE_DIR", file_okay=False, help="Cache the scores of files in this directory and reuse them for unchanged files.", show_default=False)] = None,
+    no_cache: Annotated[bool, typer.Option("--no-cache", help="Neither read nor write cached scores, even if a cache directory is configured.")] = False,
+    cache_size: Annotated[int, typer.Option(min=1, help="Maximum size of the cache in MiB. The least recently used entries are evicted.")] = 256,
+    output_format: Annotated[OutputFormat, typer.Option("--format", "-f", help="Output format. All formats except text write one record per function.")] = OutputFormat.text,
+    locations: Annotated[bool, typer.Option(help="Additionally write one record per scored location. Not supported by the text format.")] = False,
+    stats: Annotated[bool, typer.Option("--stats", help="Print node visits, goto counts and the time spent parsing, traversing and in the goto pass to stderr.")] = False,
+    fail_over: Annotated[int | None, typer.Option("--fail-over", min=0, metavar="N", help="Only report functions whose complexity exceeds N and exit with code 1 if there are any. Scoring a function stops once it exceeds N, so the reported complexity is a lower bound.", show_default=False)] = None,
+    language: Annotated[str | None, typer.Option("--language", "-l", help="The grammar to parse with, e.g. 'c' or 'cpp'. By default, it is detected by the suffix of each file and stdin is parsed as C++.", show_default=False)] = None,
+    keys: Annotated[bool, typer.Option("--keys", help="Report functions with the same name, e.g. overloads, separately, identified by their start row and byte offset.")] = False
 ):
-    data = sys.stdin.buffer.read()
+    """Score source files or a single translation unit read from stdin. This is the default command."""
 
-    lang = Language(tree_sitter_cpp.language())
-    parser = Parser(lang)
-    tree = parser.parse(data)
+    from modified_cognitive_complexity.frontends import DEFAULT_FRONTEND, get_frontend
+    from modified_cognitive_complexity.output import record_writer
+    from modified_cognitive_complexity.source import map_source
+    from modified_cognitive_complexity.stats import Stats
 
-    function_scores: dict
-    scores_by_function = cognitive_complexity(tree.walk(), goto_nesting=goto_nesting, structural_gotos=structural_gotos)
+    if language is not None:
+        try:
+            language = get_frontend(language).name
+        except LookupError as e:
+            raise typer.BadParameter(str(e), param_hint="--language")
 
-    if annotate:
-        lines = data.replace(b'\t', b'    ').decode().splitlines()
-        indent = max(len(line) for line in lines)
+    writer = None
+    if output_format != OutputFormat.text:
+        if annotate:
+            raise typer.BadParameter("Annotations are only supported by the text format.", param_hint="--annotate")
+        writer = record_writer(output_format.value, sys.stdout)
+    elif locations:
+        raise typer.BadParameter("Locations are not supported by the text format.", param_hint="--locations")
 
-        cost_by_line: dict[int, list[Score]] = defaultdict(list)
-        for _, scores in scores_by_function.items():
-            for location, cost in scores:
-                cost_by_line[location.start.row].append(cost)
+    if annotate and fail_over is not None:
+        raise typer.BadParameter("Annotations are not supported with a complexity limit.", param_hint="--annotate")
 
-        costs_increment = ["+".join(str(cost.increment) for cost in cost_by_line[i]) for i in range(len(lines))]
-        costs_nesting = ["+".join(str(0 if cost.nesting is None else cost.nesting.value) for cost in cost_by_line[i]) for i in range(len(lines))]
-        costs_goto = ["+".join(str(0 if cost.nesting is None else cost.nesting.goto) for cost in cost_by_line[i]) for i in range(len(lines))]
+    if paths:
+        if annotate:
+            raise typer.BadParameter("Annotations are only supported when reading from stdin.", param_hint="--annotate")
 
-        max_increment = max(3, max(len(s) for s in costs_increment))
-        max_nesting = max(4, max(len(s) for s in costs_nesting))
-        max_goto = max(4, max(len(s) for s in costs_goto))
+        cache = None
+        if not no_cache and cache_dir is not None:
+            from modified_cognitive_complexity.cache import ResultCache
+            cache = ResultCache(cache_dir, max_size=cache_size * 1024 * 1024)
 
-        prefix = " // "
-        print(f"{' ' * indent}{' ' * len(prefix)}{'Inc': ^{max_increment}} {'Nest': ^{max_nesting}} {'Goto': ^{max_goto}}")
-        for line, c_increment, c_nesting, c_goto in zip(lines, costs_increment, costs_nesting, costs_goto):
-            print(f"{line: <{indent}}{prefix}{c_increment: >{max_increment}} {c_nesting: >{max_nesting}} {c_goto: >{max_goto}}")
-        
-        print("")
+        _main_files(
+            paths,
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            jobs=jobs,
+            ordered=ordered,
+            cache=cache,
+            writer=writer,
+            locations=locations,
+            stats=stats,
+            max_complexity=fail_over,
+            language=language,
+            keys=keys
+        )
+        return
+
+    if stats and jobs != 1:
+        raise typer.BadParameter("Statistics are not supported when scoring the functions read from stdin in parallel.", param_hint="--stats")
+
+    with map_source(sys.stdin.buffer) as data:
+        _main_stdin(
+            data,
+            annotate=annotate,
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            jobs=jobs,
+            writer=writer,
+            locations=locations,
+            stats=Stats() if stats else None,
+            max_complexity=fail_over,
+            language=DEFAULT_FRONTEND if language is None else language,
+            keys=keys
+        )
+
+
+@app.command("diff")
+def diff(
+    revisions: Annotated[str, typer.Argument(help="The revisions to compare as BASE..HEAD, BASE...HEAD to compare against the merge base, or BASE to compare against HEAD.")],
+    paths: Annotated[list[str] | None, typer.Argument(help="Limit the comparison to these files or directories.", show_default=False)] = None,
+    goto_nesting: Annotated[bool, typer.Option(help="Apply nesting by gotos.")] = True,
+    structural_gotos: Annotated[bool, typer.Option(help="Apply nesting to gotos by their respective labels.")] = False,
+    output_format: Annotated[OutputFormat, typer.Option("--format", "-f", help="Output format. All formats except text write one record per function.")] = OutputFormat.text
+):
+    """Score only the functions changed between two git revisions and report their complexity deltas."""
+
+    from modified_cognitive_complexity.gitdiff import GitError, diff_revisions, parse_revisions
+    from modified_cognitive_complexity.output import DELTA_FIELDS, delta_records, record_writer
+
+    try:
+        base, head = parse_revisions(revisions)
+        deltas = diff_revisions(base, head, paths=paths or (), goto_nesting=goto_nesting, structural_gotos=structural_gotos)
+
+        if output_format != OutputFormat.text:
+            writer = record_writer(output_format.value, sys.stdout, DELTA_FIELDS)
+            writer.write(delta_records(deltas))
+            writer.close()
+            return
+
+        _print_deltas(deltas)
+    except GitError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise typer.Exit(code=1)
+
+
+@app.command("index")
+def index(
+    paths: Annotated[list[str] | None, typer.Argument(help="Files, directories or glob patterns to index.", show_default="the current directory")] = None,
+    database: Annotated[Path, typer.Option("--database", "-d", envvar="MODIFIED_CC_INDEX", dir_okay=False, help="The index database. Paths are stored relative to its directory.")] = Path(".modified_cc.db"),
+    goto_nesting: Annotated[bool, typer.Option(help="Apply nesting by gotos.")] = True,
+    structural_gotos: Annotated[bool, typer.Option(help="Apply nesting to gotos by their respective labels.")] = False,
+    jobs: Annotated[int, typer.Option("--jobs", "-j", min=0, help="Number of worker processes used to score files. 0 uses one per CPU.")] = 1,
+    locations: Annotated[bool, typer.Option(help="Additionally store the score of each location.")] = False,
+    language: Annotated[str | None, typer.Option("--language", "-l", help="The grammar to parse with, e.g. 'c' or 'cpp'. By default, it is detected by the suffix of each file.", show_default=False)] = None,
+    keys: Annotated[bool, typer.Option("--keys", help="Store functions with the same name, e.g. overloads, separately, identified by their start row and byte offset.")] = False
+):
+    """Store the complexity of each function in an index, scoring only files that changed since the last run."""
+
+    from modified_cognitive_complexity.index import ProjectIndex
+
+    with ProjectIndex(database) as project_index:
+        summary = project_index.refresh(
+            paths or ["."],
+            jobs=jobs,
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            locations=locations,
+            language=language,
+            keys=keys
+        )
+
+    for path, error in summary.errors:
+        print(f"Error: Could not read '{path}': {error}", file=sys.stderr)
+    print(f"Index: {summary.scored} scored, {summary.unchanged} unchanged, {summary.removed} removed", file=sys.stderr)
+
+    if summary.errors:
+        raise typer.Exit(code=1)
+
+
+@app.command("query")
+def query(
+    prefix: Annotated[str | None, typer.Argument(help="Limit the query to this file or directory.", show_default=False)] = None,
+    database: Annotated[Path, typer.Option("--database", "-d", envvar="MODIFIED_CC_INDEX", dir_okay=False, help="The index database, see the index command.")] = Path(".modified_cc.db"),
+    top: Annotated[int | None, typer.Option(min=1, metavar="K", help="Report the K most complex functions. This is the default, with K = 50.", show_default=False)] = None,
+    over: Annotated[int | None, typer.Option(min=0, metavar="N", help="Report all functions whose complexity exceeds N.", show_default=False)] = None,
+    rollup: Annotated[int | None, typer.Option(min=1, metavar="DEPTH", help="Report the complexity per directory, aggregated to DEPTH levels.", show_default=False)] = None,
+    output_format: Annotated[OutputFormat, typer.Option("--format", "-f", help="Output format. All formats except text write one record per function or directory.")] = OutputFormat.text
+):
+    """Query the index for the most complex functions, functions over a threshold, or the complexity per directory, without parsing."""
+
+    from modified_cognitive_complexity.index import ProjectIndex
+    from modified_cognitive_complexity.output import FIELDS, ROLLUP_FIELDS, record_writer, rollup_records
+
+    if sum(option is not None for option in (top, over, rollup)) > 1:
+        raise typer.BadParameter("Only one of --top, --over and --rollup can be given.", param_hint="--top")
+
+    try:
+        project_index = ProjectIndex(database, create=False)
+    except FileNotFoundError as e:
+        print(f"Error: {e}. Create it with the index command.", file=sys.stderr)
+        raise typer.Exit(code=1)
+
+    with project_index:
+        if rollup is not None:
+            rollups = project_index.rollup(depth=rollup, prefix=prefix)
+            if output_format != OutputFormat.text:
+                writer = record_writer(output_format.value, sys.stdout, ROLLUP_FIELDS)
+                writer.write(rollup_records(rollups))
+                writer.close()
+            else:
+                _print_rollups(rollups)
+            return
+
+        if over is not None:
+            functions = project_index.over(over, prefix=prefix)
+        else:
+            functions = project_index.top(50 if top is None else top, prefix=prefix)
+
+    if output_format != OutputFormat.text:
+        writer = record_writer(output_format.value, sys.stdout, (*FIELDS[:4], "start_row", "start_byte"))
+        writer.write(_indexed_records(functions))
+        writer.close()
+    else:
+        _print_indexed(functions)
+
+
+@app.command("serve")
+def serve(
+    host: Annotated[str, typer.Option(help="The host to listen on.")] = "127.0.0.1",
+    port: Annotated[int, typer.Option(help="The port to listen on. 0 selects a free port.")] = 8765,
+    socket: Annotated[Path | None, typer.Option(help="Listen on this Unix socket instead of a TCP port.", show_default=False)] = None,
+    jobs: Annotated[int, typer.Option("--jobs", "-j", min=0, help="Number of worker processes. 1 scores on a single worker thread, 0 uses one worker per CPU.")] = 1,
+    max_pending: Annotated[int, typer.Option(min=1, help="Maximum number of sources queued at any time. Further requests are rejected until the queue drains.")] = 64,
+    root: Annotated[Path | None, typer.Option(exists=True, file_okay=False, help="Only score files in this directory. Relative paths of requests are resolved against it.", show_default=False)] = None
+):
+    """Run a server that scores sources sent over HTTP with warm parsers, until interrupted."""
+
+    from modified_cognitive_complexity.server import AnalysisServer
+
+    address = (host, port) if socket is None else socket
+    with AnalysisServer(address, jobs=jobs, max_pending=max_pending, root=root) as server:
+        address = server.address
+        print(f"Listening on {address if socket is not None else f'http://{address[0]}:{address[1]}'}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def _main_stdin(
+    data: bytes | mmap.mmap,
+    *,
+    annotate: bool,
+    goto_nesting: bool,
+    structural_gotos: bool,
+    jobs: int,
+    writer: "RecordWriter | None",
+    locations: bool,
+    stats: "Stats | None",
+    max_complexity: int | None,
+    language: str,
+    keys: bool
+):
+    from modified_cognitive_complexity.output import records
+
+    totals = not annotate and not locations
+    if jobs == 1:
+        from modified_cognitive_complexity.analyzer import analyzer_for
+        from modified_cognitive_complexity.complexity import cognitive_complexity, cognitive_complexity_totals
+
+        analyzer = analyzer_for(language)
+        tree = analyzer.parse(data, stats=stats)
+        score = cognitive_complexity_totals if totals else cognitive_complexity
+        scores_by_function = score(
+            tree.walk(),
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            stats=stats,
+            max_complexity=max_complexity,
+            node_types=analyzer.frontend.node_types,
+            keys=keys
+        )
+        del tree
+    else:
+        from modified_cognitive_complexity.helpers import cognitive_complexity_parallel
+
+        scores_by_function = cognitive_complexity_parallel(
+            data,
+            jobs=jobs or None,
+            totals=totals,
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            max_complexity=max_complexity,
+            language=language,
+            keys=keys
+        )
+
+    if stats is not None:
+        _print_stats(stats)
+
+    if writer is not None:
+        writer.write(records(None, scores_by_function, partial=max_complexity is not None))
+        writer.close()
+    elif max_complexity is not None:
+        _print_exceeding(scores_by_function)
+        _print_limit_summary(len(scores_by_function), max_complexity)
+
+    if max_complexity is not None and scores_by_function:
+        raise typer.Exit(code=1)
+    if writer is not None or max_complexity is not None:
+        return
+
+    if not annotate:
+        _print_summary(scores_by_function)
+        return
+
+    _print_annotated(data, scores_by_function)
+    print("")
 
+    _print_summary({
+        func_name: sum(cost.total for _, cost in function_scores)
+        for func_name, function_scores in scores_by_function.items()
+    })
 
-    total_cost = sum(
-        sum(cost.total for _, cost in scores) for scores in scores_by_function.values()
+
+def _print_annotated(data: bytes | mmap.mmap, scores_by_function: "dict[bytes | None, Scores]"):
+    """Print the source code with the scores of each line, decoding only one line at a time."""
+
+    cost_by_line: "dict[int, list[Score]]" = defaultdict(list)
+    for _, scores in scores_by_function.items():
+        for location, cost in scores:
+            cost_by_line[location.start.row].append(cost)
+
+    costs_increment = {i: "+".join(str(cost.increment) for cost in costs) for i, costs in cost_by_line.items()}
+    costs_nesting = {i: "+".join(str(0 if cost.nesting is None else cost.nesting.value) for cost in costs) for i, costs in cost_by_line.items()}
+    costs_goto = {i: "+".join(str(0 if cost.nesting is None else cost.nesting.goto) for cost in costs) for i, costs in cost_by_line.items()}
+
+    max_increment = max(3, max(map(len, costs_increment.values()), default=0))
+    max_nesting = max(4, max(map(len, costs_nesting.values()), default=0))
+    max_goto = max(4, max(map(len, costs_goto.values()), default=0))
+
+    # the lines are decoded twice, first to determine the width of the longest line
+    indent = max((len(line) for line in _lines(data)), default=0)
+
+    prefix = " // "
+    print(f"{' ' * indent}{' ' * len(prefix)}{'Inc': ^{max_increment}} {'Nest': ^{max_nesting}} {'Goto': ^{max_goto}}")
+    for i, line in enumerate(_lines(data)):
+        c_increment = costs_increment.get(i, "")
+        c_nesting = costs_nesting.get(i, "")
+        c_goto = costs_goto.get(i, "")
+        print(f"{line: <{indent}}{prefix}{c_increment: >{max_increment}} {c_nesting: >{max_nesting}} {c_goto: >{max_goto}}")
+
+
+def _lines(data: bytes | mmap.mmap) -> Iterator[str]:
+    """Iterate over the decoded lines of the source code, with tabs expanded to four spaces."""
+
+    start = 0
+    end = len(data)
+    while start < end:
+        stop = data.find(b"\n", start)
+        if stop < 0:
+            stop = end
+
+        line = data[start:stop]
+        if line.endswith(b"\r"):
+            line = line[:-1]
+
+        yield line.replace(b"\t", b"    ").decode(errors="replace")
+        start = stop + 1
+
+
+def _main_files(
+    paths: list[str],
+    *,
+    goto_nesting: bool,
+    structural_gotos: bool,
+    jobs: int,
+    ordered: bool,
+    cache: "ResultCache | None",
+    writer: "RecordWriter | None",
+    locations: bool,
+    stats: bool,
+    max_complexity: int | None,
+    language: str | None,
+    keys: bool
+):
+    from modified_cognitive_complexity.output import records
+    from modified_cognitive_complexity.scan import iter_source_files, score_files
+    from modified_cognitive_complexity.stats import Stats
+
+    files = iter_source_files(paths)
+    failed = False
+    exceeding = 0
+    hits = misses = 0
+    total_stats = Stats()
+
+    results = score_files(
+        files,
+        jobs=jobs,
+        ordered=ordered,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        cache=cache,
+        locations=locations,
+        stats=stats,
+        max_complexity=max_complexity,
+        language=language,
+        keys=keys
     )
+    for result in results:
+        if result.scores is None:
+            failed = True
+            print(f"Error: Could not read '{result.path}': {result.error}", file=sys.stderr)
+            continue
+
+        if result.cached:
+            hits += 1
+        else:
+            misses += 1
+
+        if result.stats is not None:
+            total_stats.update(result.stats)
+
+        exceeding += len(result.scores)
+
+        if writer is not None:
+            writer.write(records(result.path, result.locations if locations else result.scores, partial=max_complexity is not None))
+            continue
+
+        if max_complexity is not None:
+            if result.scores:
+                print(f"File '{result.path}'")
+                _print_exceeding(result.scores)
+                print("", flush=True)
+            continue
+
+        print(f"File '{result.path}'")
+        _print_summary(result.scores)
+        print("", flush=True)
+
+    if writer is not None:
+        writer.close()
+    elif max_complexity is not None:
+        _print_limit_summary(exceeding, max_complexity)
+
+    if cache is not None:
+        cache.evict()
+        print(f"Cache: {hits} hits, {misses} misses", file=sys.stderr)
+
+    if stats:
+        _print_stats(total_stats)
+
+    if failed or (max_complexity is not None and exceeding):
+        raise typer.Exit(code=1)
+
+
+def _print_deltas(deltas: "Iterable[FunctionDelta]"):
+    path = None
+    total = 0
+    for delta in deltas:
+        if delta.path != path:
+            if path is not None:
+                print("")
+            path = delta.path
+            print(f"File '{path}'")
+
+        if delta.function is None:
+            name = "Top-level complexity"
+        else:
+            name = f"Function '{delta.function.decode(errors="replace")}'"
+
+        before = "-" if delta.before is None else delta.before
+        after = "-" if delta.after is None else delta.after
+        print(f"{name}: {before} -> {after} ({delta.delta:+d})", flush=True)
+        total += delta.delta
+
+    if path is not None:
+        print("")
+    print(f"Total delta of Modified Cognitive Complexity: {total:+d}")
+
+
+def _indexed_records(functions: "Iterable[IndexedFunction]") -> Iterator[dict]:
+    for function in functions:
+        record = {
+            "kind": "function",
+            "file": function.path,
+            "function": None if function.function is None else function.function.decode(errors="replace"),
+            "total": function.total,
+        }
+        if function.start_byte is not None:
+            record["start_row"] = function.start_row
+            record["start_byte"] = function.start_byte
+        yield record
+
+
+def _print_indexed(functions: "Iterable[IndexedFunction]"):
+    for function in functions:
+        if function.function is None:
+            print(f"Top-level complexity of '{function.path}': {function.total}")
+        elif function.start_row is None:
+            print(f"Function '{function.function.decode(errors='replace')}' in '{function.path}': {function.total}")
+        else:
+            print(f"Function '{function.function.decode(errors='replace')}' in '{function.path}' at line {function.start_row + 1}: {function.total}")
+
+
+def _print_rollups(rollups: "Iterable[DirectoryRollup]"):
+    for rollup in rollups:
+        print(
+            f"Directory '{rollup.directory}': {rollup.files} {'file' if rollup.files == 1 else 'files'}, "
+            f"{rollup.functions} {'function' if rollup.functions == 1 else 'functions'}, "
+            f"total complexity {rollup.total}, max {rollup.max}"
+        )
+
+
+def _print_stats(stats: "Stats"):
+    def line(text: str):
+        print(text, file=sys.stderr)
+
+    line(f"Parse: {stats.parse_seconds * 1e3:.2f}ms")
+    line(f"Traversal: {stats.traversal_seconds * 1e3:.2f}ms")
+    line(f"Goto pass: {stats.goto_seconds * 1e3:.2f}ms")
+    line(f"Gotos: {stats.gotos}, labels: {stats.labels}")
+    line(f"Binary expressions: {stats.binary_expressions} ({stats.expression_visits.total()} nodes in expressions)")
+    line(f"Nodes skipped: {stats.skipped_nodes}")
+    line(f"Nodes visited: {stats.node_visits.total()}")
+    for node_type, count in stats.node_visits.most_common():
+        line(f"  {node_type}: {count}")
+
+
+def _print_exceeding(scores_by_function: "dict[bytes | FunctionKey | None, int] | dict[bytes | FunctionKey | None, Scores]"):
+    for func_name, scores in scores_by_function.items():
+        func_total = scores if isinstance(scores, int) else sum(cost.total for _, cost in scores)
+        if func_name is None:
+            print(f"Top-level complexity: {func_total}")
+        else:
+            print(f"Function {_function_label(func_name)}: {func_total}")
+
+
+def _print_limit_summary(count: int, max_complexity: int):
+    if count:
+        print(f"{count} {'function exceeds' if count == 1 else 'functions exceed'} a Modified Cognitive Complexity of {max_complexity}")
+    else:
+        print(f"No function exceeds a Modified Cognitive Complexity of {max_complexity}")
+
+
+def _print_summary(totals_by_function: "dict[bytes | FunctionKey | None, int]"):
+    total_cost = sum(totals_by_function.values())
     print(f"Total Modified Cognitive Complexity: {total_cost}")
     
-    if len(scores_by_function) > 1:
+    if len(totals_by_function) > 1:
         print("")
         print("Complexity by function:")
     
-        for func_name, function_scores in scores_by_function.items():
+        for func_name, func_total in totals_by_function.items():
             if func_name is None:
                 continue
             
-            func_total = sum(cost.total for _, cost in function_scores)
-            func_name = func_name.decode(errors="replace")
-            print(f"Function '{func_name}': {func_total}")
+            print(f"Function {_function_label(func_name)}: {func_total}")
+
+        print(f"Top-level complexity: {totals_by_function[None]}")
+
+
+def _function_label(function: "bytes | FunctionKey") -> str:
+    """The quoted name of a function, followed by its line if it is identified by a `FunctionKey`."""
+
+    if isinstance(function, bytes):
+        return f"'{function.decode(errors='replace')}'"
 
-        print(f"Top-level complexity: {sum(cost.total for _, cost in scores_by_function[None])}")
+    return f"'{function.name.decode(errors='replace')}' at line {function.start.row + 1}"
 
 
 if __name__ == "__main__":
@@ -1,8 +1,15 @@
-import dataclasses
-from dataclasses import dataclass
-from typing import Iterator
+import copyreg
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import pairwise
+from typing import Any, Callable
 
-from tree_sitter import TreeCursor, Point
+from tree_sitter import Node, TreeCursor, Point
+
+from modified_cognitive_complexity.frontends import C_FAMILY, NodeTypes
+from modified_cognitive_complexity.gotos import GotoRecorder, GotoResolver
+from modified_cognitive_complexity.stats import Stats
 
 
 @dataclass(frozen=False, slots=True)
@@ -30,185 +37,463 @@ class Location:
     end: Point
 
 
-type _LabelId = str
+@dataclass(frozen=True, slots=True, order=True)
+class FunctionKey:
+    """
+    Identifies a function definition in the results of `cognitive_complexity`, if requested with `keys`.
+
+    Unlike the name alone, the key is unique, so that overloads, methods of different classes and
+    static functions with the same name, e.g. in different preprocessor branches, are all kept.
+    """
+    name: bytes
+    """The name of the function, including the scope if it is qualified, see `function_name`."""
+    start: Point
+    """The start of the function definition."""
+    start_byte: int
+    """The offset of the first byte of the function definition."""
+    end_byte: int
+    """The offset after the last byte of the function definition."""
+
+
 type Scores = list[tuple[Location, Score]]
 
 
-def _collect_general(
+def _reduce_point(point: Point):
+    return Point, (point.row, point.column)
+
+
+# allows passing scores between processes, as Tree-sitter points can not be pickled by default
+copyreg.pickle(Point, _reduce_point)
+
+
+# The modes in which a node is visited by the traversal in `_collect`.
+_GENERAL = 0
+"""Control flow constructs are scored and their children visited with the appropriate depth."""
+_EXPRESSION = 1
+"""Only sequences of logical operators are scored, see `_collect` for details."""
+_ELSE_BRANCH = 2
+"""The direct child of an else clause. An `if` statement is not scored again, only its children."""
+_SKIP = 3
+"""The node and its children are ignored."""
+_FUNCTION = 4
+"""Only the body of a function definition is visited, with its own scores."""
+_PREPROCESSOR = 5
+"""The children of a branch of a preprocessor conditional are visited in the region of the branch."""
+_EXCEEDED = 6
+"""Nothing is scored, as the enclosing function exceeds the limit, but nested function definitions are visited."""
+
+_NO_FIELDS: frozenset[str] = frozenset()
+_IF_FIELDS = frozenset({"consequence"})
+_BODY_FIELDS = frozenset({"body"})
+_CONDITIONAL_FIELDS = frozenset({"consequence", "alternative"})
+_PREPROCESSOR_CONDITION_FIELDS = frozenset({"condition", "name"})
+_LOGICAL_OPERATORS = frozenset({b"&&", b"||"})
+
+
+type _Frame = tuple[int, Any, Any]
+
+_EXCEEDED_FRAME: _Frame = (_EXCEEDED, None, None)
+
+
+def _collect(
     cursor: TreeCursor,
-    nestings: list[Nesting | None],
-    locations: list[Location | None],
-    gotos: list[tuple[_LabelId, int]],
-    labels: dict[_LabelId, int],
-    function_scores: dict[bytes | None, Scores],
-    depth: int,
+    function_scores: dict[Any, Scores] | dict[Any, int],
     goto_nesting: bool,
-    structural_gotos: bool
-):
+    structural_gotos: bool,
+    totals: bool,
+    function_hook: Callable[[Node], dict[bytes, Any] | None] | None = None,
+    stats: Stats | None = None,
+    max_complexity: int | None = None,
+    node_types: NodeTypes = C_FAMILY,
+    keys: bool = False,
+    branches: list[tuple[int, tuple[Node, ...]]] | None = None
+) -> None:
     """
-    Recursively traverse the syntax tree to collect cognitive complexity scores 
-    from control flow constructs.
+    Traverse the syntax tree to collect cognitive complexity scores from control flow constructs.
 
-    This function inspects nodes in the syntax tree and records complexity scores 
+    The traversal inspects nodes in the syntax tree and records complexity scores
     based on the type and nesting of control flow statements. It tracks the depth
     of nesting, which increases the cognitive cost.
+    Additionally, gotos and labels are recorded with a `GotoResolver`, so that the goto
+    nesting can be applied by `_score` once a function or the whole tree has been traversed.
+
+    For each recorded code location, the nesting depth is collected as a plain integer, `None`
+    if the location has no nesting or the bitwise complement of the depth for labels, which
+    carry a nesting but no score penalty themselves. The `Location` of a code location is only 
+    collected if the full scores are requested.
     
-    Additionally, locations of gotos and labels are tracked. 
-
-    :param cursor: The cursor used to navigate the syntax tree.
-    :param nestings: The list that accumulates nesting depths for different code locations.
-    :param locations: The list that accumulates the locations for different code locations.
-        `None` means no score penalty for this code.
-    :param gotos: A list of (label name, index) tuples representing `goto` statements
-        and their position in the nestings/locations list.
-    :param labels: A mapping from label names to their position in the nestings/locations list.
-    :param function_scores: A mapping from function names to their collected scores.
-    :param depth: The current nesting depth, which increases when entering 
-        control structures that affect complexity.
-        
-    :return None
+    Binary expressions are walked in expression mode, where only a logical operator that
+    differs from the operator of its parent binary expression is recorded.
+
+    The traversal does not recurse. Instead, the cursor is moved through the tree and an 
+    explicit stack holds one frame for each node whose children are currently visited.
+    A frame consists of the mode in which the children are visited and either
+    the depth together with the fields of children that are nested one level deeper,
+    the operator of the parent binary expression, or the function key and the context
+    of the enclosing function, including if it exceeds the limit.
+
+    The scores of all functions, including nested ones, are collected in the single given
+    mapping. Each function is inserted when its definition is entered and its scores are
+    assigned when it is left, so that the functions are ordered by their start. If functions
+    are identified by name, the scores of a nested function with the same name as an enclosing
+    function are kept, as the scores of the enclosing function are only assigned if no nested
+    function was assigned to its name.
+
+    :param cursor: The cursor used to navigate the syntax tree. It is returned to its 
+        original node after the traversal.
+    :param function_scores: A mapping from function names or keys to their collected scores.
+        The scores of the node at the cursor are mapped to the 'None' key.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied. 
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param totals: If only the total score of each function should be collected instead of the 
+        scores of the individual code locations.
+    :param function_hook: An optional callback for function definitions, see `cognitive_complexity`.
+    :param stats: Optional statistics, to which the visited nodes and the gotos and labels are added.
+        If given, the visited nodes are counted per mode, which is the only overhead of the traversal.
+    :param max_complexity: An optional limit, above which the traversal of a function is stopped.
+        As gotos can only add nesting, the scores of the code locations collected so far, without
+        goto nesting, are a lower bound of the total score. Once it exceeds the limit, the remaining
+        nodes of the function are only searched for nested functions, which are scored on their own,
+        and the function is scored by the code locations collected so far.
+    :param node_types: The node types of the grammar the syntax tree was parsed with.
+    :param keys: If functions should be identified by a `FunctionKey` instead of their name.
+    :param branches: An optional list, which enables the preprocessor-aware traversal. The branches of
+        preprocessor conditionals are appended to it as (parent region, chain) pairs, where the chain
+        holds the branch and the branches preceding it in its conditional, and the region of the
+        code in the n-th branch is n, that of unconditional code 0. The conditions themselves are
+        not scored. Instead of scoring each function, its nestings, locations and gotos are mapped to
+        its key together with the (position, region) pairs at which the region of the collected code
+        locations changes, so that they can be scored for any configuration of the preprocessor
+        without traversing the syntax tree again, see `collect_branches`.
     """
-    
-    node_type = cursor.node.type
-    node_location = Location(cursor.node.start_point, cursor.node.end_point)
-
-    if node_type == "function_definition":
-        function_name: bytes | None = None
-        for _ in _childs(cursor):
-            if cursor.field_name == "declarator":
-                for _ in _childs(cursor):
-                    if cursor.field_name == "declarator":
-                        function_name = cursor.node.text
-
-        if function_name is not None:
-            for _ in _childs(cursor):
-                if cursor.field_name == "body":
-                    nested_scores = cognitive_complexity(cursor, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-                    function_scores[function_name] = nested_scores.pop(None)
-                    function_scores.update(nested_scores)
-        else:
-            pass  # TODO: Maybe warning or exception?
-        
-    elif node_type == "goto_statement":
-        for _ in _childs(cursor):
-            if cursor.field_name == "label":
-                label_text = cursor.node.text.decode(encoding="utf-8")
-                gotos.append((label_text, len(locations)))
-                locations.append(node_location)
+
+    # the node types are compared for every node, so they are bound to locals once
+    function_definition = node_types.function_definition
+    goto_statement = node_types.goto_statement
+    labeled_statement = node_types.labeled_statement
+    if_statement = node_types.if_statement
+    else_clause = node_types.else_clause
+    switch_statement = node_types.switch_statement
+    conditional_expression = node_types.conditional_expression
+    binary_expression = node_types.binary_expression
+    loops = node_types.loops
+
+    # one counter of visited node types per mode, see the mode constants
+    visits: list[Counter[str]] | None = None
+    if stats is not None:
+        visits = [Counter() for _ in range(_EXCEEDED + 1)]
+        start = time.perf_counter()
+        goto_seconds = stats.goto_seconds
+
+    nestings: list[int | None] = []
+    locations: list[Location | None] | None = None if totals else []
+    # gotos and labels in the inactive regions of a configuration are removed afterwards
+    goto_resolver = GotoResolver if branches is None else GotoRecorder
+    gotos = goto_resolver()
+
+    # without the preprocessor-aware traversal, preprocessor conditionals are visited like other nodes
+    preprocessor_branches = node_types.preprocessor_branches if branches is not None else frozenset()
+    region = 0
+    transitions: list[tuple[int, int]] | None = None if branches is None else [(0, region)]
+
+    stack: list[_Frame] = []
+    mode = _GENERAL
+    depth = 0
+    parent_operator: bytes | None = None
+
+    # the lower bound of the score of the current function and the number of code locations it includes
+    lower_bound = counted = 0
+    functions = 0
+    exceeded = False
+
+    while True:
+        node = cursor.node
+        node_type = node.type
+        frame: _Frame | None = None
+        if visits is not None:
+            visits[mode][node_type] += 1
+
+        if mode == _EXPRESSION:
+            operator: bytes | None = None
+            if node_type == binary_expression:
+                operator_node = node.child_by_field_name("operator")
+                operator = None if operator_node is None else operator_node.text
+                if operator in _LOGICAL_OPERATORS and parent_operator != operator:
+                    if locations is not None:
+                        locations.append(Location(node.start_point, node.end_point))
+                    nestings.append(None)
+
+            frame = (_EXPRESSION, operator, None)
+
+        elif mode == _SKIP:
+            pass
+
+        elif mode == _EXCEEDED and node_type != function_definition:
+            frame = _EXCEEDED_FRAME
+
+        elif mode == _ELSE_BRANCH and node_type == if_statement:
+            frame = (_GENERAL, depth, _NO_FIELDS)
+
+        elif node_type == function_definition:
+            name = function_name(node, node_types)
+            if name is not None:
+                provided = None if function_hook is None else function_hook(node)
+                if provided is not None:
+                    function_scores.update(provided)
+                else:
+                    key = FunctionKey(name, node.start_point, node.start_byte, node.end_byte) if keys else name
+                    frame = (_FUNCTION, key, (nestings, locations, gotos, lower_bound, counted, transitions, exceeded))
+            else:
+                pass  # TODO: Maybe warning or exception?
+
+        elif node_type == goto_statement:
+            label = node.child_by_field_name("label")
+            if label is not None:
+                gotos.add_goto(label.text, len(nestings))
+                if locations is not None:
+                    locations.append(Location(node.start_point, node.end_point))
+                nestings.append(None)
+
+        elif node_type == labeled_statement:
+            label = node.child_by_field_name("label")
+            if label is not None:
+                gotos.add_label(label.text, len(nestings))
+                if locations is not None:
+                    locations.append(None)
+                nestings.append(~depth)
+
+            frame = (_GENERAL, depth, _NO_FIELDS)
+
+        elif node_type == if_statement:
+            if locations is not None:
+                locations.append(Location(node.start_point, node.end_point))
+            nestings.append(depth)
+            frame = (_GENERAL, depth, _IF_FIELDS)
+
+        elif node_type == else_clause:
+            if locations is not None:
+                locations.append(Location(node.start_point, node.end_point))
+            nestings.append(None)
+            frame = (_ELSE_BRANCH, depth + 1, _NO_FIELDS)
+
+        elif node_type == switch_statement:
+            if locations is not None:
+                locations.append(Location(node.start_point, node.end_point))
+            nestings.append(depth)
+            frame = (_GENERAL, depth + 1, _NO_FIELDS)
+
+        elif node_type in loops:
+            if locations is not None:
+                locations.append(Location(node.start_point, node.end_point))
+            nestings.append(depth)
+            frame = (_GENERAL, depth, _BODY_FIELDS)
+
+        elif node_type == conditional_expression:
+            if locations is not None:
+                locations.append(Location(node.start_point, node.end_point))
+            nestings.append(depth)
+            frame = (_GENERAL, depth, _CONDITIONAL_FIELDS)
+
+        elif node_type == binary_expression:
+            operator_node = node.child_by_field_name("operator")
+            operator = None if operator_node is None else operator_node.text
+            if operator in _LOGICAL_OPERATORS:
+                if locations is not None:
+                    locations.append(Location(node.start_point, node.end_point))
                 nestings.append(None)
 
-    elif node_type == "labeled_statement":
-        for _ in _childs(cursor):
-            if cursor.field_name == "label":
-                label_text = cursor.node.text.decode(encoding="utf-8")
-                labels[label_text] = len(locations)
-                locations.append(None)
-                nestings.append(Nesting(depth))
-        
-        for _ in _childs(cursor):
-            _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-
-    # already handled by else branch
-    # elif node_type == "compound_statement":
-    #     for _ in childs(cursor):
-    #         collect_general(cursor, scores, gotos, labels, depth)
-
-    elif node_type == "if_statement":
-        locations.append(node_location)
-        nestings.append(Nesting(value=depth))
-        for _ in _childs(cursor):
-            depth_inc = 1 if cursor.field_name in {"consequence"} else 0
-            _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth + depth_inc, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-
-    elif node_type == "else_clause":
-        locations.append(node_location)
-        nestings.append(None)
-        for _ in _childs(cursor):
-            if cursor.node.type == "if_statement":
-                for _ in _childs(cursor):
-                    _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth + 1, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
+            frame = (_EXPRESSION, operator, None)
+
+        elif node_type in preprocessor_branches:
+            # an alternative, e.g. an `#else`, continues the chain of branches of its conditional
+            chain: tuple[Node, ...] = (node,)
+            if stack and stack[-1][0] == _PREPROCESSOR and cursor.field_name == "alternative":
+                chain = stack[-1][2][2] + chain
+            branches.append((region, chain))
+            frame = (_PREPROCESSOR, depth, (len(branches), region, chain))
+
+        else:
+            frame = (_GENERAL, depth, _NO_FIELDS)
+
+        if max_complexity is not None and counted < len(nestings):
+            for nesting in nestings[counted:]:
+                if nesting is None:
+                    lower_bound += 1
+                elif nesting >= 0:
+                    lower_bound += 1 + nesting
+            counted = len(nestings)
+
+            if lower_bound > max_complexity and functions:
+                # stop scoring the function, the remaining nodes are only searched for nested functions
+                exceeded = True
+                frame = _EXCEEDED_FRAME
+
+        # Descend into the children of the current node, if requested.
+        if frame is not None and cursor.goto_first_child():
+            stack.append(frame)
+            if frame[0] == _FUNCTION:
+                # the function takes its place in the results before the functions nested in it
+                function_scores[frame[1]] = None
+                nestings, locations, gotos = [], None if totals else [], goto_resolver()
+                lower_bound = counted = 0
+                exceeded = False
+                if branches is not None:
+                    transitions = [(0, region)]
+                functions += 1
+        else:
+            # Otherwise continue with the next sibling, ascending as long as there is none.
+            while stack:
+                if cursor.goto_next_sibling():
+                    # the siblings of the ancestors up to the function definition are not scored either
+                    frame = _EXCEEDED_FRAME if exceeded else stack[-1]
+                    break
+
+                cursor.goto_parent()
+                frame = stack.pop()
+                if frame[0] == _FUNCTION:
+                    if branches is None:
+                        scores = _score(nestings, locations, gotos, goto_nesting, structural_gotos, stats)
+                        # by name, a nested function with the same name overrides the enclosing function
+                        if function_scores[frame[1]] is None:
+                            function_scores[frame[1]] = scores
+                    else:
+                        function_scores[frame[1]] = (nestings, locations, gotos, transitions)
+                    nestings, locations, gotos, lower_bound, counted, transitions, exceeded = frame[2]
+                    functions -= 1
+                elif frame[0] == _PREPROCESSOR and region != frame[2][1]:
+                    # the code after a preprocessor conditional is in the region enclosing it
+                    region = frame[2][1]
+                    transitions.append((len(nestings), region))
             else:
-                _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth + 1, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-
-    elif node_type == "switch_statement":
-        locations.append(node_location)
-        nestings.append(Nesting(value=depth))
-        for _ in _childs(cursor):
-            _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth + 1, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-
-    elif node_type == "for_statement":
-        locations.append(node_location)
-        nestings.append(Nesting(value=depth))
-        for _ in _childs(cursor):
-            depth_inc = 1 if cursor.field_name == "body" else 0
-            _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth + depth_inc, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-
-    elif node_type in {"while_statement", "do_statement"}:
-        locations.append(node_location)
-        nestings.append(Nesting(value=depth))
-        for _ in _childs(cursor):
-            depth_inc = 1 if cursor.field_name == "body" else 0
-            _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth + depth_inc, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-    
-    elif node_type == "catch_clause":
-        locations.append(node_location)
-        nestings.append(Nesting(value=depth))
-        for _ in _childs(cursor):
-            depth_inc = 1 if cursor.field_name == "body" else 0
-            _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth + depth_inc, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-
-    elif node_type == "conditional_expression":
-        locations.append(node_location)
-        nestings.append(Nesting(value=depth))
-        for _ in _childs(cursor):
-            depth_inc = 1 if cursor.field_name in {"consequence", "alternative"} else 0
-            _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth + depth_inc, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-
-    elif node_type == "binary_expression":
-        _collect_expression(cursor, None, nestings, locations)
+                break
 
+        # Determine how the node at the cursor is visited from the frame of its parent.
+        mode = frame[0]
+        if mode == _GENERAL:
+            depth = frame[1]
+            if frame[2] and cursor.field_name in frame[2]:
+                depth += 1
+        elif mode == _EXPRESSION:
+            parent_operator = frame[1]
+        elif mode == _ELSE_BRANCH:
+            depth = frame[1]
+        elif mode == _EXCEEDED:
+            pass
+        elif mode == _PREPROCESSOR:
+            depth = frame[1]
+            field_name = cursor.field_name
+            if field_name in _PREPROCESSOR_CONDITION_FIELDS:
+                mode = _SKIP
+            else:
+                mode = _GENERAL
+                branch_region = frame[2][1] if field_name == "alternative" else frame[2][0]
+                if region != branch_region:
+                    region = branch_region
+                    transitions.append((len(nestings), region))
+        else:
+            mode = _GENERAL if cursor.field_name == "body" else _SKIP
+            depth = 0
+
+    if branches is None:
+        function_scores[None] = _score(nestings, locations, gotos, goto_nesting, structural_gotos, stats)
     else:
-        for _ in _childs(cursor):
-            _collect_general(cursor, nestings, locations, gotos, labels, function_scores, depth, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
+        function_scores[None] = (nestings, locations, gotos, transitions)
 
+    if visits is not None:
+        stats.node_visits.update(visits[_GENERAL])
+        stats.node_visits.update(visits[_ELSE_BRANCH])
+        stats.expression_visits.update(visits[_EXPRESSION])
+        stats.skipped_nodes += visits[_SKIP].total() + visits[_EXCEEDED].total()
+        stats.traversal_seconds += time.perf_counter() - start - (stats.goto_seconds - goto_seconds)
 
-def _collect_expression(
-    cursor: TreeCursor,
-    parent_operator: bytes | None,
-    nestings: list[Nesting | None],
-    locations: list[Location | None],
-):
+
+def _score(
+    nestings: list[int | None],
+    locations: list[Location | None] | None,
+    gotos: GotoResolver,
+    goto_nesting: bool,
+    structural_gotos: bool,
+    stats: Stats | None = None
+) -> Scores | int:
     """
-    Recursively collect cognitive complexity costs from binary expressions.
+    Apply the goto nesting to the collected nestings and calculate the resulting scores.
 
-    :param cursor: A cursor currently positioned at a node, typically an expression node.
-    :param parent_operator: The logical operator (e.g., `b'&&'`, `b'||'`) of the 
-        parent binary expression, or None if there is no parent operator.
-    :param nestings: The list that accumulates nesting depths for different code locations.
-    :param locations: The list that accumulates the locations for different code locations.
-        `None` means no score penalty for this code.
+    :param nestings: The nesting depths collected for different code locations, see `_collect`.
+    :param locations: The locations collected for different code locations.
+        `None` means no score penalty for this code. If `None` is passed instead of a list,
+        only the total score is calculated.
+    :param gotos: The gotos and labels recorded with their position in the nestings/locations list.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied. 
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param stats: Optional statistics, to which the gotos, labels and the time of the goto pass are added.
+
+    :return: The scores of all code locations or their total, if no locations were collected.
     """
-    
-    operator: bytes | None = None
-    if cursor.node.type == "binary_expression":
-        for _ in _childs(cursor):
-            if cursor.field_name == "operator":
-                operator = cursor.node.text
-
-        if operator in {b"&&", b"||"} and parent_operator != operator:
-            locations.append(Location(cursor.node.start_point, cursor.node.end_point))
-            nestings.append(None)
 
-    for _ in _childs(cursor):
-        _collect_expression(cursor, operator, nestings, locations)
+    if stats is None:
+        goto_nestings = gotos.goto_nestings(len(nestings)) if goto_nesting and gotos else None
+    else:
+        start = time.perf_counter()
+        goto_nestings = gotos.goto_nestings(len(nestings)) if goto_nesting and gotos else None
+        stats.goto_seconds += time.perf_counter() - start
+        stats.gotos += gotos.goto_count
+        stats.labels += gotos.label_count
+
+    if locations is None:
+        total = 0
+        if goto_nestings is None:
+            for nesting in nestings:
+                if nesting is None:
+                    total += 1
+                elif nesting >= 0:
+                    total += 1 + nesting
+        else:
+            for nesting, goto in zip(nestings, goto_nestings):
+                if nesting is None:
+                    total += 1
+                elif nesting >= 0:
+                    total += 1 + nesting + goto
+
+        if structural_gotos:
+            for _, label_index in gotos.resolved():
+                total += ~nestings[label_index]
+                if goto_nestings is not None:
+                    total += goto_nestings[label_index]
+
+        return total
+
+    scores: Scores = []
+    resolved = dict(gotos.resolved()) if structural_gotos else {}
+
+    for i, (nesting, location) in enumerate(zip(nestings, locations)):
+        if location is None:
+            continue
+
+        if i in resolved:
+            # the goto inherits the nesting of its label
+            nesting = resolved[i]
+            nesting = Nesting(~nestings[nesting], 0 if goto_nestings is None else goto_nestings[nesting])
+        elif nesting is not None:
+            nesting = Nesting(nesting, 0 if goto_nestings is None else goto_nestings[i])
+
+        scores.append((location, Score(1, nesting)))
+
+    return scores
 
     
 def cognitive_complexity(
     cursor: TreeCursor,
     *,
     goto_nesting: bool = True,
-    structural_gotos: bool = False
-) -> dict[bytes | None, Scores]:
+    structural_gotos: bool = False,
+    function_hook: Callable[[Node], dict[bytes, Scores] | dict[FunctionKey, Scores] | None] | None = None,
+    stats: Stats | None = None,
+    max_complexity: int | None = None,
+    node_types: NodeTypes = C_FAMILY,
+    keys: bool = False
+) -> dict[bytes | None, Scores] | dict[FunctionKey | None, Scores]:
     """
     Calculate the modified cognitive complexity of control flow structures in a syntax tree.
 
@@ -220,71 +505,250 @@ def cognitive_complexity(
     introduced by goto statements.
     All top-level costs are mapped to the 'None' key.
     
+    The traversal is iterative, so arbitrarily deep syntax trees can be scored.
+    
     :param cursor: A cursor currently positioned at a node, typically an expression node.
     :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied. 
     :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
         by their respective label.
-
-    :return: A mapping from each function name to its score. The score of top-level constructs
-        is mapped to the 'None' key.
+    :param function_hook: An optional callback, which is called with each named function definition
+        before it is scored. It may return the scores of the function and of functions nested in it,
+        e.g. from a previous run, which are then used instead of scoring the function definition.
+        If it returns `None`, the function definition is scored as usual.
+    :param stats: Optional statistics, to which the visited nodes, gotos, labels and timings of 
+        the traversal and the goto pass are added. Collecting them slows down the traversal
+        slightly, but nothing is collected by default.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it.
+        The scoring of a function stops as soon as its score provably exceeds the limit, so its
+        scores are only those collected up to that point. Functions nested in the rest of it are
+        still scored. Only the functions and top-level constructs exceeding the limit are returned.
+    :param node_types: The node types of the grammar the syntax tree was parsed with, see `Frontend`.
+        Defaults to the node types of the C and C++ grammars.
+    :param keys: If functions should be identified by a `FunctionKey` instead of their name. Functions
+        with the same name, e.g. overloads, overwrite each other's scores otherwise. The scores
+        provided by the `function_hook` must be keyed the same way.
+
+    :return: A mapping from each function name or key to its score, with the functions ordered by
+        their start. The score of top-level constructs is mapped to the 'None' key.
     """
     
-    nestings: list[Nesting | None] = []
-    locations: list[Location | None] = []
-    gotos: list[tuple[_LabelId, int]] = []
-    labels: dict[_LabelId, int] = {}
-    function_scores: dict[bytes | None, Scores] = {}
-
-    _collect_general(cursor, nestings, locations, gotos, labels, function_scores, 0, goto_nesting, structural_gotos)
-
-    if goto_nesting:
-        goto_nesting = [0] * (len(nestings) + 1)
-        
-        for labelId, goto_index in gotos:
-            if labelId not in labels:
-                continue
-            
-            label_index = labels[labelId]
-            (start, stop) = sorted((goto_index, label_index))
-            start += 1 # shift start behind goto/label
-            
-            goto_nesting[start] += 1
-            goto_nesting[stop] -= 1
-        
-        current_goto_nesting = 0
-        for i, nesting in enumerate(nestings):
-            current_goto_nesting += goto_nesting[i]
-            if nesting is not None:
-                nesting.goto += current_goto_nesting
-
-    if structural_gotos:
-        for labelId, goto_index in gotos:
-            if labelId not in labels:
-                continue
+    function_scores: dict[Any, Scores] = {}
+    _collect(cursor, function_scores, goto_nesting, structural_gotos, False, function_hook, stats, max_complexity, node_types, keys)
+    if max_complexity is None:
+        return function_scores
 
-            label_index = labels[labelId]
-            nestings[goto_index] = dataclasses.replace(nestings[label_index])
-    
-    function_scores[None] = [(location, Score(1, nesting)) for nesting, location in zip(nestings, locations) if location is not None]
-    return function_scores
+    return {
+        function_name: scores
+        for function_name, scores in function_scores.items()
+        if sum(cost.total for _, cost in scores) > max_complexity
+    }
 
 
-def _childs(cursor: TreeCursor) -> Iterator[None]:
+def cognitive_complexity_totals(
+    cursor: TreeCursor,
+    *,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    function_hook: Callable[[Node], dict[bytes, int] | dict[FunctionKey, int] | None] | None = None,
+    stats: Stats | None = None,
+    max_complexity: int | None = None,
+    node_types: NodeTypes = C_FAMILY,
+    keys: bool = False
+) -> dict[bytes | None, int] | dict[FunctionKey | None, int]:
     """
-    Helper function for traversing all children of the current node in the cursor.
+    Calculate the total modified cognitive complexity of each function in a syntax tree.
+
+    The result equals summing up the `Score.total` of the scores returned by `cognitive_complexity`, 
+    but no `Location`, `Score` or `Nesting` objects are created for the individual code locations.
+    This is considerably faster and uses less memory, if the breakdown of the scores is not needed.
     
-    This generator function yields once for each child node of the current node, 
-    advancing the cursor to each sibling in turn. After iteration, the cursor is 
-    restored to its original parent node.
-    Care must be taken to always exhaust the iterator, else the cursor will not 
-    return to the original node.
+    :param cursor: A cursor currently positioned at a node, typically an expression node.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied. 
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param function_hook: An optional callback, which may provide the totals of function definitions,
+        see `cognitive_complexity`.
+    :param stats: Optional statistics, see `cognitive_complexity`.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it, see
+        `cognitive_complexity`. The score of a function whose traversal was stopped is a lower bound,
+        which exceeds the limit.
+    :param node_types: The node types of the grammar, see `cognitive_complexity`.
+    :param keys: If functions should be identified by a `FunctionKey` instead of their name, see
+        `cognitive_complexity`.
+
+    :return: A mapping from each function name or key to its score, with the functions ordered by
+        their start. The score of top-level constructs is mapped to the 'None' key.
+    """
     
-    :param cursor: A Tree-sitter cursor positioned at a node whose children will 
-        be iterated. 
+    function_scores: dict[Any, int] = {}
+    _collect(cursor, function_scores, goto_nesting, structural_gotos, True, function_hook, stats, max_complexity, node_types, keys)
+    if max_complexity is None:
+        return function_scores
+
+    return {function_name: total for function_name, total in function_scores.items() if total > max_complexity}
+
+
+@dataclass(frozen=True, slots=True)
+class BranchedScores:
     """
-    if cursor.goto_first_child():
-        while True:
-            yield None
-            if not cursor.goto_next_sibling():
-                break
-        cursor.goto_parent()
+    The code locations of all functions, collected once for any configuration of the preprocessor.
+
+    Created by `collect_branches`. The branches of the preprocessor conditionals are evaluated by
+    the caller, e.g. `cognitive_complexity_configurations`, and the code locations of the active
+    branches are scored with `scores`.
+    """
+    branches: list[tuple[int, tuple[Node, ...]]]
+    """
+    The (parent region, chain) pair of each branch of a preprocessor conditional, in the order of
+    their regions, which start at 1. The chain holds the branch and the branches preceding it in its
+    conditional. The region of unconditional code is 0.
+    """
+    functions: dict[FunctionKey | None, Any]
+    """The nestings, locations, gotos and region transitions collected for each function, see `_collect`."""
+    goto_nesting: bool
+    structural_gotos: bool
+    _unconditional: dict[FunctionKey | None, Any] = field(default_factory=dict)
+    """The scores of functions without inactive code locations, which are shared by all configurations."""
+
+    def scores(self, active: list[bool], *, keys: bool = False) -> dict[Any, Scores] | dict[Any, int]:
+        """
+        Score the code locations in the active regions.
+
+        :param active: If the region of unconditional code, followed by the region of each branch, is active.
+        :param keys: If functions should be identified by a `FunctionKey` instead of their name.
+
+        :return: A mapping from each function name or key to its score, see `cognitive_complexity`.
+            Functions defined in inactive regions are left out.
+        """
+
+        function_scores: dict[Any, Any] = {}
+        for key, (nestings, locations, gotos, transitions) in self.functions.items():
+            if not active[transitions[0][1]]:
+                continue
+
+            if all(active[region] for _, region in transitions):
+                scores = self._unconditional.get(key)
+                if scores is None:
+                    scores = self._unconditional[key] = _score(nestings, locations, gotos, self.goto_nesting, self.structural_gotos)
+            else:
+                scores = _score(*_active_locations(nestings, locations, gotos, transitions, active), self.goto_nesting, self.structural_gotos)
+
+            function_scores[key if keys or key is None else key.name] = scores
+
+        return function_scores
+
+
+def collect_branches(
+    cursor: TreeCursor,
+    *,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    totals: bool = True,
+    stats: Stats | None = None,
+    node_types: NodeTypes = C_FAMILY
+) -> BranchedScores:
+    """
+    Collect the code locations of each function together with the branch of the preprocessor they are in.
+
+    :param cursor: A cursor currently positioned at a node, typically the root of a syntax tree.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param totals: If only the total score of each function should be calculated by `BranchedScores.scores`.
+    :param stats: Optional statistics of the traversal, see `cognitive_complexity`.
+    :param node_types: The node types of the grammar the syntax tree was parsed with.
+
+    :return: The collected code locations, which can be scored for any configuration.
+    """
+
+    branches: list[tuple[int, tuple[Node, ...]]] = []
+    functions: dict[FunctionKey | None, Any] = {}
+    _collect(
+        cursor,
+        functions,
+        goto_nesting,
+        structural_gotos,
+        totals,
+        function_hook=None,
+        stats=stats,
+        max_complexity=None,
+        node_types=node_types,
+        keys=True,
+        branches=branches
+    )
+    return BranchedScores(branches, functions, goto_nesting, structural_gotos)
+
+
+def _active_locations(
+    nestings: list[int | None],
+    locations: list[Any] | None,
+    gotos: GotoRecorder,
+    transitions: list[tuple[int, int]],
+    active: list[bool]
+) -> tuple[list[int | None], list[Any] | None, Any]:
+    """
+    Remove the code locations in inactive regions.
+
+    :return: The nestings, locations and gotos of the code locations in active regions, see `_score`.
+    """
+
+    kept: list[int] = []
+    for (start, region), (end, _) in pairwise([*transitions, (len(nestings), 0)]):
+        if active[region]:
+            kept.extend(range(start, end))
+
+    positions = {index: position for position, index in enumerate(kept)}
+    return (
+        [nestings[index] for index in kept],
+        None if locations is None else [locations[index] for index in kept],
+        gotos.subset(positions),
+    )
+
+
+def function_name(node: Node, node_types: NodeTypes = C_FAMILY) -> bytes | None:
+    """
+    Find the name of a function definition.
+
+    The declarator of the function definition is followed through the declarators wrapping the
+    function declarator, e.g. of functions returning pointers or references, and through nested
+    function declarators, e.g. of functions returning function pointers, down to the name. The name
+    includes the scope of qualified names, e.g. `A::f`, but neither the parameters nor the return type.
+    Conversion operators have no function declarator and are named up to their parameters, e.g.
+    `A::operator bool`. Any other declarator without a function declarator is named by its text.
+
+    :param node: The function definition.
+    :param node_types: The node types of the grammar the syntax tree was parsed with.
+
+    :return: The function name or `None`, if the function definition has no declarator.
+    """
+
+    name: Node | None = None
+    declarator = node.child_by_field_name("declarator")
+    while declarator is not None:
+        declarator_type = declarator.type
+        if declarator_type == node_types.function_declarator:
+            declarator = name = declarator.child_by_field_name("declarator")
+        elif declarator_type in node_types.declarators:
+            # parenthesized and reference declarators have no field for the declarator they wrap
+            declarator = declarator.child_by_field_name("declarator") or declarator.named_child(0)
+            if name is not None:
+                name = declarator
+        else:
+            break
+
+    if name is not None:
+        return name.text
+    if declarator is None:
+        return None
+
+    # the name of a conversion operator, possibly qualified, ends before its abstract function declarator
+    operator_cast = declarator
+    while operator_cast is not None and operator_cast.type != node_types.operator_cast:
+        operator_cast = operator_cast.child_by_field_name("name")
+    parameters = None if operator_cast is None else operator_cast.child_by_field_name("declarator")
+    while parameters is not None and parameters.type != node_types.abstract_function_declarator:
+        parameters = parameters.child_by_field_name("declarator")
+
+    if parameters is None:
+        return declarator.text
+    return declarator.text[:parameters.start_byte - declarator.start_byte].rstrip()
@@ -0,0 +1,189 @@
+import functools
+import importlib
+import importlib.util
+import os
+from dataclasses import dataclass
+from pathlib import PurePath
+
+from tree_sitter import Language
+
+
+@dataclass(frozen=True, slots=True)
+class NodeTypes:
+    """
+    The node types of a grammar that are scored by `cognitive_complexity`.
+
+    The defaults are the node types of the C and C++ grammars. The traversal additionally relies
+    on the field names `declarator` of function definitions and declarators, `label` of gotos and
+    labeled statements, `consequence` and `alternative` of conditionals, `body` of loops and
+    functions, `operator` of binary expressions, and `condition`, `name` and `alternative` of
+    preprocessor conditionals.
+    """
+    function_definition: str = "function_definition"
+    goto_statement: str = "goto_statement"
+    labeled_statement: str = "labeled_statement"
+    if_statement: str = "if_statement"
+    else_clause: str = "else_clause"
+    switch_statement: str = "switch_statement"
+    conditional_expression: str = "conditional_expression"
+    binary_expression: str = "binary_expression"
+    loops: frozenset[str] = frozenset({"for_statement", "while_statement", "do_statement", "catch_clause"})
+    """The node types of loops and of other constructs that are scored like loops."""
+    function_declarator: str = "function_declarator"
+    operator_cast: str = "operator_cast"
+    abstract_function_declarator: str = "abstract_function_declarator"
+    declarators: frozenset[str] = frozenset({
+        "pointer_declarator", "reference_declarator", "parenthesized_declarator", "attributed_declarator"
+    })
+    """The declarators that can wrap a function declarator, e.g. of functions returning pointers."""
+    preprocessor_branches: frozenset[str] = frozenset({
+        "preproc_if", "preproc_ifdef", "preproc_elif", "preproc_elifdef", "preproc_else"
+    })
+    """The node types of the branches of preprocessor conditionals, see `cognitive_complexity_configurations`."""
+
+
+C_FAMILY = NodeTypes()
+"""The node types of the C and C++ grammars."""
+
+
+@dataclass(frozen=True, slots=True)
+class Frontend:
+    """A grammar together with the file suffixes it is used for and the node types it produces."""
+    name: str
+    module: str
+    """The Python module of the grammar, which provides the language through a `language()` function."""
+    distribution: str
+    """The distribution providing the module, whose version is part of cache keys."""
+    suffixes: frozenset[str]
+    """The lowercase file suffixes, including the dot, of the files the grammar is used for."""
+    node_types: NodeTypes = C_FAMILY
+    fallback: str | None = None
+    """The name of the frontend used instead, if the module of the grammar is not installed."""
+
+    @property
+    def available(self) -> bool:
+        """If the module of the grammar is installed."""
+        return importlib.util.find_spec(self.module) is not None
+
+    def language(self) -> Language:
+        """
+        Load the language of the grammar. It is only loaded once per process.
+
+        :raises ModuleNotFoundError: If the module of the grammar is not installed.
+        """
+
+        return _load_language(self.module)
+
+
+@functools.cache
+def _load_language(module: str) -> Language:
+    return Language(importlib.import_module(module).language())
+
+
+DEFAULT_FRONTEND = "cpp"
+"""The frontend used for sources without a known suffix. The C++ grammar covers C as well."""
+
+_frontends: dict[str, Frontend] = {}
+
+
+def register_frontend(frontend: Frontend, *, replace: bool = False):
+    """
+    Add a frontend to the registry.
+
+    Frontends registered later take precedence for the suffixes they share with earlier ones.
+
+    :param frontend: The frontend.
+    :param replace: If a frontend with the same name may be replaced.
+
+    :raises ValueError: If a frontend with the same name is registered already and may not be replaced.
+    """
+
+    if not replace and frontend.name in _frontends:
+        raise ValueError(f"A frontend named '{frontend.name}' is registered already")
+
+    _frontends.pop(frontend.name, None)
+    _frontends[frontend.name] = frontend
+    _resolve.cache_clear()
+
+
+def registered_frontends() -> list[Frontend]:
+    """
+    :return: The registered frontends, in the order of registration.
+    """
+
+    return list(_frontends.values())
+
+
+def source_suffixes() -> frozenset[str]:
+    """
+    :return: The file suffixes of all registered frontends. Files with one of them are considered
+        sources when walking directories or comparing revisions.
+    """
+
+    return frozenset().union(*(frontend.suffixes for frontend in _frontends.values()))
+
+
+def get_frontend(name: str) -> Frontend:
+    """
+    Get a registered frontend by name, or its fallback if its grammar is not installed.
+
+    :param name: The name of the frontend.
+
+    :return: The frontend to use.
+
+    :raises LookupError: If there is no frontend with the name or neither the grammar of the frontend
+        nor of one of its fallbacks is installed.
+    """
+
+    return _resolve(name)
+
+
+def frontend_for_path(path: str | os.PathLike[str]) -> Frontend:
+    """
+    Detect the frontend of a source file by its suffix.
+
+    :param path: The path of the source file.
+
+    :return: The frontend to use, see `get_frontend`. Files with an unknown suffix use the
+        `DEFAULT_FRONTEND`.
+    """
+
+    suffix = PurePath(path).suffix.lower()
+    for frontend in reversed(_frontends.values()):
+        if suffix in frontend.suffixes:
+            return _resolve(frontend.name)
+
+    return _resolve(DEFAULT_FRONTEND)
+
+
+@functools.cache
+def _resolve(name: str) -> Frontend:
+    seen = []
+    while name not in seen:
+        seen.append(name)
+        try:
+            frontend = _frontends[name]
+        except KeyError:
+            raise LookupError(f"There is no frontend named '{name}'") from None
+
+        if frontend.available:
+            return frontend
+        if frontend.fallback is None:
+            break
+
+        name = frontend.fallback
+
+    raise LookupError(f"The grammar of the frontend '{seen[0]}' is not installed, tried: {', '.join(seen)}")
+
+
+register_frontend(Frontend(
+    "cpp",
+    "tree_sitter_cpp",
+    "tree-sitter-cpp",
+    frozenset({
+        ".cc", ".cpp", ".cxx", ".c++",
+        ".h", ".hh", ".hpp", ".hxx", ".h++",
+        ".cu", ".cuh",  # CUDA extends C++, whose grammar parses everything but kernel launches
+    }),
+))
+register_frontend(Frontend("c", "tree_sitter_c", "tree-sitter-c", frozenset({".c"}), fallback="cpp"))
@@ -0,0 +1,223 @@
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from tree_sitter import Node
+
+from modified_cognitive_complexity.analyzer import ComplexityAnalyzer, analyzer_for_path
+from modified_cognitive_complexity.complexity import cognitive_complexity_totals, function_name
+from modified_cognitive_complexity.frontends import NodeTypes, source_suffixes
+
+
+class GitError(Exception):
+    """Raised if a git command fails."""
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionDelta:
+    """The scores of a function before and after a change. A score is `None`, if the function did not exist."""
+    path: str
+    function: bytes | None
+    before: int | None
+    after: int | None
+
+    @property
+    def delta(self) -> int:
+        return (self.after or 0) - (self.before or 0)
+
+
+_HUNK = re.compile(rb"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@", re.MULTILINE)
+
+type _Lines = list[tuple[int, int]]
+"""Changed lines as (first row, number of rows) pairs. A pair without rows marks an insertion point behind the row."""
+
+
+def parse_revisions(revisions: str, *, repository: Path = Path(".")) -> tuple[str, str]:
+    """
+    Split a revision range into the base and head revision.
+
+    :param revisions: Either `BASE..HEAD`, `BASE...HEAD` to compare against the merge base of both
+        revisions, or a single `BASE`, which is compared against `HEAD`.
+    :param repository: A directory within the git repository.
+
+    :return: The base and head revision.
+    """
+
+    if "..." in revisions:
+        base, head = revisions.split("...", 1)
+        head = head or "HEAD"
+        base = _git(repository, "merge-base", base or "HEAD", head).decode().strip()
+        return base, head
+
+    if ".." in revisions:
+        base, head = revisions.split("..", 1)
+        return base or "HEAD", head or "HEAD"
+
+    return revisions, "HEAD"
+
+
+def diff_revisions(
+    base: str,
+    head: str,
+    *,
+    paths: Iterable[str] = (),
+    repository: Path = Path("."),
+    goto_nesting: bool = True,
+    structural_gotos: bool = False
+) -> Iterator[FunctionDelta]:
+    """
+    Calculate the complexity deltas of the functions changed between two revisions.
+
+    The changed source files and their changed lines are taken from `git diff`. In each changed file,
+    only the function definitions that contain changed lines on either side are scored, on both sides.
+    Functions are matched by name, so a function that was added, removed or renamed has no score on
+    one side. If the score of the top-level constructs of a file changed, it is reported as the
+    function `None`.
+
+    :param base: The revision before the change.
+    :param head: The revision after the change.
+    :param paths: Optional paths to limit the diff to, relative to the current directory. The paths
+        of the results are relative to the root of the repository.
+    :param repository: A directory within the git repository.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+
+    :return: An iterator over the deltas of the changed functions, ordered by file.
+    """
+
+    options = {"goto_nesting": goto_nesting, "structural_gotos": structural_gotos}
+
+    # run all commands from the root, as diffs report paths relative to it
+    root = Path(os.fsdecode(_git(repository, "rev-parse", "--show-toplevel").rstrip(b"\n")))
+    pathspecs = [os.path.relpath(os.path.abspath(path), root) for path in paths]
+
+    for status, old_path, new_path in _changed_files(root, base, head, pathspecs):
+        old_code = None if status == "A" else _git(root, "cat-file", "blob", f"{base}:{old_path}")
+        new_code = None if status == "D" else _git(root, "cat-file", "blob", f"{head}:{new_path}")
+
+        old_lines: _Lines = []
+        new_lines: _Lines = []
+        if status not in "AD":
+            patch = _git(root, "diff", "--no-color", "--no-ext-diff", "-U0", base, head, "--", old_path, new_path)
+            for match in _HUNK.finditer(patch):
+                old_start, old_count, new_start, new_count = match.groups()
+                old_lines.append(_rows(old_start, old_count))
+                new_lines.append(_rows(new_start, new_count))
+
+        # a renamed file may change its language as well
+        old_analyzer, new_analyzer = analyzer_for_path(old_path), analyzer_for_path(new_path)
+        old_functions, old_top_level = _functions(old_code, old_analyzer, options)
+        new_functions, new_top_level = _functions(new_code, new_analyzer, options)
+
+        if status in "AD":
+            changed = {name for name, _ in old_functions} | {name for name, _ in new_functions}
+        else:
+            changed = {name for name, node in old_functions if _touches(node, old_lines)}
+            changed |= {name for name, node in new_functions if _touches(node, new_lines)}
+
+        before = _score(old_functions, changed, old_analyzer.frontend.node_types, options)
+        after = _score(new_functions, changed, new_analyzer.frontend.node_types, options)
+
+        path = new_path if new_code is not None else old_path
+        for name in dict.fromkeys((*after, *before)):
+            yield FunctionDelta(path, name, before.get(name), after.get(name))
+
+        if (old_top_level or 0) != (new_top_level or 0):
+            yield FunctionDelta(path, None, old_top_level, new_top_level)
+
+
+def _git(repository: Path, *args: str) -> bytes:
+    try:
+        process = subprocess.run(["git", "-C", str(repository), *args], capture_output=True, check=True)
+    except FileNotFoundError as e:
+        raise GitError("git is not installed") from e
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode(errors="replace").strip()
+        raise GitError(f"'git {args[0]}' failed: {message}") from e
+
+    return process.stdout
+
+
+def _changed_files(root: Path, base: str, head: str, pathspecs: list[str]) -> Iterator[tuple[str, str, str]]:
+    """Yield the (status, old path, new path) of each changed source file, with paths relative to the repository root."""
+
+    output = _git(root, "diff", "--no-color", "--name-status", "-z", "-M", base, head, "--", *pathspecs)
+    suffixes = source_suffixes()
+
+    fields = iter(output.decode(errors="surrogateescape").split("\0"))
+    for status in fields:
+        if not status:
+            continue
+
+        status = status[0]
+        old_path = next(fields)
+        new_path = next(fields) if status in "RC" else old_path
+        if status == "C":
+            status, old_path = "A", new_path
+
+        if os.path.splitext(new_path)[1].lower() in suffixes:
+            yield status, old_path, new_path
+
+
+def _rows(start: bytes, count: bytes | None) -> tuple[int, int]:
+    # lines are counted from one, `count` defaults to one line and for no lines `start` is the line before the change
+    return int(start) - 1, 1 if count is None else int(count)
+
+
+def _touches(node: Node, lines: _Lines) -> bool:
+    start, end = node.start_point.row, node.end_point.row
+    for first, count in lines:
+        if count:
+            if first <= end and start <= first + count - 1:
+                return True
+        elif start <= first < end:
+            # lines inserted or removed behind the row, which is within the function
+            return True
+
+    return False
+
+
+def _functions(
+    code: bytes | None,
+    analyzer: ComplexityAnalyzer,
+    options: dict[str, bool]
+) -> tuple[list[tuple[bytes, Node]], int | None]:
+    """Find the outermost function definitions of the code and score its top-level constructs."""
+
+    if code is None:
+        return [], None
+
+    functions: list[tuple[bytes, Node]] = []
+
+    def function_hook(node: Node) -> dict[bytes, int]:
+        functions.append((function_name(node, analyzer.frontend.node_types), node))
+        return {}
+
+    tree = analyzer.parse(code)
+    top_level = cognitive_complexity_totals(
+        tree.walk(),
+        **options,
+        function_hook=function_hook,
+        node_types=analyzer.frontend.node_types
+    )
+    return functions, top_level[None]
+
+
+def _score(
+    functions: list[tuple[bytes, Node]],
+    changed: set[bytes],
+    node_types: NodeTypes,
+    options: dict[str, bool]
+) -> dict[bytes | None, int]:
+    scores: dict[bytes | None, int] = {}
+    for name, node in functions:
+        if name in changed:
+            function_scores = cognitive_complexity_totals(node.walk(), **options, node_types=node_types)
+            function_scores.pop(None)
+            scores.update(function_scores)
+
+    return scores
@@ -0,0 +1,153 @@
+from array import array
+from itertools import accumulate
+from typing import Iterator
+
+
+class GotoResolver:
+    """
+    Resolves the gotos of a function to their labels and calculates the resulting goto nesting.
+
+    Gotos and labels are recorded with their position in the list of code locations collected
+    by the traversal. Label names are mapped to compact integer ids on first use, so that only
+    integers are stored per goto and label. A goto whose label is not defined within the same
+    function is ignored, and if a label is defined multiple times, the last definition is used.
+    """
+
+    __slots__ = ("_ids", "_label_indices", "_goto_labels", "_goto_indices")
+
+    def __init__(self):
+        self._ids: dict[bytes, int] = {}
+        """The id of each label name."""
+        self._label_indices = array("q")
+        """The position of each label by its id or -1, if the label was not defined yet."""
+        self._goto_labels = array("q")
+        """The label id of each goto."""
+        self._goto_indices = array("q")
+        """The position of each goto."""
+
+    def __bool__(self) -> bool:
+        return len(self._goto_indices) > 0
+
+    @property
+    def goto_count(self) -> int:
+        """The number of recorded gotos."""
+        return len(self._goto_indices)
+
+    @property
+    def label_count(self) -> int:
+        """The number of distinct labels that were defined."""
+        return len(self._label_indices) - self._label_indices.count(-1)
+
+    def add_goto(self, label: bytes, index: int):
+        """
+        Record a goto statement.
+
+        :param label: The name of the label the goto jumps to.
+        :param index: The position of the goto in the code locations.
+        """
+
+        self._goto_labels.append(self._id(label))
+        self._goto_indices.append(index)
+
+    def add_label(self, label: bytes, index: int):
+        """
+        Record a labeled statement.
+
+        :param label: The name of the label.
+        :param index: The position of the label in the code locations.
+        """
+
+        self._label_indices[self._id(label)] = index
+
+    def resolved(self) -> Iterator[tuple[int, int]]:
+        """
+        :return: An iterator over the (goto position, label position) pairs of all gotos whose label is defined.
+        """
+
+        label_indices = self._label_indices
+        for label_id, goto_index in zip(self._goto_labels, self._goto_indices):
+            label_index = label_indices[label_id]
+            if label_index >= 0:
+                yield goto_index, label_index
+
+    def goto_nestings(self, length: int) -> list[int] | None:
+        """
+        Calculate the nesting imposed by gotos on each code location.
+
+        Each goto and its label span the code locations in between, whose nesting is increased by one.
+        The spans are added to a difference array, whose prefix sums are the goto nestings. Unlike
+        the gotos and labels, the result is a list, as its elements are read individually.
+
+        :param length: The number of code locations.
+
+        :return: The goto nesting of each code location or `None`, if no goto was resolved and
+            all goto nestings are zero.
+        """
+
+        differences = None
+        for goto_index, label_index in self.resolved():
+            if differences is None:
+                differences = [0] * (length + 1)
+
+            if goto_index < label_index:
+                differences[goto_index + 1] += 1  # shift start behind goto
+                differences[label_index] -= 1
+            else:
+                differences[label_index + 1] += 1  # shift start behind label
+                differences[goto_index] -= 1
+
+        if differences is None:
+            return None
+
+        return list(accumulate(differences))
+
+    def _id(self, label: bytes) -> int:
+        label_id = self._ids.get(label)
+        if label_id is None:
+            label_id = self._ids[label] = len(self._label_indices)
+            self._label_indices.append(-1)
+
+        return label_id
+
+
+class GotoRecorder(GotoResolver):
+    """
+    A `GotoResolver` that additionally keeps every goto and label definition in order, so that
+    the gotos and labels of a subset of the code locations can be resolved on their own.
+    """
+
+    __slots__ = ("_events",)
+
+    def __init__(self):
+        super().__init__()
+        self._events: list[tuple[bool, bytes, int]] = []
+        """The (is label, label name, position) triple of each goto and label definition."""
+
+    def add_goto(self, label: bytes, index: int):
+        super().add_goto(label, index)
+        self._events.append((False, label, index))
+
+    def add_label(self, label: bytes, index: int):
+        super().add_label(label, index)
+        self._events.append((True, label, index))
+
+    def subset(self, positions: dict[int, int]) -> GotoResolver:
+        """
+        Resolve only the gotos and labels at some of the code locations.
+
+        :param positions: The new position of each code location that is kept.
+
+        :return: A resolver of the gotos and labels at the kept code locations, with their new positions.
+        """
+
+        resolver = GotoResolver()
+        for is_label, label, index in self._events:
+            position = positions.get(index)
+            if position is None:
+                continue
+            if is_label:
+                resolver.add_label(label, position)
+            else:
+                resolver.add_goto(label, position)
+
+        return resolver
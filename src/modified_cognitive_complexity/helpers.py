@@ -1,16 +1,30 @@
+import itertools
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Literal
 
-import tree_sitter_cpp
-from tree_sitter import Language, Parser
+from tree_sitter import Node, Parser, Point, Range
 
-from modified_cognitive_complexity import cognitive_complexity
+from modified_cognitive_complexity.analyzer import analyzer_for, analyzer_for_path
+from modified_cognitive_complexity.complexity import FunctionKey, Scores, cognitive_complexity, cognitive_complexity_totals
+from modified_cognitive_complexity.frontends import DEFAULT_FRONTEND
+from modified_cognitive_complexity.parallel import imap_bounded
+
+if TYPE_CHECKING:
+    from modified_cognitive_complexity.cache import ResultCache
 
 
 def cognitive_complexity_for_file(
     file: Path,
     *,
     goto_nesting: bool = True,
-    structural_gotos: bool = False
+    structural_gotos: bool = False,
+    cache: "ResultCache | None" = None,
+    max_complexity: int | None = None,
+    language: str | None = None
 ) -> dict[bytes | None, int]:
     """
     Calculate the modified cognitive complexity of control flow structures in a syntax tree.
@@ -21,24 +35,42 @@ def cognitive_complexity_for_file(
     function names to the modified cognitive complexity score. 
     The top-level modified cognitive complexity score is mapped to the 'None' key.
     
+    The grammar is chosen by the suffix of the file, see `frontend_for_path`, and the parser of the
+    shared `analyzer_for` the grammar is reused across calls. The file is memory-mapped instead of
+    read into memory, if possible.
+    
     :param file: A Path from which the source code is read.
     :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
     :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
         by their respective label.
+    :param cache: An optional cache, from which the scores are taken if the file content was 
+        scored before, and in which newly calculated scores are stored.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it.
+        Scoring a function stops as soon as its score provably exceeds the limit, so the score of
+        such a function is a lower bound, see `cognitive_complexity_totals`.
+    :param language: The name of the frontend to parse the file with instead of detecting it, see `get_frontend`.
 
     :return: A mapping from each function name to its score. The score of top-level constructs
         is mapped to the 'None' key.
     """
     
-    code = file.read_bytes()
-    return cognitive_complexity_for_string(code, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
+    analyzer = analyzer_for_path(file) if language is None else analyzer_for(language)
+    return analyzer.for_file(
+        file,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        cache=cache,
+        max_complexity=max_complexity
+    )
 
 
 def cognitive_complexity_for_string(
     code: str | bytes | bytearray | memoryview,
     *,
     goto_nesting: bool = True,
-    structural_gotos: bool = False
+    structural_gotos: bool = False,
+    max_complexity: int | None = None,
+    language: str = DEFAULT_FRONTEND
 ) -> dict[bytes | None, int]:
     """
     Calculate the modified cognitive complexity of control flow structures in a syntax tree.
@@ -49,25 +81,277 @@ def cognitive_complexity_for_string(
     function names to the modified cognitive complexity score. 
     The top-level modified cognitive complexity score is mapped to the 'None' key.
     
+    The parser of the shared `analyzer_for` the language is reused across calls.
+    
     :param code: The source code.
     :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
     :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
         by their respective label.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it.
+        Scoring a function stops as soon as its score provably exceeds the limit, so the score of
+        such a function is a lower bound, see `cognitive_complexity_totals`.
+    :param language: The name of the frontend to parse the code with, see `get_frontend`.
+        Defaults to C++, which covers C as well.
 
     :return: A mapping from each function name to its score. The score of top-level constructs
         is mapped to the 'None' key.
     """
     
+    return analyzer_for(language).for_string(
+        code,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        max_complexity=max_complexity
+    )
+
+
+def cognitive_complexity_for_many[K](
+    sources: Iterable[tuple[K, str | bytes | bytearray | memoryview]],
+    *,
+    backend: Literal["thread", "process"] = "thread",
+    jobs: int | None = None,
+    chunk_size: int = 64,
+    ordered: bool = True,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    max_complexity: int | None = None,
+    language: str = DEFAULT_FRONTEND
+) -> Iterator[tuple[K, dict[bytes | None, int]]]:
+    """
+    Calculate the modified cognitive complexity of many sources in parallel.
+
+    The sources are consumed lazily and grouped into chunks of `chunk_size` items, which are
+    scored by a pool of workers. At most two chunks per worker are in flight at any time,
+    so the memory usage is bounded regardless of the length of the input. The results are
+    the same as those of `cognitive_complexity_for_string`.
+    
+    The thread backend avoids transferring the sources between processes, but scoring only
+    runs concurrently where the GIL is released. The process backend scales with the number
+    of CPUs, but the identifiers and sources need to be picklable.
+    
+    :param sources: An iterable of (identifier, source code) pairs. The identifier is passed 
+        through unchanged and allows to associate the results with their sources.
+    :param backend: Whether the workers are threads or processes.
+    :param jobs: The number of workers. Defaults to the number of CPUs.
+    :param chunk_size: The number of sources handed to a worker at once. Larger chunks reduce
+        the overhead per source, smaller chunks reduce the latency and memory usage.
+    :param ordered: If the results should be yielded in input order instead of as soon as 
+        their chunk has been scored.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it.
+        Scoring a function stops as soon as its score provably exceeds the limit, so the score of
+        such a function is a lower bound, see `cognitive_complexity_totals`.
+    :param language: The name of the frontend to parse the sources with, see `cognitive_complexity_for_string`.
+
+    :return: An iterator over (identifier, scores) pairs, where the scores map each function name
+        to its score and the score of top-level constructs is mapped to the 'None' key.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+
+    if backend == "thread":
+        executor = ThreadPoolExecutor(max_workers=jobs)
+    elif backend == "process":
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    else:
+        raise ValueError(f"Unknown backend '{backend}'")
+
+    score = partial(
+        _score_chunk,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        max_complexity=max_complexity,
+        language=language
+    )
+
+    with executor:
+        chunks = itertools.batched(sources, chunk_size)
+        for results in imap_bounded(executor, score, chunks, max_pending=2 * jobs, ordered=ordered):
+            yield from results
+
+
+def _score_chunk[K](
+    chunk: tuple[tuple[K, str | bytes | bytearray | memoryview], ...],
+    *,
+    goto_nesting: bool,
+    structural_gotos: bool,
+    max_complexity: int | None,
+    language: str
+) -> list[tuple[K, dict[bytes | None, int]]]:
+    analyzer = analyzer_for(language)
+    return [
+        (key, analyzer.for_string(code, goto_nesting=goto_nesting, structural_gotos=structural_gotos, max_complexity=max_complexity))
+        for key, code in chunk
+    ]
+
+
+def cognitive_complexity_parallel(
+    code: str | bytes | bytearray | memoryview | mmap.mmap,
+    *,
+    jobs: int | None = None,
+    totals: bool = False,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    max_complexity: int | None = None,
+    language: str = DEFAULT_FRONTEND,
+    keys: bool = False
+) -> dict[bytes | None, Scores] | dict[bytes | None, int] | dict[FunctionKey | None, Scores] | dict[FunctionKey | None, int]:
+    """
+    Calculate the modified cognitive complexity of a single large source by scoring its functions in parallel.
+
+    The source is parsed once to find the outermost function definitions and to score the top-level
+    constructs. The function definitions are then scored by a pool of worker processes. Each worker
+    receives the source once and parses only the byte ranges of the function definitions it scores,
+    so the positions of the scores are those within the whole source. A function definition that
+    parses differently on its own, e.g. due to syntax errors, is scored within the whole source instead.
+
+    The result is the same as that of `cognitive_complexity` or `cognitive_complexity_totals` for
+    the syntax tree of the source, including the order of the functions.
+
+    :param code: The source code.
+    :param jobs: The number of worker processes. Defaults to the number of CPUs. With a single job,
+        all functions are scored in the current process.
+    :param totals: If only the total score of each function should be calculated.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it,
+        see `cognitive_complexity`.
+    :param language: The name of the frontend to parse the code with, see `cognitive_complexity_for_string`.
+    :param keys: If functions should be identified by a `FunctionKey` instead of their name, see
+        `cognitive_complexity`. The keys hold the positions within the whole source.
+
+    :return: A mapping from each function name or key to its scores, or to its total score if
+        `totals` is set. The score of top-level constructs is mapped to the 'None' key.
+    """
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
     if isinstance(code, str):
         code = code.encode()
-    
-    lang = Language(tree_sitter_cpp.language())
-    parser = Parser(lang)
-    tree = parser.parse(code)
-
-    scores_by_function = cognitive_complexity(tree.walk(), goto_nesting=goto_nesting, structural_gotos=structural_gotos)
-    return {
-        function_name: sum(cost.total for _, cost in scores)
-        for function_name, scores
-        in scores_by_function.items()
-    }
\ No newline at end of file
+
+    analyzer = analyzer_for(language)
+    score = partial(
+        cognitive_complexity_totals if totals else cognitive_complexity,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        max_complexity=max_complexity,
+        node_types=analyzer.frontend.node_types,
+        keys=keys
+    )
+    tree = analyzer.parse(code)
+
+    functions: list[Node] = []
+
+    def function_hook(node: Node) -> dict[bytes, Any]:
+        functions.append(node)
+        return {}
+
+    top_level = score(tree.walk(), function_hook=function_hook)
+
+    results: list[dict[bytes, Any] | None] = [None] * len(functions)
+    if jobs > 1 and len(functions) > 1:
+        spans = [
+            (node.start_byte, node.end_byte, node.start_point, node.end_point, node.descendant_count)
+            for node in functions
+        ]
+        initargs = (bytes(code), totals, goto_nesting, structural_gotos, max_complexity, analyzer.frontend.name, keys)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_function_worker, initargs=initargs) as executor:
+            chunks = executor.map(_score_functions, _balanced_chunks(spans, 4 * jobs))
+            results = list(itertools.chain.from_iterable(chunks))
+
+    scores_by_function = {}
+    for node, scores in zip(functions, results):
+        if scores is None:
+            scores = score(node.walk())
+            scores.pop(None, None)
+        scores_by_function.update(scores)
+
+    # the top-level constructs are missing, if they do not exceed the limit
+    if None in top_level:
+        scores_by_function[None] = top_level[None]
+    return scores_by_function
+
+
+type _Span = tuple[int, int, Point, Point, int]
+
+_function_worker: tuple[Parser, bytes, Callable[..., dict], str] | None = None
+"""The parser, source, options and function definition type of a worker process of `cognitive_complexity_parallel`."""
+
+
+def _init_function_worker(
+    code: bytes,
+    totals: bool,
+    goto_nesting: bool,
+    structural_gotos: bool,
+    max_complexity: int | None = None,
+    language: str = DEFAULT_FRONTEND,
+    keys: bool = False
+):
+    global _function_worker
+
+    # a separate parser, as its included ranges are changed
+    analyzer = analyzer_for(language)
+    parser = Parser(analyzer.language)
+    node_types = analyzer.frontend.node_types
+    score = partial(
+        cognitive_complexity_totals if totals else cognitive_complexity,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        max_complexity=max_complexity,
+        node_types=node_types,
+        keys=keys
+    )
+    _function_worker = (parser, code, score, node_types.function_definition)
+
+
+def _score_functions(spans: list[_Span]) -> list[dict[bytes, Any] | None]:
+    parser, code, score, function_definition = _function_worker
+
+    results = []
+    for start_byte, end_byte, start_point, end_point, descendant_count in spans:
+        parser.included_ranges = [Range(start_point, end_point, start_byte, end_byte)]
+        node = parser.parse(code).root_node.descendant_for_byte_range(start_byte, end_byte)
+
+        if (
+            node is None
+            or node.type != function_definition
+            or node.start_byte != start_byte
+            or node.end_byte != end_byte
+            or node.descendant_count != descendant_count
+        ):
+            results.append(None)
+            continue
+
+        scores = score(node.walk())
+        scores.pop(None, None)
+        results.append(scores)
+
+    return results
+
+
+def _balanced_chunks(spans: list[_Span], count: int) -> Iterator[list[_Span]]:
+    """Split the spans into about `count` chunks of consecutive spans with a similar number of bytes."""
+
+    target = sum(end - start for start, end, *_ in spans) / count
+    chunk: list[_Span] = []
+    size = 0
+    for span in spans:
+        chunk.append(span)
+        size += span[1] - span[0]
+        if size >= target:
+            yield chunk
+            chunk = []
+            size = 0
+
+    if chunk:
+        yield chunk
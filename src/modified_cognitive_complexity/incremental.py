@@ -0,0 +1,212 @@
+from tree_sitter import Node, Point, Tree
+
+from modified_cognitive_complexity.analyzer import ComplexityAnalyzer, default_analyzer
+from modified_cognitive_complexity.complexity import Location, Score, Scores, cognitive_complexity
+
+
+class IncrementalSession:
+    """
+    Keeps the syntax tree and scores of a changing source file, e.g. an editor buffer, up to date.
+
+    After each edit, the previous syntax tree is edited and reused for reparsing, so that Tree-sitter
+    only reparses the changed parts. When scoring, only function definitions whose text or syntactic
+    structure changed are scored again. The scores of all other function definitions are reused and
+    only moved to their new position. Top-level constructs are always scored again, which is cheap
+    as they exclude the function bodies.
+
+    Since gotos and labels are resolved within their function, reusing the scores of a function
+    does not affect the goto nesting.
+    """
+
+    def __init__(
+        self,
+        code: str | bytes,
+        *,
+        analyzer: ComplexityAnalyzer | None = None,
+        goto_nesting: bool = True,
+        structural_gotos: bool = False
+    ):
+        """
+        :param code: The initial source code.
+        :param analyzer: The analyzer whose parser is used. Defaults to the `default_analyzer`.
+        :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+        :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+            by their respective label.
+        """
+
+        if isinstance(code, str):
+            code = code.encode()
+
+        self.analyzer = default_analyzer() if analyzer is None else analyzer
+        self.goto_nesting = goto_nesting
+        self.structural_gotos = structural_gotos
+        self.rescored = 0
+        """The number of function definitions that were scored again by the last call of `scores`."""
+
+        self._code = code
+        self._tree = self.analyzer.parser.parse(code)
+        self._changed_ranges: list[tuple[int, int]] = []
+        """The byte ranges that changed since the last call of `scores`."""
+        self._functions: dict[bytes, tuple[Point, dict[bytes, Scores]]] = {}
+
+    @property
+    def code(self) -> bytes:
+        """The current source code."""
+        return self._code
+
+    @property
+    def tree(self) -> Tree:
+        """The syntax tree of the current source code."""
+        return self._tree
+
+    def edit(self, start_byte: int, old_end_byte: int, text: str | bytes):
+        """
+        Replace a part of the source code and reparse it incrementally.
+
+        :param start_byte: The start of the replaced part.
+        :param old_end_byte: The end of the replaced part in the old source code.
+        :param text: The text that replaces the part.
+        """
+
+        if isinstance(text, str):
+            text = text.encode()
+        if not 0 <= start_byte <= old_end_byte <= len(self._code):
+            raise ValueError("The edited range is not within the source code")
+
+        old_code = self._code
+        new_code = old_code[:start_byte] + text + old_code[old_end_byte:]
+        new_end_byte = start_byte + len(text)
+
+        start_point = _point(old_code, start_byte)
+        old_end_point = _point(old_code, old_end_byte)
+        new_end_point = _point(new_code, new_end_byte)
+
+        old_tree = self._tree
+        old_tree.edit(
+            start_byte=start_byte,
+            old_end_byte=old_end_byte,
+            new_end_byte=new_end_byte,
+            start_point=start_point,
+            old_end_point=old_end_point,
+            new_end_point=new_end_point,
+        )
+        new_tree = self.analyzer.parser.parse(new_code, old_tree)
+
+        # move the ranges changed by previous edits behind this edit
+        delta = new_end_byte - old_end_byte
+        changed_ranges = [
+            (
+                start + delta if start >= old_end_byte else start,
+                end + delta if end >= old_end_byte else min(end, new_end_byte) if end > start_byte else end
+            )
+            for start, end in self._changed_ranges
+        ]
+        changed_ranges.extend((r.start_byte, r.end_byte) for r in old_tree.changed_ranges(new_tree))
+        changed_ranges.append((start_byte, new_end_byte))
+
+        self._changed_ranges = changed_ranges
+        self._code = new_code
+        self._tree = new_tree
+
+    def update(self, code: str | bytes):
+        """
+        Replace the whole source code, e.g. with the new content of an editor buffer.
+
+        The changed part is determined as the range between the common prefix and suffix of the
+        old and new source code and applied with `edit`.
+
+        :param code: The new source code.
+        """
+
+        if isinstance(code, str):
+            code = code.encode()
+
+        old_code = self._code
+        limit = min(len(old_code), len(code))
+
+        prefix = 0
+        while prefix < limit and old_code[prefix] == code[prefix]:
+            prefix += 1
+
+        suffix = 0
+        while suffix < limit - prefix and old_code[-1 - suffix] == code[-1 - suffix]:
+            suffix += 1
+
+        self.edit(prefix, len(old_code) - suffix, code[prefix:len(code) - suffix])
+
+    def scores(self) -> dict[bytes | None, Scores]:
+        """
+        Calculate the scores of the current source code, reusing the scores of unchanged functions.
+
+        The result equals `cognitive_complexity(session.tree.walk())`. The results of consecutive calls
+        may share the objects of reused scores.
+
+        :return: A mapping from each function name to its score. The score of top-level constructs
+            is mapped to the 'None' key.
+        """
+
+        functions: dict[bytes, tuple[Point, dict[bytes, Scores]]] = {}
+        changed_ranges = self._changed_ranges
+        node_types = self.analyzer.frontend.node_types
+        self.rescored = 0
+
+        def function_hook(node: Node) -> dict[bytes, Scores]:
+            text = node.text
+            cached = self._functions.get(text)
+            if cached is None or _intersects(node, changed_ranges):
+                scores = cognitive_complexity(
+                    node.walk(),
+                    goto_nesting=self.goto_nesting,
+                    structural_gotos=self.structural_gotos,
+                    node_types=node_types
+                )
+                scores.pop(None)
+                cached = (node.start_point, scores)
+                self.rescored += 1
+
+            functions[text] = cached
+            return _move(cached[1], cached[0], node.start_point)
+
+        scores = cognitive_complexity(
+            self._tree.walk(),
+            goto_nesting=self.goto_nesting,
+            structural_gotos=self.structural_gotos,
+            function_hook=function_hook,
+            node_types=node_types
+        )
+
+        self._functions = functions
+        self._changed_ranges = []
+        return scores
+
+
+def _point(code: bytes, byte: int) -> Point:
+    row = code.count(b"\n", 0, byte)
+    return Point(row, byte - (code.rfind(b"\n", 0, byte) + 1))
+
+
+def _intersects(node: Node, ranges: list[tuple[int, int]]) -> bool:
+    start, end = node.start_byte, node.end_byte
+    return any(range_start < end and start < range_end for range_start, range_end in ranges)
+
+
+def _move(scores_by_function: dict[bytes, Scores], old: Point, new: Point) -> dict[bytes, Scores]:
+    """Move the locations of the scores of a function from its old to its new start point."""
+
+    if old == new:
+        return scores_by_function
+
+    rows = new.row - old.row
+    columns = new.column - old.column
+
+    def move(point: Point) -> Point:
+        # only the columns on the first row of the function are relative to its start
+        return Point(point.row + rows, point.column + columns if point.row == old.row else point.column)
+
+    return {
+        function_name: [
+            (Location(move(location.start), move(location.end)), Score(score.increment, score.nesting))
+            for location, score in scores
+        ]
+        for function_name, scores in scores_by_function.items()
+    }
@@ -0,0 +1,459 @@
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Iterable
+
+from tree_sitter import Point
+
+from modified_cognitive_complexity.cache import _FORMAT_VERSION, _version
+from modified_cognitive_complexity.complexity import FunctionKey, Location, Nesting, Score, Scores
+from modified_cognitive_complexity.scan import FileResult, iter_source_files, score_files
+
+
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    directory TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    name BLOB,
+    total INTEGER NOT NULL,
+    start_row INTEGER,
+    start_column INTEGER,
+    start_byte INTEGER,
+    end_byte INTEGER
+);
+CREATE INDEX IF NOT EXISTS functions_by_file ON functions (file_id);
+CREATE INDEX IF NOT EXISTS functions_by_total ON functions (total DESC);
+CREATE TABLE IF NOT EXISTS locations (
+    function_id INTEGER NOT NULL REFERENCES functions (id) ON DELETE CASCADE,
+    start_row INTEGER NOT NULL,
+    start_column INTEGER NOT NULL,
+    end_row INTEGER NOT NULL,
+    end_column INTEGER NOT NULL,
+    increment INTEGER NOT NULL,
+    nesting INTEGER,
+    goto_nesting INTEGER
+);
+CREATE INDEX IF NOT EXISTS locations_by_function ON locations (function_id);
+"""
+
+_COMMIT_INTERVAL = 256
+"""The number of rescored files after which the index is committed, so that an interrupted refresh keeps its progress."""
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedFunction:
+    """The total score of a function in the index."""
+    path: str
+    """The path of the file, relative to the root of the index if the file is within it."""
+    function: bytes | None
+    """The name of the function or `None` for the top-level constructs."""
+    total: int
+    start_row: int | None = None
+    """The start row of the function definition, if the index was refreshed with `keys`."""
+    start_byte: int | None = None
+    """The offset of the first byte of the function definition, if the index was refreshed with `keys`."""
+
+
+@dataclass(frozen=True, slots=True)
+class DirectoryRollup:
+    """The aggregated scores of the files in a directory and its subdirectories."""
+    directory: str
+    files: int
+    functions: int
+    """The number of functions, excluding top-level constructs."""
+    total: int
+    """The sum of the scores of all functions and top-level constructs."""
+    max: int
+    """The highest score of a function or of the top-level constructs of a file."""
+
+
+@dataclass(slots=True)
+class RefreshSummary:
+    """The changes made by `ProjectIndex.refresh`."""
+    scored: int = 0
+    """The number of new or changed files, which were scored."""
+    unchanged: int = 0
+    removed: int = 0
+    """The number of files removed from the index, as they do not exist anymore."""
+    errors: list[tuple[Path, str]] = field(default_factory=list)
+    """The files that could not be read, with the reason."""
+
+
+class ProjectIndex:
+    """
+    A persistent index of the scores of the functions in a project, stored in an SQLite database.
+
+    The index stores the size, modification time and content hash of each file, the total score of
+    each function and optionally the scores of the individual locations. A refresh only scores files
+    that were added or whose content changed, so that the index can be kept up to date cheaply and
+    queried without parsing, e.g. for the most complex functions of a directory.
+
+    Paths are stored relative to the root of the index, the directory of the database by default,
+    with forward slashes. Files outside of the root are stored with their absolute path.
+    """
+
+    def __init__(self, database: Path, *, root: Path | None = None, create: bool = True):
+        """
+        :param database: The path of the database.
+        :param root: The directory the stored paths are relative to. Defaults to the directory of the database.
+        :param create: If the database should be created, if it does not exist.
+
+        :raises FileNotFoundError: If the database does not exist and should not be created.
+        """
+
+        database = Path(database)
+        if not create and not database.exists():
+            raise FileNotFoundError(f"The index '{database}' does not exist")
+
+        self.database = database
+        self.root = Path(os.path.abspath(database.parent if root is None else root))
+        self._connection = sqlite3.connect(database)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")  # queries are not blocked by a refresh
+
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            version = self._meta("schema")
+            if version is None:
+                self._set_meta("schema", str(_SCHEMA_VERSION))
+            elif version != str(_SCHEMA_VERSION):
+                raise ValueError(f"The index '{database}' has the unsupported version {version}")
+
+    def __enter__(self) -> "ProjectIndex":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def refresh(
+        self,
+        paths: Iterable[str | Path],
+        *,
+        jobs: int = 1,
+        goto_nesting: bool = True,
+        structural_gotos: bool = False,
+        locations: bool = False,
+        language: str | None = None,
+        keys: bool = False
+    ) -> RefreshSummary:
+        """
+        Bring the index up to date with the source files.
+
+        A file is considered unchanged, if its size and modification time equal those in the index,
+        or if its content hash does. All other files are scored, see `score_files`, and replace their
+        previous scores. Files in the index that do not exist anymore are removed. If the options,
+        the version of this package or the format of the scores differ from those the index was
+        created with, all files are scored again.
+
+        :param paths: The files, directories and glob patterns to index, see `iter_source_files`.
+        :param jobs: The number of worker processes, see `score_files`.
+        :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+        :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+            by their respective label.
+        :param locations: If the scores of the individual locations should be stored as well.
+        :param language: The name of the frontend to parse all files with, see `score_files`.
+        :param keys: If functions should be identified by a `FunctionKey` instead of their name, so
+            that overloads and static functions with the same name in a file are all stored.
+
+        :return: A summary of the changes.
+        """
+
+        summary = RefreshSummary()
+        options = json.dumps({
+            "goto_nesting": goto_nesting,
+            "structural_gotos": structural_gotos,
+            "locations": locations,
+            "language": language,
+            "keys": keys,
+            "version": _version("modified_cognitive_complexity"),
+            "format": _FORMAT_VERSION,
+        })
+
+        connection = self._connection
+        with connection:
+            if self._meta("options") != options:
+                connection.execute("DELETE FROM files")
+                self._set_meta("options", options)
+
+        known = {
+            path: (size, mtime_ns, digest)
+            for path, size, mtime_ns, digest in connection.execute("SELECT path, size, mtime_ns, hash FROM files")
+        }
+
+        seen: set[str] = set()
+        changed: list[tuple[str, os.stat_result, bytes]] = []
+        files: list[Path] = []
+        for file in iter_source_files(paths):
+            path = self._key(file)
+            if path in seen:
+                continue
+            seen.add(path)
+
+            try:
+                stat = file.stat()
+                entry = known.get(path)
+                if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+                    summary.unchanged += 1
+                    continue
+
+                with open(file, "rb") as source:
+                    digest = hashlib.file_digest(source, "sha256").digest()
+            except OSError as e:
+                summary.errors.append((file, e.strerror or str(e)))
+                continue
+
+            if entry is not None and entry[2] == digest:
+                # e.g. touched or checked out again
+                with connection:
+                    connection.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                        (stat.st_size, stat.st_mtime_ns, path)
+                    )
+                summary.unchanged += 1
+                continue
+
+            changed.append((path, stat, digest))
+            files.append(file)
+
+        results = score_files(
+            files,
+            jobs=jobs,
+            ordered=True,
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            locations=locations,
+            language=language,
+            keys=keys
+        )
+        try:
+            for (path, stat, digest), result in zip(changed, results):
+                if result.scores is None:
+                    summary.errors.append((result.path, result.error))
+                    continue
+
+                self._store(path, stat, digest, result)
+                summary.scored += 1
+                if summary.scored % _COMMIT_INTERVAL == 0:
+                    connection.commit()
+        except BaseException:
+            connection.commit()  # keep the files scored so far
+            raise
+
+        for path in known.keys() - seen:
+            if not self._path(path).exists():
+                connection.execute("DELETE FROM files WHERE path = ?", (path,))
+                summary.removed += 1
+
+        connection.commit()
+        return summary
+
+    def top(self, k: int, *, prefix: str | Path | None = None) -> list[IndexedFunction]:
+        """
+        Find the functions with the highest scores.
+
+        :param k: The number of functions.
+        :param prefix: An optional file or directory, to which the search is limited.
+
+        :return: Up to `k` functions in descending order of their score.
+        """
+
+        condition, parameters = self._prefix_condition(prefix)
+        return self._functions(f"WHERE {condition} ORDER BY functions.total DESC, files.path, functions.id LIMIT ?", (*parameters, k))
+
+    def over(self, threshold: int, *, prefix: str | Path | None = None) -> list[IndexedFunction]:
+        """
+        Find the functions whose score exceeds a threshold.
+
+        :param threshold: The threshold.
+        :param prefix: An optional file or directory, to which the search is limited.
+
+        :return: The functions in descending order of their score.
+        """
+
+        condition, parameters = self._prefix_condition(prefix)
+        return self._functions(
+            f"WHERE {condition} AND functions.total > ? ORDER BY functions.total DESC, files.path, functions.id",
+            (*parameters, threshold)
+        )
+
+    def rollup(self, *, depth: int = 1, prefix: str | Path | None = None) -> list[DirectoryRollup]:
+        """
+        Aggregate the scores per directory.
+
+        :param depth: The number of leading path components of the directories to aggregate by.
+            Files in shallower directories are aggregated by their own directory.
+        :param prefix: An optional file or directory, to which the aggregation is limited.
+
+        :return: The aggregated scores of each directory, ordered by the directory.
+        """
+
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+
+        condition, parameters = self._prefix_condition(prefix)
+        rows = self._connection.execute(
+            f"""
+            SELECT files.directory, COUNT(DISTINCT files.id), COUNT(functions.name), COALESCE(SUM(functions.total), 0), COALESCE(MAX(functions.total), 0)
+            FROM files LEFT JOIN functions ON functions.file_id = files.id
+            WHERE {condition}
+            GROUP BY files.directory
+            """,
+            parameters
+        )
+
+        rollups: dict[str, list[int]] = {}
+        for directory, files, functions, total, maximum in rows:
+            parts = PurePosixPath(directory).parts
+            key = str(PurePosixPath(*parts[:depth])) if parts else "."
+            rollup = rollups.setdefault(key, [0, 0, 0, 0])
+            rollup[0] += files
+            rollup[1] += functions
+            rollup[2] += total
+            rollup[3] = max(rollup[3], maximum)
+
+        return [DirectoryRollup(directory, *rollup) for directory, rollup in sorted(rollups.items())]
+
+    def scores(self, path: str | Path) -> dict[bytes | None, Scores] | dict[bytes | None, int] | None:
+        """
+        Get the stored scores of a file.
+
+        :param path: The file.
+
+        :return: A mapping from each function name, or `FunctionKey` if the index was refreshed with
+            `keys`, to its scores, if the locations were stored, and to its total otherwise. `None`,
+            if the file is not in the index.
+        """
+
+        connection = self._connection
+        row = connection.execute("SELECT id FROM files WHERE path = ?", (self._key(Path(path)),)).fetchone()
+        if row is None:
+            return None
+
+        functions = [
+            (
+                function_id,
+                name if name is None or start_byte is None else FunctionKey(name, Point(start_row, start_column), start_byte, end_byte),
+                total
+            )
+            for function_id, name, total, start_row, start_column, start_byte, end_byte in connection.execute(
+                "SELECT id, name, total, start_row, start_column, start_byte, end_byte FROM functions WHERE file_id = ? ORDER BY id",
+                row
+            )
+        ]
+        if json.loads(self._meta("options") or "{}").get("locations") is not True:
+            return {function: total for _, function, total in functions}
+
+        scores_by_function: dict[bytes | FunctionKey | None, Scores] = {}
+        for function_id, function, _ in functions:
+            scores_by_function[function] = [
+                (
+                    Location(Point(start_row, start_column), Point(end_row, end_column)),
+                    Score(increment, None if nesting is None else Nesting(nesting, goto_nesting))
+                )
+                for start_row, start_column, end_row, end_column, increment, nesting, goto_nesting in connection.execute(
+                    """
+                    SELECT start_row, start_column, end_row, end_column, increment, nesting, goto_nesting
+                    FROM locations WHERE function_id = ? ORDER BY rowid
+                    """,
+                    (function_id,)
+                )
+            ]
+
+        return scores_by_function
+
+    def _store(self, path: str, stat: os.stat_result, digest: bytes, result: FileResult):
+        connection = self._connection
+        connection.execute("DELETE FROM files WHERE path = ?", (path,))
+        file_id = connection.execute(
+            "INSERT INTO files (path, directory, size, mtime_ns, hash) VALUES (?, ?, ?, ?, ?)",
+            (path, str(PurePosixPath(path).parent), stat.st_size, stat.st_mtime_ns, digest)
+        ).lastrowid
+
+        for function, total in result.scores.items():
+            if isinstance(function, FunctionKey):
+                row = (function.name, total, function.start.row, function.start.column, function.start_byte, function.end_byte)
+            else:
+                row = (function, total, None, None, None, None)
+
+            function_id = connection.execute(
+                "INSERT INTO functions (file_id, name, total, start_row, start_column, start_byte, end_byte) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_id, *row)
+            ).lastrowid
+
+            if result.locations is not None:
+                connection.executemany(
+                    "INSERT INTO locations VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            function_id,
+                            location.start.row,
+                            location.start.column,
+                            location.end.row,
+                            location.end.column,
+                            cost.increment,
+                            None if cost.nesting is None else cost.nesting.value,
+                            None if cost.nesting is None else cost.nesting.goto,
+                        )
+                        for location, cost in result.locations[function]
+                    )
+                )
+
+    def _functions(self, clauses: str, parameters: tuple) -> list[IndexedFunction]:
+        rows = self._connection.execute(
+            f"""
+            SELECT files.path, functions.name, functions.total, functions.start_row, functions.start_byte
+            FROM functions JOIN files ON files.id = functions.file_id {clauses}
+            """,
+            parameters
+        )
+        return [IndexedFunction(*row) for row in rows]
+
+    def _prefix_condition(self, prefix: str | Path | None) -> tuple[str, tuple]:
+        if prefix is None:
+            return "TRUE", ()
+
+        key = self._key(Path(prefix))
+        if key == ".":
+            return "TRUE", ()
+
+        directory = key.rstrip("/") + "/"
+        return "(files.path = ? OR substr(files.path, 1, ?) = ?)", (key, len(directory), directory)
+
+    def _key(self, file: Path) -> str:
+        """The path of a file as stored in the index."""
+
+        file = Path(os.path.abspath(file))
+        try:
+            return file.relative_to(self.root).as_posix() or "."
+        except ValueError:
+            return file.as_posix()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def _meta(self, key: str) -> str | None:
+        row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key: str, value: str):
+        self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
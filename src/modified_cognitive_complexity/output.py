@@ -0,0 +1,215 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, TextIO
+
+if TYPE_CHECKING:
+    from modified_cognitive_complexity.complexity import FunctionKey, Scores
+    from modified_cognitive_complexity.gitdiff import FunctionDelta
+    from modified_cognitive_complexity.index import DirectoryRollup
+
+
+FORMATS = ("text", "jsonl", "csv", "json")
+"""The output formats supported by the CLI."""
+
+FIELDS = (
+    "kind", "file", "function", "total", "partial",
+    "start_row", "start_column", "end_row", "end_column",
+    "increment", "nesting", "goto_nesting", "start_byte",
+    "function_start_row", "function_start_byte",
+)
+"""
+The fields of a record. Function records only have the first four fields, `partial`, if scored with
+a limit, and `start_row` and `start_byte`, if identified by a `FunctionKey`. Location records have
+all fields but `partial` and `start_byte`, and have `function_start_row` and `function_start_byte`,
+the position of their function, only if it is identified by a `FunctionKey`.
+"""
+
+DELTA_FIELDS = ("file", "function", "before", "after", "delta")
+"""The fields of a record of a complexity delta."""
+
+ROLLUP_FIELDS = ("directory", "files", "functions", "total", "max")
+"""The fields of a record of the aggregated complexity of a directory."""
+
+type Record = dict[str, Any]
+
+
+def records(
+    file: Path | None,
+    scores_by_function: "dict[bytes | FunctionKey | None, int] | dict[bytes | FunctionKey | None, Scores]",
+    *,
+    partial: bool = False
+) -> Iterator[Record]:
+    """
+    Convert the scores of a file into records.
+
+    There is one function record per function, with the top-level constructs as a function
+    without name. If the scores of the individual locations are given, each function record
+    is followed by one location record per score. The nesting of a location is `None`, if
+    the location is not subject to nesting. The function record of a `FunctionKey` holds the
+    start row and byte offset of the function definition, which tell functions with the same
+    name apart. Its location records hold them as `function_start_row` and `function_start_byte`.
+
+    :param file: The scored file or `None`, if the source code was read from stdin.
+    :param scores_by_function: Either the total or the individual scores of each function, by name
+        or by `FunctionKey`.
+    :param partial: If the functions were scored with a complexity limit, so that scoring may have
+        stopped once a function exceeded it. The function records are then marked as `partial`, as
+        their total and locations are only a lower bound.
+
+    :return: An iterator over the records.
+    """
+
+    file_name = None if file is None else str(file)
+
+    for function, scores in scores_by_function.items():
+        key = None
+        function_name = function
+        if function is not None:
+            if not isinstance(function, bytes):
+                key = function
+                function_name = function.name
+            function_name = function_name.decode(errors="replace")
+
+        if isinstance(scores, int):
+            record = {"kind": "function", "file": file_name, "function": function_name, "total": scores}
+        else:
+            record = {"kind": "function", "file": file_name, "function": function_name, "total": sum(cost.total for _, cost in scores)}
+        if partial:
+            record["partial"] = True
+        if key is not None:
+            record["start_row"] = key.start.row
+            record["start_byte"] = key.start_byte
+        yield record
+
+        if isinstance(scores, int):
+            continue
+
+        for location, cost in scores:
+            location_record = {
+                "kind": "location",
+                "file": file_name,
+                "function": function_name,
+                "total": cost.total,
+                "start_row": location.start.row,
+                "start_column": location.start.column,
+                "end_row": location.end.row,
+                "end_column": location.end.column,
+                "increment": cost.increment,
+                "nesting": None if cost.nesting is None else cost.nesting.value,
+                "goto_nesting": None if cost.nesting is None else cost.nesting.goto,
+            }
+            if key is not None:
+                location_record["function_start_row"] = key.start.row
+                location_record["function_start_byte"] = key.start_byte
+            yield location_record
+
+
+def delta_records(deltas: "Iterable[FunctionDelta]") -> Iterator[Record]:
+    """
+    Convert complexity deltas into records.
+
+    :param deltas: The deltas of changed functions, see `diff_revisions`.
+
+    :return: An iterator over the records. The score of a function that did not exist is `None`.
+    """
+
+    for delta in deltas:
+        function_name = None if delta.function is None else delta.function.decode(errors="replace")
+        yield {"file": delta.path, "function": function_name, "before": delta.before, "after": delta.after, "delta": delta.delta}
+
+
+def rollup_records(rollups: "Iterable[DirectoryRollup]") -> Iterator[Record]:
+    """
+    Convert the aggregated scores of directories into records.
+
+    :param rollups: The aggregated scores, see `ProjectIndex.rollup`.
+
+    :return: An iterator over the records.
+    """
+
+    for rollup in rollups:
+        yield {"directory": rollup.directory, "files": rollup.files, "functions": rollup.functions, "total": rollup.total, "max": rollup.max}
+
+
+class RecordWriter(ABC):
+    """
+    Writes records to a stream as soon as they are produced.
+
+    Each record is written and the stream flushed per batch of records, so that downstream
+    consumers can process the output while it is being produced.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write(self, records: Iterable[Record]):
+        for record in records:
+            self._write(record)
+        self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+    @abstractmethod
+    def _write(self, record: Record):
+        """Write a single record, without flushing the stream."""
+
+
+class JsonLinesWriter(RecordWriter):
+    """Writes one JSON object per line."""
+
+    def _write(self, record: Record):
+        self.stream.write(json.dumps(record))
+        self.stream.write("\n")
+
+
+class JsonWriter(RecordWriter):
+    """Writes a single JSON array, whose elements are written incrementally."""
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._empty = True
+
+    def _write(self, record: Record):
+        self.stream.write("[\n" if self._empty else ",\n")
+        self.stream.write(json.dumps(record))
+        self._empty = False
+
+    def close(self):
+        self.stream.write("[]\n" if self._empty else "\n]\n")
+        super().close()
+
+
+class CsvWriter(RecordWriter):
+    """Writes CSV with a header row. Fields a record does not have are left empty."""
+
+    def __init__(self, stream: TextIO, fields: tuple[str, ...] = FIELDS):
+        super().__init__(stream)
+        self._writer = csv.DictWriter(stream, fieldnames=fields, lineterminator="\n")
+        self._writer.writeheader()
+
+    def _write(self, record: Record):
+        self._writer.writerow(record)
+
+
+def record_writer(format: str, stream: TextIO, fields: tuple[str, ...] = FIELDS) -> RecordWriter:
+    """
+    Create the writer for a machine-readable output format.
+
+    :param format: One of the `FORMATS` except "text".
+    :param stream: The stream the records are written to.
+    :param fields: The fields of the records, which are required for the CSV header.
+
+    :return: The writer.
+    """
+
+    if format == "jsonl":
+        return JsonLinesWriter(stream)
+    if format == "json":
+        return JsonWriter(stream)
+    if format == "csv":
+        return CsvWriter(stream, fields)
+
+    raise ValueError(f"Unknown format '{format}'")
@@ -0,0 +1,66 @@
+from collections import deque
+from concurrent.futures import Executor, Future, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, Iterator
+
+
+def imap_bounded[T, R](
+    executor: Executor,
+    function: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    max_pending: int,
+    ordered: bool = True
+) -> Iterator[R]:
+    """
+    Lazily map a function over an iterable using an executor.
+
+    In contrast to `Executor.map`, the input iterable is consumed incrementally, so that
+    at most `max_pending` tasks are submitted but not yet yielded at any time. This keeps
+    the memory usage bounded independently of the length of the input.
+
+    :param executor: The executor the tasks are submitted to.
+    :param function: The function applied to each item. Must be picklable for process executors.
+    :param items: The items to map the function over.
+    :param max_pending: The maximum number of tasks in flight.
+    :param ordered: If the results should be yielded in input order. Otherwise results are
+        yielded as soon as they are available.
+
+    :return: An iterator over the results. Exceptions raised by `function` are re-raised
+        when the respective result is reached.
+    """
+
+    if max_pending < 1:
+        raise ValueError("max_pending must be at least 1")
+
+    pending: deque[Future[R]] | set[Future[R]] = deque() if ordered else set()
+    iterator = iter(items)
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                future = executor.submit(function, item)
+                if ordered:
+                    pending.append(future)
+                else:
+                    pending.add(future)
+
+            if not pending:
+                return
+
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,213 @@
+from typing import Iterable, Mapping
+
+from tree_sitter import Node, TreeCursor
+
+from modified_cognitive_complexity.complexity import Scores, collect_branches
+from modified_cognitive_complexity.frontends import C_FAMILY, NodeTypes
+from modified_cognitive_complexity.stats import Stats
+
+
+type Configuration = Mapping[str, int]
+"""The macros defined in a configuration of the preprocessor with their values. All other macros are undefined."""
+
+
+def cognitive_complexity_configurations(
+    cursor: TreeCursor,
+    configurations: Iterable[Configuration],
+    *,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    totals: bool = True,
+    stats: Stats | None = None,
+    node_types: NodeTypes = C_FAMILY,
+    keys: bool = False
+) -> list[dict[bytes | None, int]] | list[dict[bytes | None, Scores]]:
+    """
+    Calculate the modified cognitive complexity of each function for several configurations of the preprocessor.
+
+    The syntax tree is traversed only once. The code locations in each branch of an `#if`, `#ifdef`,
+    `#elif` or `#else` directive are recorded together with the branch, and the branches are evaluated
+    for each configuration afterwards. Only the code locations of the active branches, including their
+    gotos and labels, are scored, and functions defined in inactive branches are left out, so that
+    the result equals scoring the preprocessed source code of each configuration, but without
+    preprocessing and parsing it again. The conditions of the directives are not scored.
+
+    Conditions are evaluated like the C preprocessor does, but without expanding macros, i.e. a
+    macro is replaced by its value and undefined macros are 0. Conditions the grammar can not parse,
+    e.g. with the conditional operator or `__has_include`, are false. Only directives enclosing whole
+    declarations or statements can be evaluated, as the grammar can not parse other ones into a
+    conditional.
+
+    :param cursor: A cursor currently positioned at a node, typically the root of a syntax tree.
+    :param configurations: The configurations, e.g. `{"DEBUG": 1}` for `-DDEBUG`.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param totals: If only the total score of each function should be calculated, see
+        `cognitive_complexity_totals`, or the scores of the individual code locations.
+    :param stats: Optional statistics of the traversal, see `cognitive_complexity`.
+    :param node_types: The node types of the grammar the syntax tree was parsed with, see `Frontend`.
+    :param keys: If functions should be identified by a `FunctionKey` instead of their name, see
+        `cognitive_complexity`.
+
+    :return: One mapping per configuration, in their order, from each function name or key to its
+        score. The score of top-level constructs is mapped to the 'None' key.
+    """
+
+    collected = collect_branches(
+        cursor,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        totals=totals,
+        stats=stats,
+        node_types=node_types
+    )
+
+    return [
+        collected.scores(_active_regions(collected.branches, configuration), keys=keys)
+        for configuration in configurations
+    ]
+
+
+def _active_regions(branches: list[tuple[int, tuple[Node, ...]]], configuration: Configuration) -> list[bool]:
+    """
+    Evaluate the branches of the preprocessor conditionals.
+
+    A branch is active, if the region it is in is active, its condition is true and the conditions
+    of the branches preceding it in its conditional are false.
+
+    :param branches: The (parent region, chain) pair of each branch, see `BranchedScores`.
+    :param configuration: The defined macros.
+
+    :return: If the region of unconditional code, followed by the region of each branch, is active.
+    """
+
+    conditions: dict[int, bool] = {}
+
+    def condition(node: Node) -> bool:
+        value = conditions.get(node.id)
+        if value is None:
+            value = conditions[node.id] = _condition(node, configuration)
+        return value
+
+    active = [True]
+    for parent_region, chain in branches:
+        active.append(
+            active[parent_region]
+            and not any(condition(node) for node in chain[:-1])
+            and condition(chain[-1])
+        )
+
+    return active
+
+
+def _condition(node: Node, configuration: Configuration) -> bool:
+    """Evaluate the condition of a branch of a preprocessor conditional."""
+
+    node_type = node.type
+    if node_type == "preproc_else":
+        return True
+
+    if node_type in ("preproc_ifdef", "preproc_elifdef"):
+        name = node.child_by_field_name("name")
+        negated = node.child(0).type in ("#ifndef", "#elifndef")
+        return name is not None and (name.text.decode() in configuration) != negated
+
+    condition = node.child_by_field_name("condition")
+    if condition is None or condition.has_error:
+        return False
+
+    return _evaluate(condition, configuration) != 0
+
+
+def _evaluate(node: Node, configuration: Configuration) -> int:
+    """Evaluate an expression of a preprocessor condition."""
+
+    node_type = node.type
+    if node_type == "number_literal":
+        return _number(node.text.decode())
+
+    if node_type == "identifier":
+        return configuration.get(node.text.decode(), 0)
+
+    if node_type == "preproc_defined":
+        name = node.named_child(0)
+        return int(name is not None and name.text.decode() in configuration)
+
+    if node_type == "char_literal":
+        character = node.text.decode()[1:-1]
+        return ord(character) if len(character) == 1 else 0
+
+    if node_type == "parenthesized_expression":
+        return _evaluate(node.named_child(0), configuration)
+
+    if node_type == "unary_expression":
+        operator = node.child_by_field_name("operator").text
+        argument = _evaluate(node.child_by_field_name("argument"), configuration)
+        if operator == b"!":
+            return int(not argument)
+        if operator == b"-":
+            return -argument
+        if operator == b"~":
+            return ~argument
+        return argument
+
+    if node_type == "binary_expression":
+        operator = node.child_by_field_name("operator").text
+        left = _evaluate(node.child_by_field_name("left"), configuration)
+        # the right operand is not evaluated, if the result is already determined
+        if operator == b"&&":
+            return int(bool(left) and _evaluate(node.child_by_field_name("right"), configuration) != 0)
+        if operator == b"||":
+            return int(bool(left) or _evaluate(node.child_by_field_name("right"), configuration) != 0)
+
+        right = _evaluate(node.child_by_field_name("right"), configuration)
+        return _BINARY_OPERATORS.get(operator, _zero)(left, right)
+
+    # e.g. invocations of function-like macros, which are not expanded
+    return 0
+
+
+def _number(text: str) -> int:
+    """Parse an integer literal with an optional suffix and digit separators."""
+
+    text = text.replace("'", "").rstrip("uUlLzZ")
+    try:
+        if len(text) > 1 and text[0] == "0" and text.isdigit():
+            return int(text, 8)
+        return int(text, 0)
+    except ValueError:
+        return 0
+
+
+def _zero(left: int, right: int) -> int:
+    return 0
+
+
+def _divide(left: int, right: int) -> int:
+    # C truncates towards zero, and a division by zero is an error, which is treated as 0
+    return 0 if right == 0 else abs(left) // abs(right) * (1 if (left < 0) == (right < 0) else -1)
+
+
+def _remainder(left: int, right: int) -> int:
+    return 0 if right == 0 else left - right * _divide(left, right)
+
+
+_BINARY_OPERATORS = {
+    b"+": lambda left, right: left + right,
+    b"-": lambda left, right: left - right,
+    b"*": lambda left, right: left * right,
+    b"/": _divide,
+    b"%": _remainder,
+    b"<<": lambda left, right: left << right if 0 <= right < 64 else 0,
+    b">>": lambda left, right: left >> right if 0 <= right < 64 else 0,
+    b"&": lambda left, right: left & right,
+    b"|": lambda left, right: left | right,
+    b"^": lambda left, right: left ^ right,
+    b"==": lambda left, right: int(left == right),
+    b"!=": lambda left, right: int(left != right),
+    b"<": lambda left, right: int(left < right),
+    b">": lambda left, right: int(left > right),
+    b"<=": lambda left, right: int(left <= right),
+    b">=": lambda left, right: int(left >= right),
+}
@@ -0,0 +1,231 @@
+import glob
+import os
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from modified_cognitive_complexity.analyzer import analyzer_for, analyzer_for_path
+from modified_cognitive_complexity.complexity import FunctionKey, Scores, cognitive_complexity
+from modified_cognitive_complexity.frontends import registered_frontends, source_suffixes
+from modified_cognitive_complexity.parallel import imap_bounded
+from modified_cognitive_complexity.source import map_source
+from modified_cognitive_complexity.stats import Stats
+
+if TYPE_CHECKING:
+    from modified_cognitive_complexity.cache import ResultCache
+
+
+@dataclass(frozen=True, slots=True)
+class FileResult:
+    """The per-function scores of a single file, or the reason why it could not be scored."""
+    path: Path
+    scores: dict[bytes | None, int] | dict[FunctionKey | None, int] | None
+    """The score of each function by name, or by `FunctionKey` if requested."""
+    error: str | None = None
+    cached: bool = False
+    locations: dict[bytes | None, Scores] | dict[FunctionKey | None, Scores] | None = None
+    """The scores of the individual locations, if requested."""
+    stats: Stats | None = None
+    """The statistics of parsing and scoring the file, if requested and the file was not cached."""
+
+
+def iter_source_files(paths: Iterable[str | Path]) -> Iterator[Path]:
+    """
+    Expand files, directories and glob patterns into the source files to score.
+
+    Explicitly named files are always yielded. Directories, including directories matched
+    by a glob pattern, are walked recursively in sorted order and only files with a suffix of a
+    registered frontend are yielded, see `source_suffixes`. Every file is yielded at most once.
+
+    :param paths: The files, directories and glob patterns (`**` matches recursively).
+
+    :return: An iterator over the source files in a deterministic order.
+    """
+
+    seen: set[Path] = set()
+    suffixes = source_suffixes()
+
+    for path in paths:
+        path = str(path)
+        if glob.has_magic(path):
+            matches = sorted(glob.iglob(path, recursive=True))
+        else:
+            matches = [path]
+
+        for match in matches:
+            for file in _expand(Path(match), suffixes):
+                if file not in seen:
+                    seen.add(file)
+                    yield file
+
+
+def _expand(path: Path, suffixes: frozenset[str]) -> Iterator[Path]:
+    if not path.is_dir():
+        yield path
+        return
+
+    for root, directories, files in os.walk(path):
+        directories.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in suffixes:
+                yield Path(root, name)
+
+
+def score_files(
+    files: Iterable[Path],
+    *,
+    jobs: int = 1,
+    ordered: bool = False,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    cache: "ResultCache | None" = None,
+    locations: bool = False,
+    stats: bool = False,
+    max_complexity: int | None = None,
+    language: str | None = None,
+    keys: bool = False
+) -> Iterator[FileResult]:
+    """
+    Calculate the modified cognitive complexity of many files, optionally in parallel.
+
+    The files are scored by a pool of worker processes, each of which reuses a single parser.
+    Results are yielded as soon as the respective file is scored, so that the caller can
+    stream them. The input is consumed lazily and only a bounded number of files is in flight.
+
+    :param files: The files to score.
+    :param jobs: The number of worker processes. `1` scores all files in the current process,
+        `0` uses one worker per CPU.
+    :param ordered: If the results should be yielded in the order of `files` instead of
+        the order in which they finish.
+    :param goto_nesting: If the additional nesting penalty imposed by gotos should be applied.
+    :param structural_gotos: A flag specifying if goto statements should inherit a nesting penalty
+        by their respective label.
+    :param cache: An optional cache shared by all workers, see `cognitive_complexity_for_file`.
+        Only used if the scores of the individual locations are not requested.
+    :param locations: If the scores of the individual locations should be included in the results.
+    :param stats: If the statistics of parsing and scoring each file should be included in the results.
+    :param max_complexity: An optional limit to only find the functions whose score exceeds it, see
+        `cognitive_complexity_totals`. The scores of all other functions are omitted.
+    :param language: The name of the frontend to parse all files with. By default, the frontend
+        of each file is detected by its suffix, see `frontend_for_path`.
+    :param keys: If functions should be identified by a `FunctionKey` instead of their name, so
+        that functions with the same name in a file are all kept, see `cognitive_complexity`.
+
+    :return: An iterator over the per-function scores of each file.
+    """
+
+    if jobs < 0:
+        raise ValueError("jobs must not be negative")
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    score = partial(
+        score_file,
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        cache=cache,
+        locations=locations,
+        stats=stats,
+        max_complexity=max_complexity,
+        language=language,
+        keys=keys
+    )
+
+    if jobs == 1:
+        yield from map(score, files)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # only imported when needed, to keep the CLI startup fast
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(language,)) as executor:
+        yield from imap_bounded(executor, score, files, max_pending=4 * jobs, ordered=ordered)
+
+
+def init_worker(language: str | None = None):
+    """
+    Create the parsers of a worker up front, so that the first files it scores are not slowed down.
+
+    :param language: The name of the frontend all files are parsed with. By default, the frontend
+        of each file is detected by its suffix, so the parsers of all registered frontends are created.
+    """
+
+    if language is not None:
+        analyzer_for(language).parser
+        return
+
+    for frontend in registered_frontends():
+        try:
+            analyzer_for(frontend.name).parser
+        except LookupError:
+            pass  # neither the grammar of the frontend nor of its fallback is installed
+
+
+def score_file(
+    file: Path,
+    *,
+    goto_nesting: bool = True,
+    structural_gotos: bool = False,
+    cache: "ResultCache | None" = None,
+    locations: bool = False,
+    stats: bool = False,
+    max_complexity: int | None = None,
+    language: str | None = None,
+    keys: bool = False
+) -> FileResult:
+    """
+    Calculate the modified cognitive complexity of a single file, as done by each worker of `score_files`.
+
+    The options have the same meaning as for `score_files`.
+
+    :param file: The file to score.
+
+    :return: The per-function scores of the file, or the reason why it could not be read.
+    """
+
+    file_stats = Stats() if stats else None
+    analyzer = analyzer_for_path(file) if language is None else analyzer_for(language)
+
+    if locations:
+        try:
+            with map_source(file) as code:
+                tree = analyzer.parse(code, stats=file_stats)
+                scores_by_function = cognitive_complexity(
+                    tree.walk(),
+                    goto_nesting=goto_nesting,
+                    structural_gotos=structural_gotos,
+                    stats=file_stats,
+                    max_complexity=max_complexity,
+                    node_types=analyzer.frontend.node_types,
+                    keys=keys
+                )
+                del tree
+        except OSError as e:
+            return FileResult(file, None, e.strerror or str(e))
+
+        return FileResult(
+            file,
+            {
+                function_name: sum(cost.total for _, cost in scores)
+                for function_name, scores in scores_by_function.items()
+            },
+            locations=scores_by_function,
+            stats=file_stats
+        )
+
+    hits = 0 if cache is None else cache.hits
+    try:
+        scores = analyzer.for_file(
+            file,
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            cache=cache,
+            stats=file_stats,
+            max_complexity=max_complexity,
+            keys=keys
+        )
+    except OSError as e:
+        return FileResult(file, None, e.strerror or str(e))
+
+    cached = cache is not None and cache.hits > hits
+    return FileResult(file, scores, cached=cached, stats=None if cached else file_stats)
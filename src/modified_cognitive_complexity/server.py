@@ -0,0 +1,478 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from modified_cognitive_complexity.analyzer import analyzer_for, analyzer_for_path, default_analyzer
+from modified_cognitive_complexity.complexity import cognitive_complexity, cognitive_complexity_totals
+from modified_cognitive_complexity.frontends import get_frontend
+from modified_cognitive_complexity.output import Record, records
+from modified_cognitive_complexity.scan import init_worker, score_file
+
+
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+"""The maximum size of a request body in bytes."""
+
+_FLAGS = {"goto_nesting": True, "structural_gotos": False, "locations": False, "keys": False}
+"""The boolean options of a score request with their defaults."""
+
+type _Source = tuple[str | None, str | None, str | None]
+"""The file name, source code and path of a source to score. Either the code or the path is set."""
+
+
+class ServerBusy(Exception):
+    """Raised if a request is rejected, because too many sources are already queued."""
+
+
+class AnalysisServer:
+    """
+    A long-running server that scores source code on request, to avoid the startup cost of the CLI.
+
+    The server speaks HTTP on a local TCP port or a Unix socket and keeps warm parsers: sources are
+    scored either by a single worker thread or by a pool of worker processes, each of which reuses
+    its parser for every request. The following endpoints are provided:
+
+    - `POST /score` scores a batch of sources. The body is a JSON object with a list of `sources`,
+      each of which is either `{"path": ...}` to score a file readable by the server or
+      `{"code": ..., "file": ...}` to score source code with an optional file name, whose suffix
+      selects the grammar like that of a path, see `frontend_for_path`. The options
+      `goto_nesting`, `structural_gotos`, `locations`, `max_complexity`, `keys` and `language`
+      are optional and have the same meaning as for `score_files`. The response holds the
+      `records` of all sources, as written by `--format json`, and the `errors` of files that
+      could not be read.
+    - `GET /metrics` returns counters, throughput and latency percentiles, see `metrics`.
+    - `GET /health` returns `{"status": "ok"}`.
+
+    The number of queued sources is bounded. A request that would exceed the bound is rejected with
+    503 Service Unavailable and should be retried later. Malformed requests and batches with more
+    sources than the bound are rejected with 400 Bad Request.
+
+    Unless a `root` is given, any client that can connect to the server can score any file the
+    server can read, so the server should only listen on addresses reachable by trusted clients.
+    """
+
+    def __init__(self, address: tuple[str, int] | Path, *, jobs: int = 1, max_pending: int = 64, root: Path | None = None):
+        """
+        :param address: A (host, port) pair to listen on or the path of a Unix socket. Port 0
+            selects a free port.
+        :param jobs: The number of worker processes. `1` scores all sources on a single worker
+            thread of the server process, `0` uses one worker per CPU.
+        :param max_pending: The maximum number of sources queued or being scored at any time.
+        :param root: An optional directory, to which the files that may be scored by `path` are
+            restricted. Relative paths are resolved against it. By default, relative paths are
+            resolved against the working directory and any file readable by the server is scored.
+        """
+
+        if jobs < 0:
+            raise ValueError("jobs must not be negative")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self.jobs = jobs or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.root = None if root is None else Path(os.path.realpath(root))
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._started = time.monotonic()
+        self._counters = dict.fromkeys(("requests", "rejected", "failed", "sources", "bytes"), 0)
+        self._latencies: deque[float] = deque(maxlen=1000)
+        """The latencies of the most recent successful score requests in seconds."""
+
+        if self.jobs == 1:
+            self._executor: Executor = ThreadPoolExecutor(max_workers=1, initializer=init_worker)
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_process_worker)
+
+        # start the workers and their parsers now, before the server starts handler threads
+        self._executor.submit(init_worker).result()
+
+        try:
+            if isinstance(address, Path):
+                self._server: socketserver.BaseServer = _UnixHTTPServer(address, self)
+            else:
+                self._server = _TCPHTTPServer(address, self)
+        except BaseException:
+            self._executor.shutdown(cancel_futures=True)
+            raise
+
+    @property
+    def address(self) -> tuple[str, int] | Path:
+        """The address the server listens on, with the selected port if port 0 was requested."""
+
+        if isinstance(self._server, _UnixHTTPServer):
+            return self._server.path
+
+        host, port = self._server.server_address[:2]
+        return host, port
+
+    def serve_forever(self):
+        """Handle requests until `shutdown` is called."""
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """Stop `serve_forever`. Must be called from another thread."""
+        self._server.shutdown()
+
+    def close(self):
+        """Close the socket and stop the workers."""
+
+        self._server.server_close()
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "AnalysisServer":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def score(self, request: Any) -> dict[str, list[Record]]:
+        """
+        Score a batch of sources, as requested by `POST /score`.
+
+        :param request: The decoded request body.
+
+        :return: The response body with the `records` and `errors` of the sources.
+
+        :raises ValueError: If the request is malformed or has more sources than can be queued.
+        :raises ServerBusy: If too many sources are queued to accept the request.
+        """
+
+        start = time.perf_counter()
+        with self._lock:
+            self._counters["requests"] += 1
+
+        sources, options = _parse_request(request, self.root)
+        if len(sources) > self.max_pending:
+            raise ValueError(f"A batch must not have more than {self.max_pending} sources")
+
+        with self._lock:
+            if self._pending + len(sources) > self.max_pending:
+                self._counters["rejected"] += 1
+                raise ServerBusy(f"{self._pending} of {self.max_pending} sources are queued, {len(sources)} requested")
+
+            self._pending += len(sources)
+
+        futures: list[Future[tuple[list[Record], str | None]]] = []
+        try:
+            for source in sources:
+                future = self._executor.submit(_score_source, source, **options)
+                future.add_done_callback(self._release)
+                futures.append(future)
+        except BaseException:
+            with self._lock:
+                self._pending -= len(sources) - len(futures)
+            raise
+
+        response: dict[str, list[Record]] = {"records": [], "errors": []}
+        for (file_name, code, _), future in zip(sources, futures):
+            source_records, error = future.result()
+            response["records"].extend(source_records)
+            if error is not None:
+                response["errors"].append({"file": file_name, "error": error})
+
+        with self._lock:
+            self._counters["sources"] += len(sources)
+            self._counters["bytes"] += sum(len(code.encode()) for _, code, _ in sources if code is not None)
+            self._latencies.append(time.perf_counter() - start)
+
+        return response
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        Get the metrics of the server, as returned by `GET /metrics`.
+
+        Counters cover the whole uptime: `requests` counts all score requests, `rejected` those rejected
+        for backpressure, `failed` those that were malformed or failed otherwise, and `sources` and
+        `bytes` the scored sources and the size of the source code sent with them. The throughput
+        is averaged over the uptime, the latency percentiles over the last 1000 score requests.
+
+        :return: The metrics as a JSON-serializable mapping.
+        """
+
+        with self._lock:
+            counters = dict(self._counters)
+            pending = self._pending
+            latencies = sorted(self._latencies)
+
+        uptime = time.monotonic() - self._started
+        return {
+            **counters,
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "workers": self.jobs,
+            "uptime_seconds": uptime,
+            "throughput": {
+                "requests_per_second": counters["requests"] / uptime,
+                "sources_per_second": counters["sources"] / uptime,
+                "bytes_per_second": counters["bytes"] / uptime,
+            },
+            "latency_ms": _latency_summary(latencies),
+        }
+
+    def _release(self, _: Future):
+        with self._lock:
+            self._pending -= 1
+
+    def _failed(self, *, counted: bool = True):
+        """
+        Count a failed score request.
+
+        :param counted: If the request was counted by `score` already. Requests rejected before, e.g.
+            as their body is not valid JSON, are counted as well.
+        """
+
+        with self._lock:
+            self._counters["failed"] += 1
+            if not counted:
+                self._counters["requests"] += 1
+
+
+def _parse_request(request: Any, root: Path | None = None) -> tuple[list[_Source], dict[str, Any]]:
+    if not isinstance(request, dict):
+        raise ValueError("The request must be a JSON object")
+
+    options: dict[str, Any] = {}
+    for option, default in _FLAGS.items():
+        value = request.get(option, default)
+        if not isinstance(value, bool):
+            raise ValueError(f"'{option}' must be a boolean")
+        options[option] = value
+
+    max_complexity = request.get("max_complexity")
+    if max_complexity is not None and (not isinstance(max_complexity, int) or isinstance(max_complexity, bool) or max_complexity < 0):
+        raise ValueError("'max_complexity' must be a non-negative integer")
+    options["max_complexity"] = max_complexity
+
+    language = request.get("language")
+    if language is not None:
+        if not isinstance(language, str):
+            raise ValueError("'language' must be a string")
+        try:
+            language = get_frontend(language).name
+        except LookupError as e:
+            raise ValueError(str(e)) from None
+    options["language"] = language
+
+    sources = request.get("sources")
+    if not isinstance(sources, list):
+        raise ValueError("'sources' must be a list")
+
+    parsed: list[_Source] = []
+    for source in sources:
+        if not isinstance(source, dict):
+            raise ValueError("Each source must be a JSON object")
+
+        code, path, file_name = source.get("code"), source.get("path"), source.get("file")
+        if (code is None) == (path is None):
+            raise ValueError("Each source must have either 'code' or 'path'")
+        if not all(value is None or isinstance(value, str) for value in (code, path, file_name)):
+            raise ValueError("'code', 'path' and 'file' must be strings")
+
+        if path is not None and root is not None:
+            resolved = os.path.realpath(root / path)
+            if os.path.commonpath((root, resolved)) != str(root):
+                raise ValueError(f"The path '{path}' is outside of the root of the server")
+            path = resolved
+
+        parsed.append((source.get("path") if file_name is None else file_name, code, path))
+
+    return parsed, options
+
+
+def _init_process_worker():
+    # interrupts are handled by the server, which stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_worker()
+
+
+def _score_source(
+    source: _Source,
+    *,
+    goto_nesting: bool,
+    structural_gotos: bool,
+    locations: bool,
+    max_complexity: int | None = None,
+    keys: bool = False,
+    language: str | None = None
+) -> tuple[list[Record], str | None]:
+    """Score a single source on a worker. Returns its records and the error, if the file could not be read."""
+
+    file_name, code, path = source
+    file = None if file_name is None else Path(file_name)
+
+    if path is not None:
+        result = score_file(
+            Path(path),
+            goto_nesting=goto_nesting,
+            structural_gotos=structural_gotos,
+            locations=locations,
+            max_complexity=max_complexity,
+            language=language,
+            keys=keys
+        )
+        if result.error is not None:
+            return [], result.error
+
+        scores = result.scores if result.locations is None else result.locations
+        return list(records(file, scores, partial=max_complexity is not None)), None
+
+    # the language of code is detected by its file name, if any
+    if language is not None:
+        analyzer = analyzer_for(language)
+    else:
+        analyzer = default_analyzer() if file is None else analyzer_for_path(file)
+    tree = analyzer.parse(code)
+    score = cognitive_complexity if locations else cognitive_complexity_totals
+    scores = score(
+        tree.walk(),
+        goto_nesting=goto_nesting,
+        structural_gotos=structural_gotos,
+        max_complexity=max_complexity,
+        node_types=analyzer.frontend.node_types,
+        keys=keys
+    )
+    return list(records(file, scores, partial=max_complexity is not None)), None
+
+
+def _latency_summary(latencies: list[float]) -> dict[str, float | None]:
+    if not latencies:
+        return {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+
+    def percentile(fraction: float) -> float:
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1e3
+
+    return {
+        "mean": statistics.fmean(latencies) * 1e3,
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": latencies[-1] * 1e3,
+    }
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: "_TCPHTTPServer | _UnixHTTPServer"
+    protocol_version = "HTTP/1.1"  # keep connections of clients alive between requests
+
+    def do_GET(self):
+        analysis = self.server.analysis
+        if self.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send_json(HTTPStatus.OK, analysis.metrics())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path '{self.path}'"})
+
+    def do_POST(self):
+        analysis = self.server.analysis
+        if self.path != "/score":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path '{self.path}'"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            analysis._failed(counted=False)
+            self._send_json(HTTPStatus.LENGTH_REQUIRED, {"error": "Content-Length is required"}, close=True)
+            return
+
+        if length < 0:
+            analysis._failed(counted=False)
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Content-Length must not be negative"}, close=True)
+            return
+
+        if length > MAX_REQUEST_SIZE:
+            analysis._failed(counted=False)
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "The request is too large"}, close=True)
+            return
+
+        try:
+            request = json.loads(self.rfile.read(length))
+        except ValueError as e:  # includes Unicode decode errors
+            analysis._failed(counted=False)
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+
+        try:
+            response = analysis.score(request)
+        except ServerBusy as e:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}, headers={"Retry-After": "1"})
+        except ValueError as e:
+            analysis._failed()
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except Exception as e:
+            analysis._failed()
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self._send_json(HTTPStatus.OK, response)
+
+    def address_string(self) -> str:
+        # clients of Unix sockets have no address
+        return str(self.client_address[0]) if self.client_address else self.server.server_address
+
+    def _send_json(self, status: HTTPStatus, body: Any, *, headers: dict[str, str] | None = None, close: bool = False):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if close:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    def __init__(self, address: tuple[str, int], analysis: AnalysisServer):
+        self.analysis = analysis
+        super().__init__(address, _RequestHandler)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, analysis: AnalysisServer):
+        self.analysis = analysis
+        self.path = path
+        _remove_stale_socket(path)
+        super().__init__(str(path), _RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(path: Path):
+    """Remove a socket left behind by a server that did not shut down cleanly, but never a socket in use."""
+
+    try:
+        if not stat.S_ISSOCK(path.stat().st_mode):
+            return
+    except FileNotFoundError:
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except ConnectionRefusedError:
+            path.unlink()
+            return
+
+    raise OSError(f"The socket '{path}' is already in use")
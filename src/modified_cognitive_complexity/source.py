@@ -0,0 +1,47 @@
+import contextlib
+import mmap
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+
+@contextlib.contextmanager
+def map_source(source: Path | BinaryIO) -> Iterator[bytes | mmap.mmap]:
+    """
+    Provide the content of a file without copying it into memory, if possible.
+
+    Regular files are memory-mapped read-only, so that Tree-sitter parses directly from the
+    page cache. Empty files and streams that can not be mapped, e.g. pipes, are read from their
+    current position instead.
+
+    The mapping is closed when the context exits, even if syntax trees parsed from it still exist.
+    Their nodes must not be used afterwards, e.g. `Node.text` then raises a `ValueError`. Only a
+    mapping still exported as a buffer, e.g. by a `memoryview`, stays open until that is released.
+
+    :param source: The path of a file or an open binary stream. The stream is not closed.
+
+    :return: A context manager providing the content.
+    """
+
+    if isinstance(source, Path):
+        with open(source, "rb") as stream:
+            with map_source(stream) as content:
+                yield content
+        return
+
+    try:
+        # a mapping always starts at the beginning of the file
+        mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) if source.tell() == 0 else None
+    except (OSError, ValueError):
+        mapped = None
+
+    if mapped is None:
+        yield source.read()
+        return
+
+    try:
+        yield mapped
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            pass  # still referenced, unmapped once garbage collected
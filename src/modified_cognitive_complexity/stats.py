@@ -0,0 +1,51 @@
+from collections import Counter
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class Stats:
+    """
+    Counters and timings collected while parsing and scoring, to find out why scoring is slow.
+
+    Pass the same instance to `ComplexityAnalyzer.parse` and `cognitive_complexity` or
+    `cognitive_complexity_totals` to accumulate the statistics of many calls. Nothing is
+    collected unless an instance is passed.
+    """
+    node_visits: Counter[str] = field(default_factory=Counter)
+    """The nodes visited for control flow constructs, by node type."""
+    expression_visits: Counter[str] = field(default_factory=Counter)
+    """The nodes walked for sequences of logical operators, by node type."""
+    skipped_nodes: int = 0
+    """
+    The nodes visited without being scored: those outside of function bodies within function
+    definitions, e.g. names and parameters, the conditions of preprocessor directives and, with a
+    `max_complexity`, the remaining nodes of functions whose score exceeds it.
+    """
+    gotos: int = 0
+    labels: int = 0
+    parse_seconds: float = 0.0
+    traversal_seconds: float = 0.0
+    """The time spent traversing syntax trees, excluding the goto pass."""
+    goto_seconds: float = 0.0
+    """The time spent calculating the nesting imposed by gotos."""
+
+    @property
+    def binary_expressions(self) -> int:
+        """The binary expressions visited, including the nested operands of sequences of logical operators."""
+        return self.node_visits["binary_expression"] + self.expression_visits["binary_expression"]
+
+    def update(self, other: "Stats"):
+        """
+        Add the statistics of another instance, e.g. of a worker process.
+
+        :param other: The statistics to add.
+        """
+
+        self.node_visits.update(other.node_visits)
+        self.expression_visits.update(other.expression_visits)
+        self.skipped_nodes += other.skipped_nodes
+        self.gotos += other.gotos
+        self.labels += other.labels
+        self.parse_seconds += other.parse_seconds
+        self.traversal_seconds += other.traversal_seconds
+        self.goto_seconds += other.goto_seconds
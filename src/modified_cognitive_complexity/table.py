@@ -0,0 +1,195 @@
+from array import array
+from typing import Iterator
+
+from tree_sitter import Point
+
+from modified_cognitive_complexity.complexity import Location, Nesting, Score, Scores
+
+
+_COLUMNS = ("start_row", "start_column", "end_row", "end_column", "increment", "nesting", "goto_nesting")
+
+_NO_NESTING = -1
+"""The value of the nesting columns of a score without nesting."""
+
+
+class ScoreTable:
+    """
+    A compact, columnar representation of the scores of many functions.
+
+    Instead of one `Location`, `Score` and `Nesting` object per code location, the fields of all
+    scores are stored in typed arrays with one entry per code location. The scores of each function
+    are stored in a contiguous range of rows, in the order of the functions. A score without nesting
+    is stored with a nesting and goto nesting of -1.
+
+    Tables convert losslessly from and to the mapping returned by `cognitive_complexity`, see
+    `from_scores` and `to_scores`, and can be pickled.
+    """
+
+    __slots__ = ("_functions", "_offsets", *_COLUMNS)
+
+    def __init__(self):
+        """Create an empty table. Use `from_scores` to create a table of scores."""
+
+        self._functions: dict[bytes | None, int] = {}
+        """The index of each function in the order of the functions."""
+        self._offsets = array("q", [0])
+        """The first row of each function, followed by the number of rows."""
+
+        self.start_row = array("i")
+        self.start_column = array("i")
+        self.end_row = array("i")
+        self.end_column = array("i")
+        self.increment = array("i")
+        self.nesting = array("i")
+        self.goto_nesting = array("i")
+
+    @classmethod
+    def from_scores(cls, scores_by_function: dict[bytes | None, Scores]) -> "ScoreTable":
+        """
+        Create a table from the scores of functions.
+
+        :param scores_by_function: A mapping from each function name to its scores, as returned by
+            `cognitive_complexity`.
+
+        :return: The table holding the same scores.
+        """
+
+        table = cls()
+        for function_name, scores in scores_by_function.items():
+            table.append(function_name, scores)
+
+        return table
+
+    def append(self, function_name: bytes | None, scores: Scores):
+        """
+        Add the scores of a function to the end of the table.
+
+        :param function_name: The name of the function, which must not be in the table yet.
+        :param scores: The scores of the function.
+        """
+
+        if function_name in self._functions:
+            raise ValueError(f"The function {function_name!r} is already in the table")
+
+        for location, score in scores:
+            self.start_row.append(location.start.row)
+            self.start_column.append(location.start.column)
+            self.end_row.append(location.end.row)
+            self.end_column.append(location.end.column)
+            self.increment.append(score.increment)
+            if score.nesting is None:
+                self.nesting.append(_NO_NESTING)
+                self.goto_nesting.append(_NO_NESTING)
+            else:
+                self.nesting.append(score.nesting.value)
+                self.goto_nesting.append(score.nesting.goto)
+
+        self._functions[function_name] = len(self._functions)
+        self._offsets.append(len(self.increment))
+
+    def to_scores(self) -> dict[bytes | None, Scores]:
+        """
+        :return: A mapping from each function name to its scores, as returned by `cognitive_complexity`.
+        """
+
+        return {function_name: self.scores(function_name) for function_name in self._functions}
+
+    @property
+    def functions(self) -> list[bytes | None]:
+        """The names of the functions in the table, in their order."""
+        return list(self._functions)
+
+    def __len__(self) -> int:
+        """The number of scored code locations of all functions."""
+        return len(self.increment)
+
+    def __iter__(self) -> Iterator[bytes | None]:
+        """Iterate over the names of the functions in the table."""
+        return iter(self._functions)
+
+    def __contains__(self, function_name: bytes | None) -> bool:
+        return function_name in self._functions
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ScoreTable):
+            return NotImplemented
+
+        return (
+            list(self._functions) == list(other._functions)
+            and self._offsets == other._offsets
+            and all(getattr(self, column) == getattr(other, column) for column in _COLUMNS)
+        )
+
+    def rows(self, function_name: bytes | None) -> range:
+        """
+        :param function_name: The name of a function in the table.
+
+        :return: The rows holding the scores of the function.
+        """
+
+        index = self._functions[function_name]
+        return range(self._offsets[index], self._offsets[index + 1])
+
+    def slice(self, function_name: bytes | None) -> "ScoreTable":
+        """
+        Create a table holding only the scores of a single function.
+
+        :param function_name: The name of a function in the table.
+
+        :return: The table of the function.
+        """
+
+        rows = self.rows(function_name)
+        table = ScoreTable()
+        table._functions[function_name] = 0
+        table._offsets.append(len(rows))
+        for column in _COLUMNS:
+            setattr(table, column, getattr(self, column)[rows.start:rows.stop])
+
+        return table
+
+    def scores(self, function_name: bytes | None) -> Scores:
+        """
+        :param function_name: The name of a function in the table.
+
+        :return: The scores of the function, as returned by `cognitive_complexity`.
+        """
+
+        rows = self.rows(function_name)
+        return [
+            (
+                Location(Point(start_row, start_column), Point(end_row, end_column)),
+                Score(increment, None if nesting == _NO_NESTING else Nesting(nesting, goto_nesting))
+            )
+            for start_row, start_column, end_row, end_column, increment, nesting, goto_nesting in zip(
+                *(getattr(self, column)[rows.start:rows.stop] for column in _COLUMNS)
+            )
+        ]
+
+    def total(self, function_name: bytes | None) -> int:
+        """
+        :param function_name: The name of a function in the table.
+
+        :return: The total score of the function.
+        """
+
+        rows = self.rows(function_name)
+        nesting = self.nesting[rows.start:rows.stop]
+        goto_nesting = self.goto_nesting[rows.start:rows.stop]
+
+        # scores without nesting are stored as -1 in both nesting columns and must not be counted
+        no_nesting = nesting.count(_NO_NESTING)
+        return sum(self.increment[rows.start:rows.stop]) + sum(nesting) + sum(goto_nesting) + 2 * no_nesting
+
+    def totals(self) -> dict[bytes | None, int]:
+        """
+        :return: A mapping from each function name to its total score, as returned by
+            `cognitive_complexity_totals`.
+        """
+
+        return {function_name: self.total(function_name) for function_name in self._functions}
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes used by the columns of the table."""
+        return sum(len(column) * column.itemsize for column in (getattr(self, name) for name in (*_COLUMNS, "_offsets")))
@@ -0,0 +1,90 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from modified_cognitive_complexity import ScoreArrays, ScoreTable, cognitive_complexity, cognitive_complexity_totals, default_analyzer
+from tests.test_differential import _random_program
+
+
+def _scores(code: str):
+    tree = default_analyzer().parse(code.encode())
+    return cognitive_complexity(tree.walk()), cognitive_complexity_totals(tree.walk())
+
+
+def test_totals_match():
+    results, totals = zip(*(_scores(_random_program(seed)) for seed in range(30)))
+    arrays = ScoreArrays.from_scores(results)
+
+    assert arrays.functions == [(index, name) for index, result in enumerate(results) for name in result]
+    assert arrays.totals().tolist() == [total for result in totals for total in result.values()]
+    assert len(arrays) == len(arrays.functions)
+
+
+def test_components():
+    scores_by_function, _ = _scores("""
+        int f() { if (a) { while (b && c) {} } }
+        int g() { x = a ? b : c; }
+        int h() {}
+        if (d) {}
+    """)
+    arrays = ScoreArrays.from_tables([ScoreTable.from_scores(scores_by_function)])
+    components = arrays.components()
+
+    assert arrays.functions == [(0, b"f"), (0, b"g"), (0, b"h"), (0, None)]
+    assert components["increment"].tolist() == [3, 1, 0, 1]
+    assert components["nesting"].tolist() == [1, 0, 0, 0]
+    assert components["goto"].tolist() == [0, 0, 0, 0]
+    assert components["total"].tolist() == [4, 1, 0, 1]
+    assert arrays.components() is components
+
+
+def test_goto_components():
+    scores_by_function, totals = _scores("""
+        int f() {
+            goto end;
+            if (a) {}
+        end:
+            return 0;
+        }
+    """)
+    components = ScoreArrays.from_scores([scores_by_function]).components()
+
+    assert components["goto"].tolist() == [1, 0]
+    assert components["total"].tolist() == list(totals.values())
+
+
+def test_records():
+    scores_by_function, _ = _scores("int f() {\n if (a) {}\n}\nint g() { while (b) {} }\n")
+    records = ScoreArrays.from_scores([scores_by_function, scores_by_function]).records()
+
+    assert records["function"].tolist() == [0, 1, 3, 4]
+    assert records["row"].tolist() == [1, 3, 1, 3]
+    assert records["increment"].tolist() == [1, 1, 1, 1]
+    assert records["nesting"].tolist() == [0, 0, 0, 0]
+
+
+def test_summaries():
+    arrays = ScoreArrays.from_scores([
+        {b"a": [], b"b": _scores("int b() { if (x) {} }")[0][b"b"]},
+        _scores("int c() { if (x) { if (y) {} } }\nint d() { if (x) {} }")[0],
+    ])
+
+    assert arrays.totals().tolist() == [0, 1, 3, 1, 0]
+    assert arrays.percentiles(50) == 1
+    assert arrays.percentiles([0, 100]).tolist() == [0, 3]
+    counts, edges = arrays.histogram([0, 1, 2, 4])
+    assert counts.tolist() == [2, 2, 1]
+
+    # equal scores keep the order of the functions
+    assert arrays.top(3) == [((1, b"c"), 3), ((0, b"b"), 1), ((1, b"d"), 1)]
+    assert arrays.top(10, component="nesting") == [((1, b"c"), 1), ((0, b"a"), 0), ((0, b"b"), 0), ((1, b"d"), 0), ((1, None), 0)]
+    assert arrays.top(0) == []
+
+
+def test_empty():
+    arrays = ScoreArrays.from_tables([])
+
+    assert len(arrays) == 0
+    assert arrays.totals().tolist() == []
+    assert arrays.records().shape == (0,)
+    assert arrays.top(5) == []
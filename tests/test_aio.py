@@ -0,0 +1,127 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from modified_cognitive_complexity import (
+    AsyncScorer,
+    acognitive_complexity_for_file,
+    acognitive_complexity_for_many,
+    acognitive_complexity_for_string,
+    cognitive_complexity_for_string,
+)
+from modified_cognitive_complexity.analyzer import analyzer_for
+from modified_cognitive_complexity.aio import default_scorer
+from tests.test_differential import _random_program
+
+
+SOURCES = [(seed, _random_program(seed)) for seed in range(20)]
+
+
+@pytest.fixture(autouse=True, scope="module")
+def close_default_scorer():
+    yield
+    # stop the workers, whose threads would otherwise be forked by the process pools of later tests
+    asyncio.run(default_scorer().aclose())
+    default_scorer.cache_clear()
+
+
+def test_for_string():
+    code = SOURCES[0][1]
+    assert asyncio.run(acognitive_complexity_for_string(code, structural_gotos=True)) == cognitive_complexity_for_string(code, structural_gotos=True)
+
+
+def test_for_file(tmp_path: Path):
+    file = tmp_path / "a.c"
+    file.write_text(SOURCES[1][1])
+    assert asyncio.run(acognitive_complexity_for_file(file)) == cognitive_complexity_for_string(SOURCES[1][1])
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_for_many(ordered: bool):
+    async def sources():
+        for key, code in SOURCES:
+            await asyncio.sleep(0)  # e.g. a download
+            yield key, code
+
+    async def collect():
+        return [result async for result in acognitive_complexity_for_many(sources(), ordered=ordered)]
+
+    results = asyncio.run(collect())
+    expected = [(key, cognitive_complexity_for_string(code)) for key, code in SOURCES]
+    assert results == expected if ordered else sorted(results) == expected
+
+
+def test_options(tmp_path: Path):
+    code = SOURCES[2][1]
+    file = tmp_path / "a.txt"
+    file.write_text(code)
+    options = {"max_complexity": 2, "language": "cpp"}
+
+    async def run():
+        return (
+            await acognitive_complexity_for_string(code, **options, keys=True),
+            await acognitive_complexity_for_file(file, **options, keys=True),
+            [result async for result in acognitive_complexity_for_many(SOURCES[2:3], **options, keys=True)],
+            await acognitive_complexity_for_string(code, **options),
+        )
+
+    expected = analyzer_for("cpp").for_string(code, max_complexity=2, keys=True)
+    assert asyncio.run(run()) == (expected, expected, [(2, expected)], cognitive_complexity_for_string(code, **options))
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_scorer(backend: str):
+    async def run():
+        async with AsyncScorer(backend=backend, jobs=2, max_pending=3) as scorer:
+            results = await asyncio.gather(*(scorer.for_string(code) for _, code in SOURCES[:5]))
+            many = [result async for result in scorer.for_many(SOURCES[:5])]
+            return results, many
+
+    results, many = asyncio.run(run())
+    expected = [cognitive_complexity_for_string(code) for _, code in SOURCES[:5]]
+    assert results == expected
+    assert many == list(zip(range(5), expected))
+
+
+def test_cancellation():
+    big = "\n".join(SOURCES[0][1] for _ in range(200))
+
+    async def run():
+        async with AsyncScorer(jobs=1, max_pending=1) as scorer:
+            running = asyncio.ensure_future(scorer.for_string(big))
+            waiting = asyncio.ensure_future(scorer.for_string(big))
+            await asyncio.sleep(0)
+            waiting.cancel()
+            running.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+
+            # the slot is released once the cancelled source is done, so that later calls proceed
+            assert await asyncio.wait_for(scorer.for_string("int f() {}"), timeout=30) == {b"f": 0, None: 0}
+            assert scorer._semaphores[asyncio.get_running_loop()]._value == 1
+
+    asyncio.run(run())
+
+
+def test_stop_early():
+    async def run():
+        async with AsyncScorer(jobs=1, max_pending=2) as scorer:
+            async with asyncio.timeout(30):
+                iterator = scorer.for_many(SOURCES)
+                assert (await anext(iterator))[0] == 0
+                await iterator.aclose()
+
+            assert await scorer.for_string("int f() {}") == {b"f": 0, None: 0}
+
+    asyncio.run(run())
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        AsyncScorer(jobs=0)
+    with pytest.raises(ValueError):
+        AsyncScorer(max_pending=0)
+    with pytest.raises(ValueError):
+        AsyncScorer(backend="fiber")
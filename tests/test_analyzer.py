@@ -0,0 +1,48 @@
+import textwrap
+import threading
+from pathlib import Path
+
+from modified_cognitive_complexity import ComplexityAnalyzer, cognitive_complexity_for_file, cognitive_complexity_for_string, default_analyzer
+
+
+CODE = textwrap.dedent("""\
+    int f() {
+        if (x) {
+            if (y) {}
+        }
+    }
+    while (z) {}
+    """)
+
+
+def test_for_string():
+    analyzer = ComplexityAnalyzer()
+
+    assert analyzer.for_string(CODE) == {b"f": 3, None: 1}
+    assert analyzer.for_string(CODE.encode(), goto_nesting=False) == {b"f": 3, None: 1}
+
+
+def test_for_file(tmp_path: Path):
+    file = tmp_path / "code.c"
+    file.write_text(CODE)
+
+    assert ComplexityAnalyzer().for_file(file) == cognitive_complexity_for_file(file)
+
+
+def test_parser_reuse():
+    analyzer = ComplexityAnalyzer()
+    parser = analyzer.parser
+
+    assert analyzer.parser is parser
+    
+    parsers = []
+    thread = threading.Thread(target=lambda: parsers.append(analyzer.parser))
+    thread.start()
+    thread.join()
+
+    assert parsers[0] is not parser
+
+
+def test_default_analyzer():
+    assert default_analyzer() is default_analyzer()
+    assert cognitive_complexity_for_string(CODE) == default_analyzer().for_string(CODE)
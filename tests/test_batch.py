@@ -0,0 +1,41 @@
+import itertools
+
+import pytest
+
+from modified_cognitive_complexity import cognitive_complexity_for_many, cognitive_complexity_for_string
+
+
+SOURCES = [
+    (i, f"int f{i}() {{ {'if (x) { ' * (i % 4)}{'}' * (i % 4)} }}")
+    for i in range(50)
+]
+
+
+@pytest.mark.parametrize("backend", ("thread", "process"))
+def test_results(backend: str):
+    results = list(cognitive_complexity_for_many(SOURCES, backend=backend, jobs=2, chunk_size=7))
+
+    assert results == [(i, cognitive_complexity_for_string(code)) for i, code in SOURCES]
+
+
+def test_unordered():
+    results = cognitive_complexity_for_many(SOURCES, jobs=3, chunk_size=4, ordered=False, goto_nesting=False)
+
+    assert sorted(results) == [(i, cognitive_complexity_for_string(code, goto_nesting=False)) for i, code in SOURCES]
+
+
+def test_lazy():
+    consumed = 0
+
+    def sources():
+        nonlocal consumed
+        for i in itertools.count():
+            consumed += 1
+            yield i, "if (x) {}"
+
+    results = cognitive_complexity_for_many(sources(), jobs=2, chunk_size=10)
+    first = list(itertools.islice(results, 5))
+    results.close()
+
+    assert first == [(i, {None: 1}) for i in range(5)]
+    assert consumed <= 2 * 2 * 10 + 10
@@ -0,0 +1,106 @@
+import os
+import textwrap
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from tree_sitter import Point
+
+from modified_cognitive_complexity import FunctionKey, cognitive_complexity_for_file, default_analyzer
+from modified_cognitive_complexity.cache import ResultCache
+from modified_cognitive_complexity.cli import app
+
+
+CODE = textwrap.dedent("""\
+    int f() {
+        if (x) {}
+    }
+    """)
+
+
+def test_hit_and_miss(tmp_path: Path):
+    cache = ResultCache(tmp_path / "cache")
+    file = tmp_path / "code.c"
+    file.write_text(CODE)
+
+    assert cognitive_complexity_for_file(file, cache=cache) == {b"f": 1, None: 0}
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    assert cognitive_complexity_for_file(file, cache=cache) == {b"f": 1, None: 0}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cognitive_complexity_for_file(file, cache=cache, structural_gotos=True)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    file.write_text(CODE + "if (y) {}\n")
+    assert cognitive_complexity_for_file(file, cache=cache) == {b"f": 1, None: 1}
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_round_trip(tmp_path: Path):
+    cache = ResultCache(tmp_path)
+    scores = {b"\xff\xfeinvalid utf-8": 3, b"f": 1, None: 2}
+
+    cache.put("abcdef", scores)
+
+    assert list(cache.get("abcdef").items()) == list(scores.items())
+
+
+def test_keys(tmp_path: Path):
+    cache = ResultCache(tmp_path)
+    scores = {FunctionKey(b"f", Point(0, 0), 0, 10): 1, FunctionKey(b"f", Point(1, 4), 15, 30): 2, None: 0}
+
+    cache.put("abcdef", scores)
+    assert list(cache.get("abcdef").items()) == list(scores.items())
+
+    assert cache.key(b"int f() {}", keys=True) != cache.key(b"int f() {}")
+
+    file = tmp_path / "code.c"
+    file.write_text("int f(int) { if (x) {} }\nint f(char) {}\n")
+    expected = {FunctionKey(b"f", Point(0, 0), 0, 24): 1, FunctionKey(b"f", Point(1, 0), 25, 39): 0, None: 0}
+    assert default_analyzer().for_file(file, cache=cache, keys=True) == expected
+    assert default_analyzer().for_file(file, cache=cache, keys=True) == expected
+    assert cache.hits == 2 and cache.misses == 1
+    assert default_analyzer().for_file(file, cache=cache) == {b"f": 0, None: 0}
+
+
+def test_corrupt_entry(tmp_path: Path):
+    cache = ResultCache(tmp_path)
+    cache.put("abcdef", {None: 0})
+    (tmp_path / "ab" / "abcdef.json").write_text("[[")
+
+    assert cache.get("abcdef") is None
+    assert cache.misses == 1
+
+
+def test_eviction(tmp_path: Path):
+    cache = ResultCache(tmp_path, max_size=1024 * 1024)
+    for i, key in enumerate(("aa01", "bb02", "cc03")):
+        cache.put(key, {None: i})
+        os.utime(tmp_path / key[:2] / f"{key}.json", (i, i))
+
+    # reading an entry marks it as recently used
+    cache.get("aa01")
+    entry_size = (tmp_path / "bb" / "bb02.json").stat().st_size
+    cache.max_size = 2 * entry_size
+    cache.evict()
+
+    assert cache.get("aa01") == {None: 0}
+    assert cache.get("bb02") is None
+    assert cache.get("cc03") == {None: 2}
+
+
+def test_cli(tmp_path: Path):
+    (tmp_path / "code.c").write_text(CODE)
+    runner = CliRunner()
+    arguments = [str(tmp_path / "code.c"), "--cache-dir", str(tmp_path / "cache")]
+
+    first = runner.invoke(app, arguments)
+    second = runner.invoke(app, arguments)
+    uncached = runner.invoke(app, [*arguments, "--no-cache"])
+
+    assert first.exit_code == second.exit_code == uncached.exit_code == 0
+    assert "Cache: 0 hits, 1 misses" in first.output
+    assert "Cache: 1 hits, 0 misses" in second.output
+    assert "Cache:" not in uncached.output
+    assert first.output.replace("0 hits, 1 misses", "") == second.output.replace("1 hits, 0 misses", "")
@@ -0,0 +1,127 @@
+import json
+import textwrap
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from modified_cognitive_complexity.cli import app
+from modified_cognitive_complexity.scan import iter_source_files
+
+
+runner = CliRunner()
+
+
+CODE_A = textwrap.dedent("""\
+    int f0() {
+        if (x) {}
+    }
+    int f1() {
+        if (x) {
+            if (y) {}
+        }
+    }
+    """)
+
+CODE_B = textwrap.dedent("""\
+    if (x) {}
+    """)
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "src" / "sub").mkdir(parents=True)
+    (tmp_path / "src" / "a.c").write_text(CODE_A)
+    (tmp_path / "src" / "sub" / "b.h").write_text(CODE_B)
+    (tmp_path / "src" / "notes.txt").write_text("not code")
+    return tmp_path
+
+
+def test_stdin():
+    result = runner.invoke(app, [], input=CODE_A)
+
+    assert result.exit_code == 0
+    assert result.stdout == textwrap.dedent("""\
+        Total Modified Cognitive Complexity: 4
+
+        Complexity by function:
+        Function 'f0': 1
+        Function 'f1': 3
+        Top-level complexity: 0
+        """)
+
+
+def test_keys(tmp_path: Path):
+    code = "int f(int x) { if (x) {} }\nint f(char c) { while (c) { if (c) {} } }\n"
+    result = runner.invoke(app, ["--keys"], input=code)
+
+    assert result.exit_code == 0
+    assert "Function 'f' at line 1: 1\nFunction 'f' at line 2: 3\n" in result.stdout
+
+    (tmp_path / "a.c").write_text(code)
+    for _ in range(2):
+        result = runner.invoke(app, [str(tmp_path / "a.c"), "--keys", "--format", "jsonl", "--cache-dir", str(tmp_path / "cache")])
+        assert result.exit_code == 0
+        # the cache summary is written to stderr
+        assert [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")] == [
+            {"kind": "function", "file": str(tmp_path / "a.c"), "function": "f", "total": 1, "start_row": 0, "start_byte": 0},
+            {"kind": "function", "file": str(tmp_path / "a.c"), "function": "f", "total": 3, "start_row": 1, "start_byte": 27},
+            {"kind": "function", "file": str(tmp_path / "a.c"), "function": None, "total": 0},
+        ]
+
+
+def test_iter_source_files(tree: Path):
+    files = list(iter_source_files([tree / "src", str(tree / "src" / "*.c"), tree / "src" / "notes.txt"]))
+
+    assert files == [
+        tree / "src" / "a.c",
+        tree / "src" / "sub" / "b.h",
+        tree / "src" / "notes.txt",
+    ]
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_files(tree: Path, jobs: int):
+    result = runner.invoke(app, [str(tree / "src"), "--jobs", str(jobs), "--ordered"])
+
+    assert result.exit_code == 0
+    assert result.stdout == textwrap.dedent(f"""\
+        File '{tree / "src" / "a.c"}'
+        Total Modified Cognitive Complexity: 4
+
+        Complexity by function:
+        Function 'f0': 1
+        Function 'f1': 3
+        Top-level complexity: 0
+
+        File '{tree / "src" / "sub" / "b.h"}'
+        Total Modified Cognitive Complexity: 1
+
+        """)
+
+
+@pytest.mark.parametrize("language", ("c", "cpp"))
+def test_language(tree: Path, language: str):
+    result = runner.invoke(app, ["--language", language, str(tree / "src" / "a.c")])
+
+    assert result.exit_code == 0
+    assert "Total Modified Cognitive Complexity: 4" in result.stdout
+
+    result = runner.invoke(app, ["--language", language], input=CODE_A)
+
+    assert result.exit_code == 0
+    assert "Total Modified Cognitive Complexity: 4" in result.stdout
+
+
+def test_unknown_language():
+    result = runner.invoke(app, ["--language", "cobol"], input=CODE_A)
+
+    assert result.exit_code == 2
+    assert "cobol" in result.output
+
+
+def test_files_missing(tree: Path):
+    result = runner.invoke(app, [str(tree / "missing.c")])
+
+    assert result.exit_code == 1
+    assert "missing.c" in result.output
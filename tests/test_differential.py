@@ -0,0 +1,132 @@
+import random
+import sys
+
+import pytest
+import tree_sitter_cpp
+from tree_sitter import Language, Parser
+
+from modified_cognitive_complexity import cognitive_complexity, cognitive_complexity_totals
+from tests import reference
+
+
+_parser = Parser(Language(tree_sitter_cpp.language()))
+
+
+def _random_condition(rng: random.Random, depth: int = 0) -> str:
+    if depth > 3 or rng.random() < 0.4:
+        return rng.choice(("a", "b", "c", "f(x)", "x > 2", "!y"))
+
+    kind = rng.randrange(4)
+    if kind == 0:
+        operator = rng.choice(("&&", "||", "+", "=="))
+        return f"{_random_condition(rng, depth + 1)} {operator} {_random_condition(rng, depth + 1)}"
+    if kind == 1:
+        return f"({_random_condition(rng, depth + 1)})"
+    if kind == 2:
+        return f"{_random_condition(rng, depth + 1)} ? {_random_condition(rng, depth + 1)} : {_random_condition(rng, depth + 1)}"
+    return f"g({_random_condition(rng, depth + 1)}, {_random_condition(rng, depth + 1)})"
+
+
+def _random_statement(rng: random.Random, labels: list[str], depth: int = 0) -> str:
+    kind = rng.randrange(12) if depth < 4 else 0
+    condition = _random_condition(rng)
+
+    def block() -> str:
+        return "{ " + " ".join(_random_statement(rng, labels, depth + 1) for _ in range(rng.randrange(3))) + " }"
+
+    if kind == 0:
+        return f"x = {condition};"
+    if kind == 1:
+        return f"if ({condition}) {block()}"
+    if kind == 2:
+        return f"if ({condition}) {block()} else {block()}"
+    if kind == 3:
+        return f"if ({condition}) {block()} else if ({_random_condition(rng)}) {block()} else {_random_statement(rng, labels, depth + 1)}"
+    if kind == 4:
+        return f"for (int i = 0; {condition}; i++) {block()}"
+    if kind == 5:
+        return f"while ({condition}) {block()}"
+    if kind == 6:
+        return f"do {block()} while ({condition});"
+    if kind == 7:
+        return f"switch ({condition}) {{ case 1: {_random_statement(rng, labels, depth + 1)} break; default: {block()} }}"
+    if kind == 8:
+        return f"try {block()} catch (int e) {block()}"
+    if kind == 9:
+        label = rng.choice(labels)
+        return f"goto {label};"
+    if kind == 10:
+        label = rng.choice(labels)
+        return f"{label}: {_random_statement(rng, labels, depth + 1)}"
+    return block()
+
+
+def _random_program(seed: int) -> str:
+    rng = random.Random(seed)
+    labels = [f"L{i}" for i in range(3)]
+    parts = []
+    for i in range(rng.randrange(1, 4)):
+        statements = " ".join(_random_statement(rng, labels) for _ in range(rng.randrange(1, 6)))
+        if rng.random() < 0.7:
+            parts.append(f"int f{rng.randrange(3)}(int x) {{ {statements} }}")
+        else:
+            parts.append(statements)
+    return "\n".join(parts)
+
+
+def _assert_same(code: str, goto_nesting: bool, structural_gotos: bool):
+    tree = _parser.parse(code.encode())
+
+    expected = reference.cognitive_complexity(tree.walk(), goto_nesting=goto_nesting, structural_gotos=structural_gotos)
+    actual = cognitive_complexity(tree.walk(), goto_nesting=goto_nesting, structural_gotos=structural_gotos)
+
+    assert list(actual.items()) == list(expected.items())
+
+    totals = cognitive_complexity_totals(tree.walk(), goto_nesting=goto_nesting, structural_gotos=structural_gotos)
+    assert totals == {
+        function_name: sum(cost.total for _, cost in scores)
+        for function_name, scores in expected.items()
+    }
+
+
+@pytest.mark.parametrize("seed", range(200))
+@pytest.mark.parametrize(("goto_nesting", "structural_gotos"), ((True, False), (False, False), (True, True)))
+def test_random_programs(seed: int, goto_nesting: bool, structural_gotos: bool):
+    _assert_same(_random_program(seed), goto_nesting, structural_gotos)
+
+
+def test_nested_functions():
+    code = """\
+        int f() {
+            struct S { int g() { if (a) {} return 0; } int f() { return b || c; } };
+            if (x) { goto L; }
+            L: return 0;
+        }
+        int f() { while (y) {} }
+        """
+    _assert_same(code, True, True)
+
+
+@pytest.mark.parametrize(
+    "code",
+    (
+        "int f() { struct S { int f() { return b || c; } }; if (x) { if (y) {} } }",
+        "int f() { struct S { int g() { struct T { int f() { return a && b; } }; } }; if (x) {} }\nint h() {}",
+        "int f() {}\nint g() { struct S { int f() { if (a) {} } }; if (x) { while (y) {} } }",
+    ),
+)
+def test_nested_functions_same_name(code: str):
+    _assert_same(code, True, False)
+
+
+def test_no_depth_limit():
+    depth = 2 * sys.getrecursionlimit()
+    ladder = "if (x) {}" + "".join(f" else if (x{i}) {{}}" for i in range(depth))
+    chain = " && ".join(["a", "b"] * depth)
+    code = f"int f() {{ {ladder} return {chain}; }}"
+
+    tree = _parser.parse(code.encode())
+    scores = cognitive_complexity(tree.walk())
+
+    # the initial if, each else clause and the single sequence of && operators
+    assert len(scores[b"f"]) == 1 + depth + 1
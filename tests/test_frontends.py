@@ -0,0 +1,140 @@
+import importlib.util
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from modified_cognitive_complexity import (
+    Frontend,
+    NodeTypes,
+    analyzer_for,
+    analyzer_for_path,
+    cognitive_complexity_for_file,
+    cognitive_complexity_for_string,
+    default_analyzer,
+    frontend_for_path,
+    get_frontend,
+    register_frontend,
+    registered_frontends,
+    source_suffixes,
+)
+from modified_cognitive_complexity import frontends as frontends_module
+from modified_cognitive_complexity.cache import ResultCache
+from modified_cognitive_complexity.scan import init_worker, iter_source_files
+
+
+CODE = textwrap.dedent("""\
+    int f() {
+        while (x) {
+            if (y) {}
+        }
+    }
+    """)
+
+HAS_C = importlib.util.find_spec("tree_sitter_c") is not None
+
+
+@pytest.fixture
+def registry():
+    """Restore the registry after a test registered frontends."""
+
+    saved = dict(frontends_module._frontends)
+    yield
+    frontends_module._frontends.clear()
+    frontends_module._frontends.update(saved)
+    frontends_module._resolve.cache_clear()
+
+
+def test_builtin_frontends():
+    assert [frontend.name for frontend in registered_frontends()][:2] == ["cpp", "c"]
+
+
+@pytest.mark.parametrize("path", ["a.cpp", "a.CC", "a.h", "a.hpp", "a.cu", "kernels/a.cuh", "a.txt", "Makefile"])
+def test_cpp_suffixes(path: str):
+    assert frontend_for_path(path).name == "cpp"
+
+
+def test_c_suffix():
+    assert frontend_for_path(Path("src/a.c")).name == ("c" if HAS_C else "cpp")
+
+
+@pytest.mark.skipif(HAS_C, reason="tree-sitter-c is installed")
+def test_fallback():
+    assert get_frontend("c") is get_frontend("cpp")
+    assert analyzer_for("c") is default_analyzer()
+
+
+@pytest.mark.skipif(not HAS_C, reason="tree-sitter-c is not installed")
+def test_c_grammar():
+    assert cognitive_complexity_for_string(CODE, language="c") == cognitive_complexity_for_string(CODE)
+
+
+def test_unknown_frontend():
+    with pytest.raises(LookupError):
+        get_frontend("cobol")
+
+
+def test_missing_grammar(registry):
+    register_frontend(Frontend("missing", "tree_sitter_missing", "tree-sitter-missing", frozenset({".missing"})))
+
+    with pytest.raises(LookupError, match="not installed"):
+        get_frontend("missing")
+
+
+def test_duplicate_frontend(registry):
+    with pytest.raises(ValueError):
+        register_frontend(Frontend("cpp", "tree_sitter_cpp", "tree-sitter-cpp", frozenset()))
+
+    register_frontend(Frontend("cpp", "tree_sitter_cpp", "tree-sitter-cpp", frozenset({".cpp"})), replace=True)
+    assert frontend_for_path("a.cc").name == "cpp"
+
+
+def test_grammar_loaded_once():
+    frontend = get_frontend("cpp")
+
+    assert frontend.language() is frontend.language()
+    assert analyzer_for("cpp") is default_analyzer()
+    assert analyzer_for_path("a.hpp") is default_analyzer()
+
+
+def test_custom_node_types(registry, tmp_path: Path):
+    # the same grammar, but while loops are not scored
+    register_frontend(Frontend(
+        "noloops",
+        "tree_sitter_cpp",
+        "tree-sitter-cpp",
+        frozenset({".nl"}),
+        node_types=NodeTypes(loops=frozenset({"for_statement", "do_statement", "catch_clause"})),
+    ))
+    file = tmp_path / "code.nl"
+    file.write_text(CODE)
+
+    assert cognitive_complexity_for_string(CODE) == {b"f": 3, None: 0}
+    assert cognitive_complexity_for_string(CODE, language="noloops") == {b"f": 1, None: 0}
+    assert cognitive_complexity_for_file(file) == {b"f": 1, None: 0}
+    assert cognitive_complexity_for_file(file, language="cpp") == {b"f": 3, None: 0}
+    assert list(iter_source_files([tmp_path])) == [file]
+    assert ".nl" in source_suffixes() and ".cpp" in source_suffixes()
+
+
+def test_init_worker(registry):
+    # frontends whose grammar is not installed are skipped
+    register_frontend(Frontend("missing", "tree_sitter_missing", "tree-sitter-missing", frozenset({".m"})))
+    init_worker()
+
+    assert all(analyzer_for(frontend).parser is not None for frontend in ("cpp", "c"))
+    init_worker("c")
+
+
+def test_cuda_files(tmp_path: Path):
+    (tmp_path / "kernel.cu").write_text(CODE)
+    (tmp_path / "notes.txt").write_text(CODE)
+
+    assert list(iter_source_files([tmp_path])) == [tmp_path / "kernel.cu"]
+
+
+def test_cache_key_includes_grammar(tmp_path: Path):
+    cache = ResultCache(tmp_path)
+
+    assert cache.key(b"int f();") == cache.key(b"int f();", grammar="tree-sitter-cpp")
+    assert cache.key(b"int f();") != cache.key(b"int f();", grammar="tree-sitter-c")
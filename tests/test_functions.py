@@ -1,7 +1,9 @@
 import textwrap
 
 import pytest
+from tree_sitter import Node, Point
 
+from modified_cognitive_complexity import FunctionKey, cognitive_complexity, cognitive_complexity_totals, default_analyzer, function_name
 from modified_cognitive_complexity.complexity import Nesting, Scores
 from tests.util import score, assert_scores
 
@@ -110,4 +112,113 @@ def test(
     goto_nesting: bool,
     structural_gotos: bool,
 ):
-    assert_scores(textwrap.dedent(code), expected_scores, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
\ No newline at end of file
+    assert_scores(textwrap.dedent(code), expected_scores, goto_nesting=goto_nesting, structural_gotos=structural_gotos)
+
+
+@pytest.mark.parametrize(
+    ("code", "function_name"),
+    (
+        pytest.param("int f(int x) {}", b"f", id="plain"),
+        pytest.param("int *f(int x) {}", b"f", id="pointer"),
+        pytest.param("char **f(void) {}", b"f", id="pointer to pointer"),
+        pytest.param("int &f(int x) {}", b"f", id="reference"),
+        pytest.param("int &&f() {}", b"f", id="rvalue reference"),
+        pytest.param("static int (f)(void) {}", b"f", id="parenthesized"),
+        pytest.param("int (*f(int x))(int) {}", b"f", id="returning function pointer"),
+        pytest.param("void (*(*f(int x))(int))(char) {}", b"f", id="returning nested function pointer"),
+        pytest.param("int A::f(int x) const {}", b"A::f", id="qualified"),
+        pytest.param("int *A::B::f(int x) {}", b"A::B::f", id="qualified pointer"),
+        pytest.param("A::~A() {}", b"A::~A", id="destructor"),
+        pytest.param("bool A::operator==(const A &a) const {}", b"A::operator==", id="operator"),
+        pytest.param("template <typename T> T *f(T x) {}", b"f", id="template"),
+        pytest.param("auto f() -> int {}", b"f", id="trailing return type"),
+        pytest.param("A::operator bool() const {}", b"A::operator bool", id="conversion operator"),
+        pytest.param("A::operator int*() {}", b"A::operator int*", id="conversion operator to pointer"),
+    ),
+)
+def test_names(code: str, function_name: bytes):
+    assert_scores(code.replace("{}", "{ if (x) {} }"), {
+        function_name: [score((0, code.index("{") + 2), (0, code.index("{") + 11), 1, Nesting())],
+        None: [],
+    })
+
+
+KEYS_CODE = textwrap.dedent("""\
+    int f(int a) { if (a) {} }
+    int f(double a) { while (a) { if (a) {} } }
+    #ifdef X
+    static int g(void) { if (x) {} }
+    #else
+    static int g(void) { return 0; }
+    #endif
+    struct A { int m() { if (x) {} } };
+    int outer() {
+        struct L { int f() { if (y) {} } };
+        if (x) {}
+    }
+    """)
+
+
+def test_keys():
+    tree = default_analyzer().parse(KEYS_CODE.encode())
+    totals = cognitive_complexity_totals(tree.walk(), keys=True)
+
+    # functions with the same name are all kept, ordered by their start
+    assert [(key.name, key.start.row) for key in totals if key is not None] == [
+        (b"f", 0), (b"f", 1), (b"g", 3), (b"g", 5), (b"m", 7), (b"outer", 8), (b"f", 9)
+    ]
+    assert list(totals.values()) == [1, 3, 1, 0, 1, 1, 1, 0]
+
+    key = next(iter(totals))
+    assert key == FunctionKey(b"f", Point(0, 0), 0, KEYS_CODE.index("\n"))
+    assert KEYS_CODE.encode()[key.start_byte:key.end_byte] == b"int f(int a) { if (a) {} }"
+
+    scores = cognitive_complexity(tree.walk(), keys=True)
+    assert list(scores) == list(totals)
+    assert {key: sum(cost.total for _, cost in costs) for key, costs in scores.items()} == totals
+
+    # by name, the last of the functions with the same name overwrites the others
+    assert cognitive_complexity_totals(tree.walk()) == {b"f": 1, b"g": 0, b"m": 1, b"outer": 1, None: 0}
+
+
+def test_keys_hook():
+    tree = default_analyzer().parse(KEYS_CODE.encode())
+    expected = cognitive_complexity_totals(tree.walk(), keys=True)
+
+    def function_hook(node: Node) -> dict[FunctionKey, int] | None:
+        if node.start_point.row != 8:
+            return None
+        return {key: total for key, total in expected.items() if key is not None and key.start.row >= 8}
+
+    assert cognitive_complexity_totals(tree.walk(), keys=True, function_hook=function_hook) == expected
+
+
+def test_deeply_nested_functions():
+    depth = 200
+    code = "int f0() {\n" + "".join(f"struct S{i} {{ int f{i}() {{ if (x) {{}}\n" for i in range(1, depth)) + "} };\n" * (depth - 1) + "}\n"
+    totals = cognitive_complexity_totals(default_analyzer().parse(code.encode()).walk())
+
+    assert list(totals) == [f"f{i}".encode() for i in range(depth)] + [None]
+    assert list(totals.values()) == [0] + [1] * (depth - 1) + [0]
+
+
+def test_conversion_operator_in_class():
+    code = "struct A { operator bool() const { if (x) { if (y) {} } return 1; } };"
+    totals = cognitive_complexity_totals(default_analyzer().parse(code.encode()).walk())
+
+    assert totals == {b"operator bool": 3, None: 0}
+
+
+def test_unknown_declarator():
+    # e.g. if the parameter list is produced by a macro, the grammar finds no function declarator
+    code = "int f { if (x) { if (y) {} } }\nvoid A::g { if (x) {} }\n"
+    tree = default_analyzer().parse(code.encode())
+
+    assert cognitive_complexity_totals(tree.walk()) == {b"f": 3, b"A::g": 1, None: 0}
+
+
+def test_function_name():
+    tree = default_analyzer().parse(b"int *A::f(int x) {}\n")
+
+    assert function_name(tree.root_node.children[0]) == b"A::f"
+    assert function_name(tree.root_node) is None
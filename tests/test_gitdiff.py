@@ -0,0 +1,168 @@
+import json
+import shutil
+import subprocess
+import textwrap
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from modified_cognitive_complexity import Frontend, register_frontend
+from modified_cognitive_complexity import frontends as frontends_module
+from modified_cognitive_complexity.cli import app
+from modified_cognitive_complexity.gitdiff import FunctionDelta, GitError, diff_revisions, parse_revisions
+
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+runner = CliRunner()
+
+
+BASE = textwrap.dedent("""\
+    int unchanged(int x) {
+        if (x) {}
+    }
+
+    int modified(int x) {
+        if (x) {}
+    }
+
+    int removed(int x) {
+        while (x) {}
+    }
+
+    int grown(int x) {
+        if (x) {
+        }
+    }
+    """)
+
+HEAD = textwrap.dedent("""\
+    int unchanged(int x) {
+        if (x) {}
+    }
+
+    int modified(int x) {
+        if (x) { if (x && y) {} }
+    }
+
+    int grown(int x) {
+        if (x) {
+            for (;;) {}
+        }
+    }
+
+    int added(int x) {
+        return x ? 1 : 0;
+    }
+
+    if (top) {}
+    """)
+
+
+def git(repository: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", "-C", str(repository), *args],
+        check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repository(tmp_path: Path) -> Path:
+    git(tmp_path, "init", "-q")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.c").write_text(BASE)
+    (tmp_path / "src" / "old.c").write_text("int gone(void) { if (x) {} }\n")
+    (tmp_path / "src" / "moved.c").write_text("int same(void) { if (x) {} }\n")
+    (tmp_path / "notes.txt").write_text("not code\n")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "base")
+
+    (tmp_path / "src" / "a.c").write_text(HEAD)
+    (tmp_path / "src" / "old.c").unlink()
+    (tmp_path / "src" / "new.c").write_text("int fresh(void) { while (x) {} }\n")
+    git(tmp_path, "mv", "src/moved.c", "src/renamed.c")
+    (tmp_path / "notes.txt").write_text("still not code\n")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "head")
+    return tmp_path
+
+
+def test_diff_revisions(repository: Path):
+    deltas = list(diff_revisions("HEAD~1", "HEAD", repository=repository))
+
+    assert deltas == [
+        FunctionDelta("src/a.c", b"modified", 1, 4),
+        FunctionDelta("src/a.c", b"grown", 1, 3),
+        FunctionDelta("src/a.c", b"added", None, 1),
+        FunctionDelta("src/a.c", b"removed", 1, None),
+        FunctionDelta("src/a.c", None, 0, 1),
+        FunctionDelta("src/new.c", b"fresh", None, 1),
+        FunctionDelta("src/old.c", b"gone", 1, None),
+    ]
+    assert [delta.delta for delta in deltas] == [3, 2, 1, -1, 1, 1, -1]
+
+
+def test_paths(repository: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(repository / "src")
+
+    deltas = list(diff_revisions("HEAD~1", "HEAD", paths=["new.c"]))
+
+    assert deltas == [FunctionDelta("src/new.c", b"fresh", None, 1)]
+
+
+def test_registered_suffix(repository: Path):
+    (repository / "notes.txt").write_text("if (x) {}\n")
+    git(repository, "commit", "-q", "-a", "-m", "notes")
+
+    assert list(diff_revisions("HEAD~1", "HEAD", repository=repository)) == []
+
+    saved = dict(frontends_module._frontends)
+    try:
+        register_frontend(Frontend("notes", "tree_sitter_cpp", "tree-sitter-cpp", frozenset({".txt"})))
+        deltas = list(diff_revisions("HEAD~1", "HEAD", repository=repository))
+    finally:
+        frontends_module._frontends.clear()
+        frontends_module._frontends.update(saved)
+        frontends_module._resolve.cache_clear()
+
+    assert deltas == [FunctionDelta("notes.txt", None, 0, 1)]
+
+
+def test_parse_revisions(repository: Path):
+    assert parse_revisions("main..feature", repository=repository) == ("main", "feature")
+    assert parse_revisions("main", repository=repository) == ("main", "HEAD")
+    assert parse_revisions("..feature", repository=repository) == ("HEAD", "feature")
+    assert parse_revisions("HEAD~1...HEAD", repository=repository) == (git(repository, "rev-parse", "HEAD~1"), "HEAD")
+
+
+def test_unknown_revision(repository: Path):
+    with pytest.raises(GitError):
+        list(diff_revisions("missing", "HEAD", repository=repository))
+
+
+def test_cli(repository: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(repository)
+
+    result = runner.invoke(app, ["diff", "HEAD~1..HEAD", "src/a.c"])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines() == [
+        "File 'src/a.c'",
+        "Function 'modified': 1 -> 4 (+3)",
+        "Function 'grown': 1 -> 3 (+2)",
+        "Function 'added': - -> 1 (+1)",
+        "Function 'removed': 1 -> - (-1)",
+        "Top-level complexity: 0 -> 1 (+1)",
+        "",
+        "Total delta of Modified Cognitive Complexity: +6",
+    ]
+
+    result = runner.invoke(app, ["diff", "HEAD~1", "-f", "jsonl", "src/old.c"])
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line) for line in result.output.splitlines()] == [
+        {"file": "src/old.c", "function": "gone", "before": 1, "after": None, "delta": -1},
+    ]
+
+    result = runner.invoke(app, ["diff", "missing..HEAD"])
+    assert result.exit_code == 1
+    assert "bad revision" in result.output
@@ -0,0 +1,41 @@
+from modified_cognitive_complexity.gotos import GotoResolver
+
+
+def test_no_gotos():
+    resolver = GotoResolver()
+    resolver.add_label(b"end", 3)
+
+    assert not resolver
+    assert list(resolver.resolved()) == []
+    assert resolver.goto_nestings(5) is None
+
+
+def test_forward_and_backward_gotos():
+    resolver = GotoResolver()
+    resolver.add_label(b"retry", 0)
+    resolver.add_goto(b"out", 1)
+    resolver.add_goto(b"retry", 3)
+    resolver.add_label(b"out", 5)
+
+    assert resolver
+    assert list(resolver.resolved()) == [(1, 5), (3, 0)]
+    assert resolver.goto_nestings(6) == [0, 1, 2, 1, 1, 0, 0]
+
+
+def test_unresolved_goto_is_ignored():
+    resolver = GotoResolver()
+    resolver.add_goto(b"missing", 0)
+
+    assert resolver
+    assert list(resolver.resolved()) == []
+    assert resolver.goto_nestings(3) is None
+
+
+def test_last_label_definition_wins():
+    resolver = GotoResolver()
+    resolver.add_label(b"end", 1)
+    resolver.add_goto(b"end", 2)
+    resolver.add_goto(b"end", 3)
+    resolver.add_label(b"end", 4)
+
+    assert list(resolver.resolved()) == [(2, 4), (3, 4)]
@@ -0,0 +1,78 @@
+import random
+import textwrap
+
+import pytest
+
+from modified_cognitive_complexity import cognitive_complexity, default_analyzer
+from modified_cognitive_complexity.incremental import IncrementalSession
+
+
+CODE = textwrap.dedent("""\
+    int f0(int x) {
+        L:
+        if (x) {
+            goto L;
+        }
+    }
+    int f1(int x) {
+        while (x && y || z) {}
+    }
+    if (a) { goto M; }
+    M:;
+    int f2(int x) {
+        for (;;) { if (x) {} else {} }
+    }
+    """)
+
+
+def _assert_up_to_date(session: IncrementalSession):
+    tree = default_analyzer().parse(session.code)
+    expected = cognitive_complexity(tree.walk(), goto_nesting=session.goto_nesting, structural_gotos=session.structural_gotos)
+
+    assert list(session.scores().items()) == list(expected.items())
+
+
+def test_initial():
+    session = IncrementalSession(CODE)
+
+    _assert_up_to_date(session)
+    assert session.rescored == 3
+
+
+def test_reuse_unchanged_functions():
+    session = IncrementalSession(CODE)
+    session.scores()
+
+    # shifts all functions after the edit by one line and two columns on the line of the edit
+    session.edit(CODE.index("int f1"), CODE.index("int f1"), "\n  ")
+
+    _assert_up_to_date(session)
+    assert session.rescored == 0
+
+
+def test_rescore_changed_function():
+    session = IncrementalSession(CODE)
+    session.scores()
+
+    session.update(CODE.replace("while (x && y || z) {}", "while (x && y || z) { if (w) {} }"))
+
+    _assert_up_to_date(session)
+    assert session.rescored == 1
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("structural_gotos", (False, True))
+def test_random_edits(seed: int, structural_gotos: bool):
+    rng = random.Random(seed)
+    fragments = ["if (x) {}", "goto L;", "L:", "}", "{", "\n", "a && b", "int g() {", "else", ";", " "]
+    session = IncrementalSession(CODE, structural_gotos=structural_gotos)
+
+    for _ in range(30):
+        code = session.code
+        start = rng.randrange(len(code) + 1)
+        end = min(len(code), start + rng.randrange(10))
+        session.edit(start, end, rng.choice(fragments))
+        if rng.random() < 0.5:
+            _assert_up_to_date(session)
+
+    _assert_up_to_date(session)
@@ -0,0 +1,180 @@
+import json
+import os
+import textwrap
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from modified_cognitive_complexity import FunctionKey, cognitive_complexity, default_analyzer
+from modified_cognitive_complexity.cli import app
+from modified_cognitive_complexity.index import DirectoryRollup, IndexedFunction, ProjectIndex
+
+
+runner = CliRunner()
+
+CODE_A = textwrap.dedent("""\
+    int f() {
+        if (a) {
+            if (b) {}
+        }
+    }
+    int g() { while (x) {} }
+    """)
+
+CODE_B = textwrap.dedent("""\
+    int h() {
+        for (;;) {
+            if (a && b) {}
+        }
+    }
+    if (c) {}
+    """)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    (tmp_path / "src" / "sub").mkdir(parents=True)
+    (tmp_path / "src" / "a.c").write_text(CODE_A)
+    (tmp_path / "src" / "sub" / "b.cpp").write_text(CODE_B)
+    return tmp_path
+
+
+def _touch(file: Path):
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_refresh(project: Path):
+    with ProjectIndex(project / "index.db") as index:
+        summary = index.refresh([project / "src"])
+        assert (summary.scored, summary.unchanged, summary.removed) == (2, 0, 0)
+
+        summary = index.refresh([project / "src"])
+        assert (summary.scored, summary.unchanged, summary.removed) == (0, 2, 0)
+
+        # touched, but with the same content
+        _touch(project / "src" / "a.c")
+        summary = index.refresh([project / "src"])
+        assert (summary.scored, summary.unchanged, summary.removed) == (0, 2, 0)
+
+        (project / "src" / "a.c").write_text(CODE_A + "int k() { if (x) {} }\n")
+        _touch(project / "src" / "a.c")
+        summary = index.refresh([project / "src"])
+        assert (summary.scored, summary.unchanged, summary.removed) == (1, 1, 0)
+        assert index.scores(project / "src" / "a.c") == {b"f": 3, b"g": 1, b"k": 1, None: 0}
+
+        (project / "src" / "sub" / "b.cpp").unlink()
+        summary = index.refresh([project / "src"])
+        assert (summary.scored, summary.unchanged, summary.removed) == (0, 1, 1)
+        assert index.scores(project / "src" / "sub" / "b.cpp") is None
+
+
+def test_persistence(project: Path):
+    with ProjectIndex(project / "index.db") as index:
+        index.refresh([project / "src"])
+
+    with ProjectIndex(project / "index.db", create=False) as index:
+        assert index.refresh([project / "src"]).unchanged == 2
+        assert index.top(1) == [IndexedFunction("src/sub/b.cpp", b"h", 4)]
+
+
+def test_options_change(project: Path):
+    with ProjectIndex(project / "index.db") as index:
+        index.refresh([project / "src"])
+
+        assert index.refresh([project / "src"], structural_gotos=True).scored == 2
+        assert index.refresh([project / "src"], structural_gotos=True).scored == 0
+
+
+def test_missing_database(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        ProjectIndex(tmp_path / "index.db", create=False)
+
+
+def test_queries(project: Path):
+    with ProjectIndex(project / "index.db") as index:
+        index.refresh([project / "src"])
+
+        assert index.top(3) == [
+            IndexedFunction("src/sub/b.cpp", b"h", 4),
+            IndexedFunction("src/a.c", b"f", 3),
+            IndexedFunction("src/a.c", b"g", 1),
+        ]
+        assert index.top(10, prefix=project / "src" / "sub") == [
+            IndexedFunction("src/sub/b.cpp", b"h", 4),
+            IndexedFunction("src/sub/b.cpp", None, 1),
+        ]
+        assert index.top(10, prefix=project / "src" / "a.c") == [
+            IndexedFunction("src/a.c", b"f", 3),
+            IndexedFunction("src/a.c", b"g", 1),
+            IndexedFunction("src/a.c", None, 0),
+        ]
+        assert index.top(10, prefix=project / "sr") == []
+
+        assert index.over(2) == [IndexedFunction("src/sub/b.cpp", b"h", 4), IndexedFunction("src/a.c", b"f", 3)]
+
+        assert index.rollup(depth=1) == [DirectoryRollup("src", 2, 3, 9, 4)]
+        assert index.rollup(depth=2) == [DirectoryRollup("src", 1, 2, 4, 3), DirectoryRollup("src/sub", 1, 1, 5, 4)]
+        assert index.rollup(prefix=project / "src" / "sub") == [DirectoryRollup("src", 1, 1, 5, 4)]
+
+
+def test_locations(project: Path):
+    with ProjectIndex(project / "index.db") as index:
+        index.refresh([project / "src"], locations=True)
+
+        expected = cognitive_complexity(default_analyzer().parse(CODE_B).walk())
+        assert index.scores(project / "src" / "sub" / "b.cpp") == expected
+
+
+def test_keys(project: Path):
+    (project / "src" / "c.cpp").write_text("static int f() { if (x) {} }\nint f(int y) { while (y) {} while (y) {} }\n")
+
+    with ProjectIndex(project / "index.db") as index:
+        index.refresh([project / "src" / "c.cpp"])
+        assert index.scores(project / "src" / "c.cpp") == {b"f": 2, None: 0}
+
+        assert index.refresh([project / "src" / "c.cpp"], keys=True).scored == 1
+        scores = index.scores(project / "src" / "c.cpp")
+        assert [(key.name, key.start.row, key.start_byte, total) for key, total in scores.items() if key is not None] == [
+            (b"f", 0, 0, 1), (b"f", 1, 29, 2)
+        ]
+        assert index.top(2) == [IndexedFunction("src/c.cpp", b"f", 2, 1, 29), IndexedFunction("src/c.cpp", b"f", 1, 0, 0)]
+
+        index.refresh([project / "src" / "c.cpp"], keys=True, locations=True)
+        expected = cognitive_complexity(default_analyzer().parse((project / "src" / "c.cpp").read_bytes()).walk(), keys=True)
+        assert index.scores(project / "src" / "c.cpp") == expected
+        assert all(isinstance(key, FunctionKey) for key in expected if key is not None)
+
+
+def test_cli(project: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(project)
+
+    result = runner.invoke(app, ["index", "src"])
+    assert result.exit_code == 0
+    assert "2 scored, 0 unchanged, 0 removed" in result.output
+
+    result = runner.invoke(app, ["query", "--top", "2"])
+    assert result.exit_code == 0
+    assert result.stdout == "Function 'h' in 'src/sub/b.cpp': 4\nFunction 'f' in 'src/a.c': 3\n"
+
+    result = runner.invoke(app, ["query", "src/sub", "--over", "0", "--format", "jsonl"])
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {"kind": "function", "file": "src/sub/b.cpp", "function": "h", "total": 4},
+        {"kind": "function", "file": "src/sub/b.cpp", "function": None, "total": 1},
+    ]
+
+    result = runner.invoke(app, ["query", "--rollup", "2", "--format", "csv"])
+    assert result.exit_code == 0
+    assert result.stdout == "directory,files,functions,total,max\nsrc,1,2,4,3\nsrc/sub,1,1,5,4\n"
+
+    result = runner.invoke(app, ["query", "--top", "2", "--over", "1"])
+    assert result.exit_code == 2
+
+
+def test_cli_missing_index(tmp_path: Path):
+    result = runner.invoke(app, ["query", "--database", str(tmp_path / "index.db")])
+
+    assert result.exit_code == 1
+    assert "does not exist" in result.output
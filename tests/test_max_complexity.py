@@ -0,0 +1,142 @@
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from modified_cognitive_complexity import (
+    cognitive_complexity,
+    cognitive_complexity_for_file,
+    cognitive_complexity_for_many,
+    cognitive_complexity_for_string,
+    cognitive_complexity_parallel,
+    cognitive_complexity_totals,
+    default_analyzer,
+)
+from modified_cognitive_complexity.cache import ResultCache
+from modified_cognitive_complexity.cli import app
+from tests.test_differential import _random_program
+
+
+runner = CliRunner()
+
+NESTED = b"""
+void f() {
+    if (a) { if (b) { if (c) {} } }
+    struct S { void g() { if (a) {} } };
+}
+void h() { while (x) {} }
+"""
+
+
+@pytest.mark.parametrize("seed", range(100))
+@pytest.mark.parametrize("structural_gotos", [False, True])
+def test_random_programs(seed: int, structural_gotos: bool):
+    tree = default_analyzer().parse(_random_program(seed).encode())
+    totals = cognitive_complexity_totals(tree.walk(), structural_gotos=structural_gotos)
+
+    for limit in (0, 2, 5, 10, 25):
+        exceeding = {function_name for function_name, total in totals.items() if total > limit}
+
+        limited = cognitive_complexity_totals(tree.walk(), structural_gotos=structural_gotos, max_complexity=limit)
+        assert set(limited) == exceeding
+        assert all(limit < limited[function_name] <= totals[function_name] for function_name in limited)
+
+        scores = cognitive_complexity(tree.walk(), structural_gotos=structural_gotos, max_complexity=limit)
+        assert {function_name: sum(cost.total for _, cost in scores[function_name]) for function_name in scores} == limited
+
+
+def test_stops_traversal():
+    tree = default_analyzer().parse(NESTED)
+    assert cognitive_complexity_totals(tree.walk()) == {b"f": 6, b"g": 1, b"h": 1, None: 0}
+
+    # f is abandoned after its third if statement, but the nested function g is still scored
+    assert cognitive_complexity_totals(tree.walk(), max_complexity=2) == {b"f": 3}
+    assert cognitive_complexity_totals(tree.walk(), max_complexity=0) == {b"f": 1, b"g": 1, b"h": 1}
+    assert cognitive_complexity_totals(tree.walk(), max_complexity=6) == {}
+
+
+def test_nested_functions_after_limit():
+    code = b"""
+void f() {
+    if (a) {
+        struct S {
+            void g() { while (b) { if (c) {} } }
+            void h() { struct T { void k() { if (d) { if (e) {} } } }; if (x) {} }
+        };
+    }
+    while (y) {}
+}
+"""
+    tree = default_analyzer().parse(code)
+    assert cognitive_complexity_totals(tree.walk()) == {b"f": 2, b"g": 3, b"h": 1, b"k": 3, None: 0}
+
+    assert cognitive_complexity_totals(tree.walk(), max_complexity=0) == {b"f": 1, b"g": 1, b"h": 1, b"k": 1}
+    assert cognitive_complexity_totals(tree.walk(), max_complexity=1) == {b"f": 2, b"g": 3, b"k": 3}
+
+
+def test_goto_nesting():
+    # the lower bound of 3 does not exceed the limit, but the goto nesting does
+    code = b"void f() { goto end; if (a) {} if (b) {} end: ; }"
+    assert cognitive_complexity_for_string(code, max_complexity=3) == {b"f": 5}
+    assert cognitive_complexity_for_string(code, max_complexity=5) == {}
+
+
+def test_top_level():
+    code = b"if (a) { if (b) {} }\nvoid f() { if (a) {} }"
+    assert cognitive_complexity_for_string(code, max_complexity=1) == {None: 3}
+
+
+def test_helpers(tmp_path: Path):
+    file = tmp_path / "a.c"
+    file.write_bytes(NESTED)
+
+    cache = ResultCache(tmp_path / "cache")
+    assert cognitive_complexity_for_file(file, cache=cache, max_complexity=2) == {b"f": 3}
+    assert cache.misses == 1 and not list((tmp_path / "cache").rglob("*.json"))
+
+    # cached full scores are filtered instead
+    cognitive_complexity_for_file(file, cache=cache)
+    assert cognitive_complexity_for_file(file, cache=cache, max_complexity=2) == {b"f": 6}
+
+    assert list(cognitive_complexity_for_many([(1, NESTED)], max_complexity=2, jobs=1)) == [(1, {b"f": 3})]
+
+
+@pytest.mark.parametrize("totals", [False, True])
+def test_parallel(totals: bool):
+    code = b"\n".join(_random_program(seed).encode() for seed in range(10))
+    tree = default_analyzer().parse(code)
+    score = cognitive_complexity_totals if totals else cognitive_complexity
+
+    expected = score(tree.walk(), max_complexity=3)
+    assert cognitive_complexity_parallel(code, jobs=2, totals=totals, max_complexity=3) == expected
+
+
+def test_cli_files(tmp_path: Path):
+    (tmp_path / "a.c").write_bytes(NESTED)
+    (tmp_path / "b.c").write_bytes(b"void k() {}")
+
+    result = runner.invoke(app, [str(tmp_path), "--fail-over", "2", "--ordered"])
+    assert result.exit_code == 1
+    assert result.output == (
+        f"File '{tmp_path / 'a.c'}'\n"
+        "Function 'f': 3\n"
+        "\n"
+        "1 function exceeds a Modified Cognitive Complexity of 2\n"
+    )
+
+    result = runner.invoke(app, [str(tmp_path), "--fail-over", "6"])
+    assert result.exit_code == 0
+    assert result.output == "No function exceeds a Modified Cognitive Complexity of 6\n"
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_stdin(jobs: str):
+    result = runner.invoke(app, ["--fail-over", "0", "-j", jobs, "--format", "jsonl"], input=NESTED)
+    assert result.exit_code == 1
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [record["function"] for record in records] == ["f", "g", "h"]
+    assert all(record["partial"] for record in records)
+
+    result = runner.invoke(app, ["--fail-over", "0", "--annotate"], input=NESTED)
+    assert result.exit_code == 2
@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+import pickle
+import textwrap
+from pathlib import Path
+
+import pytest
+from tree_sitter import Point
+from typer.testing import CliRunner
+
+from modified_cognitive_complexity import FunctionKey, Scores, cognitive_complexity, default_analyzer
+from modified_cognitive_complexity.cli import app
+from modified_cognitive_complexity.output import FIELDS, RecordWriter, record_writer, records
+
+
+runner = CliRunner()
+
+
+def full_scores(code: str) -> dict[bytes | None, Scores]:
+    return cognitive_complexity(default_analyzer().parse(code.encode()).walk())
+
+
+CODE = textwrap.dedent("""\
+    int f() {
+        if (a && b) {}
+    }
+    while (x) {}
+    """)
+
+
+def test_records_totals():
+    assert list(records(Path("a.c"), {b"f": 2, None: 0})) == [
+        {"kind": "function", "file": "a.c", "function": "f", "total": 2},
+        {"kind": "function", "file": "a.c", "function": None, "total": 0},
+    ]
+    assert list(records(Path("a.c"), {b"f": 2}, partial=True)) == [
+        {"kind": "function", "file": "a.c", "function": "f", "total": 2, "partial": True},
+    ]
+
+
+def test_records_keys():
+    keys = {FunctionKey(b"f", Point(0, 0), 0, 10): 1, FunctionKey(b"f", Point(1, 0), 11, 20): 2, None: 0}
+
+    assert list(records(Path("a.c"), keys)) == [
+        {"kind": "function", "file": "a.c", "function": "f", "total": 1, "start_row": 0, "start_byte": 0},
+        {"kind": "function", "file": "a.c", "function": "f", "total": 2, "start_row": 1, "start_byte": 11},
+        {"kind": "function", "file": "a.c", "function": None, "total": 0},
+    ]
+
+
+def test_records_locations():
+    scores_by_function = full_scores(CODE)
+    result = list(records(None, scores_by_function))
+
+    assert [(r["kind"], r["function"], r["total"]) for r in result] == [
+        ("function", "f", 2),
+        ("location", "f", 1),
+        ("location", "f", 1),
+        ("function", None, 1),
+        ("location", None, 1),
+    ]
+    assert result[1] == {
+        "kind": "location", "file": None, "function": "f", "total": 1,
+        "start_row": 1, "start_column": 4, "end_row": 1, "end_column": 18,
+        "increment": 1, "nesting": 0, "goto_nesting": 0,
+    }
+    assert result[2]["nesting"] is None
+
+
+def test_records_locations_keys():
+    scores_by_function = cognitive_complexity(default_analyzer().parse(CODE.encode()).walk(), keys=True)
+    result = list(records(None, scores_by_function))
+
+    assert [(r["kind"], r.get("function_start_row"), r.get("function_start_byte")) for r in result] == [
+        ("function", None, None),
+        ("location", 0, 0),
+        ("location", 0, 0),
+        ("function", None, None),
+        ("location", None, None),
+    ]
+    assert result[0]["start_row"] == 0 and result[1]["start_row"] == 1
+
+
+@pytest.mark.parametrize("output_format", ["jsonl", "csv", "json"])
+def test_writers_round_trip(output_format: str):
+    expected = list(records(None, full_scores(CODE)))
+
+    stream = io.StringIO()
+    writer = record_writer(output_format, stream)
+    writer.write(iter(expected[:2]))
+    writer.write(iter(expected[2:]))
+    writer.close()
+    output = stream.getvalue()
+
+    if output_format == "jsonl":
+        actual = [json.loads(line) for line in output.splitlines()]
+    elif output_format == "json":
+        actual = json.loads(output)
+    else:
+        rows = list(csv.DictReader(io.StringIO(output)))
+        assert list(rows[0]) == list(FIELDS)
+        actual = [{k: v for k, v in row.items() if v != ""} for row in rows]
+        expected = [{k: "" if v is None else str(v) for k, v in r.items() if v is not None} for r in expected]
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize("output_format", ["jsonl", "json"])
+def test_writers_empty(output_format: str):
+    stream = io.StringIO()
+    writer = record_writer(output_format, stream)
+    writer.close()
+    assert stream.getvalue() in ("", "[]\n")
+
+
+def test_writer_abstract():
+    with pytest.raises(TypeError):
+        RecordWriter(io.StringIO())
+
+
+def test_scores_picklable():
+    scores_by_function = full_scores(CODE)
+    assert pickle.loads(pickle.dumps(scores_by_function)) == scores_by_function
+
+
+def test_cli_stdin_jsonl():
+    result = runner.invoke(app, ["--format", "jsonl"], input=CODE)
+
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line) for line in result.output.splitlines()] == [
+        {"kind": "function", "file": None, "function": "f", "total": 2},
+        {"kind": "function", "file": None, "function": None, "total": 1},
+    ]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_files_locations(tmp_path: Path, jobs: str):
+    (tmp_path / "a.c").write_text(CODE)
+    (tmp_path / "b.c").write_text("int g() { for (;;) {} }\n")
+
+    result = runner.invoke(app, [str(tmp_path), "-j", jobs, "--ordered", "-f", "json", "--locations"])
+
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.output)
+    assert [(Path(r["file"]).name, r["kind"], r["function"]) for r in output] == [
+        ("a.c", "function", "f"),
+        ("a.c", "location", "f"),
+        ("a.c", "location", "f"),
+        ("a.c", "function", None),
+        ("a.c", "location", None),
+        ("b.c", "function", "g"),
+        ("b.c", "location", "g"),
+        ("b.c", "function", None),
+    ]
+
+
+def test_cli_rejects_invalid_combinations():
+    assert runner.invoke(app, ["--format", "csv", "--annotate"], input=CODE).exit_code == 2
+    assert runner.invoke(app, ["--locations"], input=CODE).exit_code == 2
@@ -0,0 +1,85 @@
+import textwrap
+
+import pytest
+
+from modified_cognitive_complexity import cognitive_complexity, cognitive_complexity_parallel, cognitive_complexity_totals, default_analyzer
+from tests.test_differential import _random_program
+
+
+CODE = textwrap.dedent("""\
+    #include <stdio.h>
+
+    struct S {
+        int get() const { if (a) { return 1; } return 0; }
+    };
+
+    namespace n {
+        template <class T> int f(T t) { while (t && u) { t--; } }
+    }
+
+    int g(int x) {
+        if (x) { goto out; }
+        auto l = [](int y) { return y ? 1 : 2; };
+    out:
+        return x;
+    }
+
+    if (top) {}
+
+    int broken(int x) { if (x { } }
+
+    int g(void) { for (;;) {} }
+    """)
+
+
+def _expected(code: str, totals: bool, **kwargs):
+    tree = default_analyzer().parse(code.encode())
+    return (cognitive_complexity_totals if totals else cognitive_complexity)(tree.walk(), **kwargs)
+
+
+@pytest.mark.parametrize("totals", [False, True])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_same_as_serial(totals: bool, jobs: int):
+    result = cognitive_complexity_parallel(CODE, jobs=jobs, totals=totals)
+    expected = _expected(CODE, totals)
+
+    assert result == expected
+    assert list(result) == list(expected)
+
+
+@pytest.mark.parametrize("totals", [False, True])
+def test_keys(totals: bool):
+    result = cognitive_complexity_parallel(CODE, jobs=2, totals=totals, keys=True)
+
+    assert list(result.items()) == list(_expected(CODE, totals, keys=True).items())
+    assert [key.start.row for key in result if key is not None and key.name == b"g"] == [10, 21]
+
+
+def test_random_programs():
+    code = "\n".join(_random_program(seed) for seed in range(40))
+    result = cognitive_complexity_parallel(code, jobs=3, structural_gotos=True)
+    expected = _expected(code, False, structural_gotos=True)
+
+    assert result == expected
+    assert list(result) == list(expected)
+
+
+def test_no_functions():
+    assert cognitive_complexity_parallel("if (x) {}", jobs=2, totals=True) == {None: 1}
+
+
+def test_invalid_jobs():
+    with pytest.raises(ValueError):
+        cognitive_complexity_parallel("", jobs=0)
+
+
+def test_mismatching_function_is_not_scored_by_worker():
+    from modified_cognitive_complexity.helpers import _init_function_worker, _score_functions
+
+    code = b"int f() { if (x) {} }"
+    node = default_analyzer().parse(code).root_node.children[0]
+    _init_function_worker(code, True, True, False)
+
+    span = (node.start_byte, node.end_byte, node.start_point, node.end_point, node.descendant_count)
+    assert _score_functions([span]) == [{b"f": 1}]
+    assert _score_functions([(*span[:4], span[4] + 1)]) == [None]
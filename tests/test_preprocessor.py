@@ -0,0 +1,217 @@
+import random
+import shutil
+import subprocess
+import textwrap
+
+import pytest
+
+from modified_cognitive_complexity import FunctionKey, cognitive_complexity, cognitive_complexity_configurations, cognitive_complexity_totals, default_analyzer
+
+
+CODE = textwrap.dedent("""\
+    #if defined(A) && B > 1
+    int f() { if (x) {} }
+    #elif C
+    int f() { while (x) { if (y) {} } }
+    #else
+    int f() {}
+    #endif
+    int g() {
+    #ifdef X
+        if (a) { if (b) {} }
+    #else
+        while (b) {}
+    #endif
+    #ifndef Y
+        for (;;) { goto end; }
+    #endif
+        if (c) {}
+    end:
+        return 0;
+    }
+    #if X
+    if (a) {}
+    #endif
+    """)
+
+
+def _totals(code: str) -> dict[bytes | None, int]:
+    return cognitive_complexity_totals(default_analyzer().parse(code.encode()).walk())
+
+
+@pytest.mark.parametrize(
+    ("configuration", "expected"),
+    (
+        pytest.param({}, {b"f": 0, b"g": 5, None: 0}, id="none"),
+        pytest.param({"A": 1, "B": 2}, {b"f": 1, b"g": 5, None: 0}, id="if"),
+        pytest.param({"A": 1, "B": 1, "C": 1}, {b"f": 3, b"g": 5, None: 0}, id="elif"),
+        pytest.param({"X": 1}, {b"f": 0, b"g": 7, None: 1}, id="ifdef"),
+        pytest.param({"X": 0}, {b"f": 0, b"g": 7, None: 0}, id="defined as 0"),
+        pytest.param({"Y": 1}, {b"f": 0, b"g": 2, None: 0}, id="ifndef"),
+    ),
+)
+def test_configurations(configuration: dict[str, int], expected: dict[bytes | None, int]):
+    tree = default_analyzer().parse(CODE.encode())
+
+    assert cognitive_complexity_configurations(tree.walk(), [configuration]) == [expected]
+
+    scores, = cognitive_complexity_configurations(tree.walk(), [configuration], totals=False)
+    assert {function_name: sum(cost.total for _, cost in costs) for function_name, costs in scores.items()} == expected
+
+
+def test_preprocessed():
+    # in g, the goto spans the if statement only if Y is not defined
+    code = textwrap.dedent("""\
+        int g() {
+            while (b) {}
+            for (;;) { goto end; }
+            if (c) {}
+        end:
+            return 0;
+        }
+        """)
+    tree = default_analyzer().parse(CODE.encode())
+    result, = cognitive_complexity_configurations(tree.walk(), [{}], totals=False)
+    expected = cognitive_complexity(default_analyzer().parse(code.encode()).walk())
+
+    assert [cost for _, cost in result[b"g"]] == [cost for _, cost in expected[b"g"]]
+    assert [location.start.row for location, _ in result[b"g"]] == [11, 14, 14, 16]
+
+
+def test_keys():
+    tree = default_analyzer().parse(CODE.encode())
+    first, second = cognitive_complexity_configurations(tree.walk(), [{}, {"C": 1}], keys=True)
+
+    assert [(key.name, key.start.row) for key in first if isinstance(key, FunctionKey)] == [(b"f", 5), (b"g", 7)]
+    assert [(key.name, key.start.row) for key in second if isinstance(key, FunctionKey)] == [(b"f", 3), (b"g", 7)]
+
+
+@pytest.mark.parametrize(
+    ("condition", "expected"),
+    (
+        ("#if 0x10 == 16 && 010 == 8 && 1'000u == 1000", True),
+        ("#if (1 + 2) * 3 == 9 && 7 / 2 == 3 && -7 / 2 == -3 && -7 % 2 == -1", True),
+        ("#if 1 << 4 == 16 && (6 & 3) == 2 && (6 | 3) == 7 && (6 ^ 3) == 5 && ~0 == -1", True),
+        ("#if A", True),
+        ("#if A == 2 || !defined B", False),
+        ("#if defined A && !defined(C)", True),
+        ("#if defined A && !defined(B)", False),
+        ("#if UNDEFINED", False),
+        ("#if 1 / 0", False),
+        ("#if 'a' == 97", True),
+        ("#if VERSION(1, 2) || A", True),
+        ("#if VERSION(1, 2)", False),
+        ("#if A ? 1 : 0", False),
+        ("#ifdef A", True),
+        ("#ifndef B", False),
+    ),
+)
+def test_conditions(condition: str, expected: bool):
+    tree = default_analyzer().parse(f"{condition}\nif (x) {{}}\n#endif\n".encode())
+    result, = cognitive_complexity_configurations(tree.walk(), [{"A": 1, "B": 3}])
+
+    assert result == {None: 1 if expected else 0}
+
+
+def test_elif_chain():
+    code = textwrap.dedent("""\
+        #if A == 1
+        if (a) {}
+        #elif A == 2
+        if (a) { if (b) {} }
+        #elif A > 0
+        if (a) { if (b) { if (c) {} } }
+        #else
+        if (a) { if (b) { if (c) { if (d) {} } } }
+        #endif
+        """)
+    tree = default_analyzer().parse(code.encode())
+    results = cognitive_complexity_configurations(tree.walk(), [{"A": value} for value in range(4)])
+
+    assert [result[None] for result in results] == [10, 1, 3, 6]
+
+
+def test_nested():
+    code = textwrap.dedent("""\
+        #ifdef A
+        #  ifdef B
+        if (a) {}
+        #  else
+        while (a) {}
+        while (b) {}
+        #  endif
+        #endif
+        if (c) { if (d) {} }
+        """)
+    tree = default_analyzer().parse(code.encode())
+    results = cognitive_complexity_configurations(tree.walk(), [{}, {"A": 1}, {"A": 1, "B": 1}, {"B": 1}])
+
+    assert [result[None] for result in results] == [3, 5, 4, 3]
+
+
+def test_unchanged_without_conditionals():
+    code = "int f() { if (a && b) { goto end; } while (c) {} end: return 0; }\nif (x) {}\n"
+    tree = default_analyzer().parse(code.encode())
+
+    assert cognitive_complexity_configurations(tree.walk(), [{}, {"A": 1}]) == [_totals(code)] * 2
+
+
+def _random_statements(rng: random.Random, depth: int, count: int) -> str:
+    statements = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.2 and depth < 4:
+            statements.append(f"if (x{depth}) {{\n{_random_statements(rng, depth + 1, rng.randrange(4))}}}\n")
+        elif kind < 0.3 and depth < 4:
+            statements.append(f"while (a && b || c) {{\n{_random_statements(rng, depth + 1, rng.randrange(4))}}}\n")
+        elif kind < 0.4:
+            statements.append(f"goto L{rng.randrange(3)};\n")
+        elif kind < 0.5:
+            statements.append(f"L{rng.randrange(3)}: x++;\n")
+        elif kind < 0.7:
+            statements.append(
+                f"{_random_directive(rng)}\n{_random_statements(rng, depth, rng.randrange(3))}"
+                + (f"#elif {rng.choice('ABC')} == 2\n{_random_statements(rng, depth, rng.randrange(3))}" if rng.random() < 0.4 else "")
+                + (f"#else\n{_random_statements(rng, depth, rng.randrange(3))}" if rng.random() < 0.5 else "")
+                + "#endif\n"
+            )
+        else:
+            statements.append("x = a ? b : c;\n")
+
+    return "".join(statements)
+
+
+def _random_directive(rng: random.Random) -> str:
+    macro = rng.choice("ABC")
+    return rng.choice((f"#ifdef {macro}", f"#ifndef {macro}", f"#if {macro} > 1", f"#if defined({macro}) && !defined(B)"))
+
+
+def _random_program(seed: int) -> str:
+    rng = random.Random(seed)
+    functions = []
+    for _ in range(rng.randint(1, 4)):
+        function = f"int f{rng.randrange(3)}() {{\n{_random_statements(rng, 0, rng.randint(1, 6))}}}\n"
+        if rng.random() < 0.3:
+            function = f"{_random_directive(rng)}\n{function}#else\n{function}#endif\n"
+        functions.append(function)
+
+    return "".join(functions) + _random_statements(rng, 0, 2)
+
+
+@pytest.mark.skipif(shutil.which("cpp") is None, reason="requires the C preprocessor")
+@pytest.mark.parametrize("structural_gotos", (False, True))
+@pytest.mark.parametrize("seed", range(40))
+def test_differential_cpp(seed: int, structural_gotos: bool):
+    code = _random_program(seed)
+    configurations = [{}, {"A": 2}, {"B": 2}, {"A": 1, "C": 3}, {"A": 2, "B": 2, "C": 2}]
+    tree = default_analyzer().parse(code.encode())
+    results = cognitive_complexity_configurations(tree.walk(), configurations, structural_gotos=structural_gotos)
+
+    for configuration, result in zip(configurations, results):
+        defines = [f"-D{name}={value}" for name, value in configuration.items()]
+        preprocessed = subprocess.run(
+            ["cpp", "-P", "-undef", "-nostdinc", *defines], input=code, capture_output=True, text=True, check=True
+        ).stdout
+        tree = default_analyzer().parse(preprocessed.encode())
+
+        assert result == cognitive_complexity_totals(tree.walk(), structural_gotos=structural_gotos)
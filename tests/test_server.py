@@ -0,0 +1,186 @@
+import http.client
+import json
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+from modified_cognitive_complexity import cognitive_complexity_for_string
+from modified_cognitive_complexity.server import AnalysisServer
+
+
+CODE = "int f() { if (a) { while (b && c) {} } }\nint g() { return 0; }\n"
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: Path):
+        super().__init__("localhost")
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(str(self.socket_path))
+
+
+def _serve(server: AnalysisServer) -> threading.Thread:
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def _request(connection: http.client.HTTPConnection, method: str, path: str, body=None) -> tuple[int, dict]:
+    data = None if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    connection.request(method, path, body=data)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+@pytest.fixture(params=[1, 2], ids=["thread", "processes"])
+def connection(request):
+    with AnalysisServer(("127.0.0.1", 0), jobs=request.param, max_pending=4) as server:
+        thread = _serve(server)
+        host, port = server.address
+        connection = http.client.HTTPConnection(host, port)
+        connection.server = server
+        yield connection
+        connection.close()
+        server.shutdown()
+        thread.join()
+
+
+def test_score(connection: http.client.HTTPConnection, tmp_path: Path):
+    (tmp_path / "a.c").write_text(CODE)
+    status, body = _request(connection, "POST", "/score", {
+        "sources": [{"code": CODE, "file": "x.c"}, {"path": str(tmp_path / "a.c")}, {"path": str(tmp_path / "missing.c")}]
+    })
+
+    assert status == 200
+    expected = cognitive_complexity_for_string(CODE)
+    assert [(record["file"], record["total"]) for record in body["records"]] == [
+        *(("x.c", total) for total in expected.values()),
+        *((str(tmp_path / "a.c"), total) for total in expected.values()),
+    ]
+    assert [error["file"] for error in body["errors"]] == [str(tmp_path / "missing.c")]
+
+    # the connection is kept alive between requests
+    status, body = _request(connection, "POST", "/score", {"sources": [{"code": CODE}], "locations": True, "goto_nesting": False})
+    assert status == 200
+    assert [record["kind"] for record in body["records"]].count("location") == 3
+
+
+def test_options(connection: http.client.HTTPConnection, tmp_path: Path):
+    (tmp_path / "a.txt").write_text(CODE)
+    status, body = _request(connection, "POST", "/score", {
+        "sources": [{"code": CODE}, {"path": str(tmp_path / "a.txt")}],
+        "max_complexity": 1,
+        "keys": True,
+        "language": "cpp"
+    })
+
+    assert status == 200
+    assert [(record["function"], record["partial"], record["start_row"]) for record in body["records"]] == [("f", True, 0)] * 2
+
+
+def test_metrics(connection: http.client.HTTPConnection):
+    _request(connection, "POST", "/score", {"sources": [{"code": CODE}, {"code": CODE}]})
+    status, metrics = _request(connection, "GET", "/metrics")
+
+    assert status == 200
+    assert metrics["requests"] == 1 and metrics["sources"] == 2 and metrics["bytes"] == 2 * len(CODE)
+    assert metrics["pending"] == 0 and metrics["max_pending"] == 4
+    assert metrics["latency_ms"]["p50"] > 0
+    assert _request(connection, "GET", "/health") == (200, {"status": "ok"})
+
+
+@pytest.mark.parametrize("body", [
+    b"{",
+    {"sources": "x"},
+    {"sources": [{}]},
+    {"sources": [{"code": CODE, "path": "a.c"}]},
+    {"sources": [{"code": CODE}], "locations": "yes"},
+    {"sources": [{"code": CODE}] * 5},
+    {"sources": [{"code": CODE}], "max_complexity": -1},
+    {"sources": [{"code": CODE}], "max_complexity": True},
+    {"sources": [{"code": CODE}], "keys": 1},
+    {"sources": [{"code": CODE}], "language": "cobol"},
+])
+def test_bad_request(connection: http.client.HTTPConnection, body):
+    status, response = _request(connection, "POST", "/score", body)
+    assert status == 400 and "error" in response
+
+    metrics = connection.server.metrics()
+    assert metrics["requests"] == metrics["failed"] == 1
+
+
+def test_negative_content_length(connection: http.client.HTTPConnection):
+    connection.putrequest("POST", "/score")
+    connection.putheader("Content-Length", "-1")
+    connection.endheaders()
+    response = connection.getresponse()
+
+    assert response.status == 400 and "error" in json.loads(response.read())
+
+
+def test_backpressure(connection: http.client.HTTPConnection):
+    server: AnalysisServer = connection.server
+    server._pending = 3
+
+    connection.request("POST", "/score", body=json.dumps({"sources": [{"code": CODE}] * 2}).encode())
+    response = connection.getresponse()
+    assert response.status == 503 and response.getheader("Retry-After") == "1"
+    response.read()
+
+    assert _request(connection, "POST", "/score", {"sources": [{"code": CODE}]})[0] == 200
+    assert server.metrics()["rejected"] == 1
+
+
+def test_root(tmp_path: Path):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "a.c").write_text(CODE)
+    (tmp_path / "b.c").write_text(CODE)
+    (root / "link.c").symlink_to(tmp_path / "b.c")
+
+    with AnalysisServer(("127.0.0.1", 0), root=root) as server:
+        thread = _serve(server)
+        connection = http.client.HTTPConnection(*server.address)
+
+        status, body = _request(connection, "POST", "/score", {"sources": [{"path": "a.c"}, {"path": str(root / "a.c")}]})
+        assert status == 200 and [record["file"] for record in body["records"]] == ["a.c"] * 3 + [str(root / "a.c")] * 3
+
+        for path in ["../b.c", str(tmp_path / "b.c"), "link.c"]:
+            status, body = _request(connection, "POST", "/score", {"sources": [{"path": path}]})
+            assert status == 400 and "outside" in body["error"]
+
+        connection.close()
+        server.shutdown()
+        thread.join()
+
+
+def test_unix_socket(tmp_path: Path):
+    path = tmp_path / "server.sock"
+    with AnalysisServer(path) as server:
+        thread = _serve(server)
+        connection = _UnixConnection(path)
+        status, body = _request(connection, "POST", "/score", {"sources": [{"code": CODE}]})
+        assert status == 200 and [record["total"] for record in body["records"]] == list(cognitive_complexity_for_string(CODE).values())
+
+        with pytest.raises(OSError, match="in use"):
+            AnalysisServer(path)
+
+        connection.close()
+        server.shutdown()
+        thread.join()
+
+    assert not path.exists()
+
+
+def test_stale_unix_socket(tmp_path: Path):
+    path = tmp_path / "server.sock"
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+
+    with AnalysisServer(path) as server:
+        assert server.address == path
@@ -0,0 +1,99 @@
+import io
+import mmap
+import textwrap
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from modified_cognitive_complexity import cognitive_complexity_for_file, cognitive_complexity_for_string, default_analyzer
+from modified_cognitive_complexity.cli import app
+from modified_cognitive_complexity.source import map_source
+
+
+runner = CliRunner()
+
+
+CODE = textwrap.dedent("""\
+    int f() {
+    \tif (x) {
+    \t\twhile (y) {}
+    \t}
+    }
+    """)
+
+
+def test_map_file(tmp_path: Path):
+    file = tmp_path / "a.c"
+    file.write_text(CODE)
+
+    with map_source(file) as content:
+        assert isinstance(content, mmap.mmap)
+        assert content[:] == CODE.encode()
+
+    assert content.closed
+    assert cognitive_complexity_for_file(file) == cognitive_complexity_for_string(CODE) == {b"f": 3, None: 0}
+
+
+def test_map_file_closed_with_trees(tmp_path: Path):
+    file = tmp_path / "a.c"
+    file.write_text(CODE)
+
+    with map_source(file) as content:
+        tree = default_analyzer().parse(content)
+
+    # the mapping is closed although the tree still refers to it
+    assert content.closed
+    with pytest.raises(ValueError):
+        tree.root_node.text
+
+
+def test_map_empty_file(tmp_path: Path):
+    file = tmp_path / "empty.c"
+    file.touch()
+
+    with map_source(file) as content:
+        assert content == b""
+
+    assert cognitive_complexity_for_file(file) == {None: 0}
+
+
+def test_map_stream():
+    stream = io.BytesIO(b"skipped" + CODE.encode())
+    stream.seek(len(b"skipped"))
+
+    with map_source(stream) as content:
+        assert content == CODE.encode()
+
+    assert not stream.closed
+
+
+def test_map_stream_not_at_start(tmp_path: Path):
+    file = tmp_path / "a.c"
+    file.write_bytes(b"skipped" + CODE.encode())
+
+    with open(file, "rb") as stream:
+        stream.seek(len(b"skipped"))
+        with map_source(stream) as content:
+            assert content == CODE.encode()
+
+
+def test_annotate():
+    result = runner.invoke(app, ["--annotate"], input=CODE.replace("\n", "\r\n"))
+
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[:6] == [
+        "                        Inc Nest Goto",
+        "int f() {            //              ",
+        "    if (x) {         //   1    0    0",
+        "        while (y) {} //   1    1    0",
+        "    }                //              ",
+        "}                    //              ",
+    ]
+
+
+def test_annotate_empty():
+    result = runner.invoke(app, ["--annotate"], input="")
+
+    assert result.exit_code == 0, result.output
+    assert "Total Modified Cognitive Complexity: 0" in result.output
@@ -0,0 +1,73 @@
+import subprocess
+import sys
+
+import pytest
+
+
+IMPORT_BUDGET_MS = 50
+"""The time the modules of this package may take to import themselves, excluding their dependencies."""
+
+
+def _run(statement: str, *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *options, "-c", statement], capture_output=True, text=True, check=True)
+
+
+def _modules(statement: str) -> set[str]:
+    """Run the statement in a fresh interpreter and return the names of all imported modules."""
+    return set(_run(f"{statement}; import sys; print(*sys.modules)").stdout.split())
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    """Run the statement in a fresh interpreter and return the self time of each imported module in µs."""
+
+    times = {}
+    for line in _run(statement, "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(self_time)
+
+    return times
+
+
+@pytest.mark.parametrize("statement", [
+    "import modified_cognitive_complexity",
+    "import modified_cognitive_complexity.cli",
+])
+def test_no_heavy_imports(statement: str):
+    modules = _modules(statement)
+
+    # the grammar, process pools, git and the server are only loaded by the commands that use them
+    for module in (
+        "tree_sitter",
+        "tree_sitter_cpp",
+        "concurrent.futures.process",
+        "http.server",
+        "importlib.metadata",
+        "modified_cognitive_complexity.complexity",
+        "modified_cognitive_complexity.helpers",
+        "modified_cognitive_complexity.gitdiff",
+    ):
+        assert module not in modules
+
+
+def test_lazy_exports():
+    modules = _modules("import modified_cognitive_complexity as mcc; mcc.cognitive_complexity_for_string('int f() {}')")
+    assert {"tree_sitter_cpp", "modified_cognitive_complexity.helpers"} <= modules
+    assert "modified_cognitive_complexity.server" not in modules
+
+
+def test_star_import_without_optional_dependencies():
+    # numpy is an optional extra, and the star import should not load it or asyncio
+    modules = _modules("import sys; sys.modules['numpy'] = None; from modified_cognitive_complexity import *; cognitive_complexity_for_string")
+    assert "modified_cognitive_complexity.aggregate" not in modules
+    assert "modified_cognitive_complexity.aio" not in modules
+
+
+def test_import_budget():
+    # the modules needed to score a file from the command line
+    modules = _import_times("from modified_cognitive_complexity import cli, scan, analyzer, output")
+
+    own = {name: time for name, time in modules.items() if name.startswith("modified_cognitive_complexity")}
+    assert sum(own.values()) < IMPORT_BUDGET_MS * 1000, own
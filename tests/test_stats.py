@@ -0,0 +1,92 @@
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from modified_cognitive_complexity import Stats, cognitive_complexity, cognitive_complexity_totals, default_analyzer
+from modified_cognitive_complexity.cli import app
+from modified_cognitive_complexity.scan import score_files
+
+
+CODE = b"""
+int f(int a, int b) {
+    if (a && b || a) {
+        goto out;
+    }
+    while (a) {}
+out:
+    return 0;
+}
+"""
+
+runner = CliRunner()
+
+
+def test_counters():
+    stats = Stats()
+    tree = default_analyzer().parse(CODE, stats=stats)
+    totals = cognitive_complexity_totals(tree.walk(), stats=stats)
+
+    assert totals == cognitive_complexity_totals(tree.walk())
+    assert stats.gotos == 1 and stats.labels == 1
+    assert stats.binary_expressions == 2
+    assert stats.node_visits["if_statement"] == stats.node_visits["while_statement"] == 1
+    assert stats.skipped_nodes > 0
+    assert stats.parse_seconds > 0 and stats.traversal_seconds > 0
+
+
+def test_skipped_nodes_after_max_complexity():
+    tree = default_analyzer().parse(CODE)
+    stats, exceeded = Stats(), Stats()
+    cognitive_complexity_totals(tree.walk(), stats=stats)
+    cognitive_complexity_totals(tree.walk(), stats=exceeded, max_complexity=0)
+
+    # the nodes after the first increment are skipped instead of scored
+    assert exceeded.skipped_nodes > stats.skipped_nodes
+    assert exceeded.node_visits.total() < stats.node_visits.total()
+
+
+def test_results_unchanged():
+    tree = default_analyzer().parse(CODE)
+    assert cognitive_complexity(tree.walk(), stats=Stats()) == cognitive_complexity(tree.walk())
+
+
+def test_update():
+    first, second = Stats(), Stats()
+    tree = default_analyzer().parse(CODE)
+    cognitive_complexity_totals(tree.walk(), stats=first)
+    cognitive_complexity_totals(tree.walk(), stats=second)
+
+    total = Stats()
+    total.update(first)
+    total.update(second)
+    assert total.node_visits == first.node_visits + second.node_visits
+    assert total.gotos == 2 and total.binary_expressions == 4
+
+
+def test_score_files(tmp_path: Path):
+    (tmp_path / "a.c").write_bytes(CODE)
+    results = list(score_files([tmp_path / "a.c"], jobs=1, stats=True))
+    assert results[0].stats is not None and results[0].stats.gotos == 1
+
+    results = list(score_files([tmp_path / "a.c"], jobs=1))
+    assert results[0].stats is None
+
+
+def test_cli_stdin():
+    result = runner.invoke(app, ["--stats"], input=CODE)
+    assert result.exit_code == 0
+    assert "Gotos: 1, labels: 1" in result.output
+    assert "  if_statement: 1" in result.output
+
+
+def test_cli_files(tmp_path: Path):
+    (tmp_path / "a.c").write_bytes(CODE)
+    (tmp_path / "b.c").write_bytes(CODE)
+    result = runner.invoke(app, [str(tmp_path), "--stats", "-j", "2"])
+    assert result.exit_code == 0
+    assert "Gotos: 2, labels: 2" in result.output
+
+
+def test_cli_parallel_stdin():
+    result = runner.invoke(app, ["--stats", "-j", "2"], input=CODE)
+    assert result.exit_code != 0
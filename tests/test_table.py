@@ -0,0 +1,64 @@
+import pickle
+
+import pytest
+
+from modified_cognitive_complexity import ScoreTable, cognitive_complexity, cognitive_complexity_totals, default_analyzer
+from tests.test_differential import _random_program
+
+
+def _scores(code: str, structural_gotos: bool = False):
+    tree = default_analyzer().parse(code.encode())
+    return cognitive_complexity(tree.walk(), structural_gotos=structural_gotos), tree
+
+
+@pytest.mark.parametrize("seed", range(50))
+@pytest.mark.parametrize("structural_gotos", [False, True])
+def test_round_trip(seed: int, structural_gotos: bool):
+    scores_by_function, tree = _scores(_random_program(seed), structural_gotos)
+    table = ScoreTable.from_scores(scores_by_function)
+
+    assert table.to_scores() == scores_by_function
+    assert table.totals() == cognitive_complexity_totals(tree.walk(), structural_gotos=structural_gotos)
+    assert len(table) == sum(len(scores) for scores in scores_by_function.values())
+
+
+def test_slice():
+    scores_by_function, _ = _scores("""
+        int f() { if (a) { while (b && c) {} } }
+        int g() { x = a ? b : c; }
+        if (d) {}
+    """)
+    table = ScoreTable.from_scores(scores_by_function)
+
+    assert list(table) == table.functions == [b"f", b"g", None]
+    assert list(table.rows(b"g")) == [3]
+    assert b"g" in table and b"h" not in table
+
+    sliced = table.slice(b"f")
+    assert sliced.functions == [b"f"]
+    assert sliced.to_scores() == {b"f": scores_by_function[b"f"]}
+    assert sliced.total(b"f") == table.total(b"f") == 1 + 2 + 1
+
+
+def test_empty_function():
+    table = ScoreTable.from_scores({b"f": [], None: []})
+
+    assert table.scores(b"f") == []
+    assert table.totals() == {b"f": 0, None: 0}
+    assert len(table) == 0
+
+
+def test_duplicate_function():
+    table = ScoreTable()
+    table.append(b"f", [])
+
+    with pytest.raises(ValueError):
+        table.append(b"f", [])
+
+
+def test_pickle_and_size():
+    scores_by_function, _ = _scores(_random_program(0))
+    table = ScoreTable.from_scores(scores_by_function)
+
+    assert pickle.loads(pickle.dumps(table)) == table
+    assert table.nbytes == 7 * 4 * len(table) + 8 * (len(table.functions) + 1)